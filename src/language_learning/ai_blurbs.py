@@ -4,14 +4,21 @@ This module provides both deterministic and LLM-backed generation strategies.
 Environment variables can toggle between the two approaches.
 """
 
-from typing import Iterable, List, Optional
-import json
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+import asyncio
+import logging
 import os
 
-import requests
-
+from .allowed_vocabulary import get_allowed_vocabulary
+from .cache import get_cache, make_key
+from .frequency import get_frequency_index
+from .llm_client import get_async_llm_client, get_llm_client
 from .vocabulary import get_top_coca_words
 
+logger = logging.getLogger(__name__)
+
 
 def _generate_simple(
     known_words: Iterable[str],
@@ -33,46 +40,190 @@ def _generate_simple(
     return " ".join(words)
 
 
-def _generate_with_llm(
-    known_words: Iterable[str],
-    l_plus_one_words: Iterable[str],
-    length: int,
-) -> str:
-    """Generate a blurb using an LLM with a restricted vocabulary."""
+DEFAULT_PROMPT_TOKEN_BUDGET = 1000
+_CHARS_PER_TOKEN = 4
 
-    allowed = list(dict.fromkeys(list(l_plus_one_words) + list(known_words)))
-    if length <= 0 or not allowed:
-        return ""
 
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-    api_key = os.getenv("AZURE_OPENAI_API_KEY")
-    if not (endpoint and deployment and api_key):
-        raise RuntimeError("Azure OpenAI configuration missing")
+def estimate_tokens(text: str) -> int:
+    """Rough token count for *text* (about four characters per token)."""
+
+    return -(-len(text) // _CHARS_PER_TOKEN)
+
 
+def _blurb_prompt(allowed: List[str], length: int) -> str:
     word_list = ", ".join(allowed)
-    prompt = (
+    return (
         f"Write a coherent {length}-word blurb using ONLY the following words: "
         f"{word_list}. Do not use any other vocabulary. Return just the blurb."
     )
-    url = (
-        f"{endpoint}/openai/deployments/{deployment}/chat/completions"
-        "?api-version=2025-01-01-preview"
+
+
+@dataclass(frozen=True)
+class BlurbPrompt:
+    """An LLM blurb prompt together with its size."""
+
+    text: str
+    words: List[str]
+    omitted: int
+
+    @property
+    def estimated_tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def build_blurb_prompt(
+    known_words: Iterable[str],
+    l_plus_one_words: Iterable[str],
+    length: int,
+    token_budget: Optional[int] = None,
+) -> BlurbPrompt:
+    """Build a blurb prompt whose word list fits within *token_budget*.
+
+    L+1 words are listed first, followed by known words from most to least
+    frequent in COCA (words missing from COCA last, in their given order).
+    Words are added in that order until the estimated prompt size would
+    exceed the budget, so the prompt stays bounded however large the
+    learner's vocabulary grows.  The budget defaults to
+    ``LLM_BLURB_TOKEN_BUDGET`` or :data:`DEFAULT_PROMPT_TOKEN_BUDGET`.
+    """
+
+    if token_budget is None:
+        token_budget = int(
+            os.getenv("LLM_BLURB_TOKEN_BUDGET", DEFAULT_PROMPT_TOKEN_BUDGET)
+        )
+    ranks = get_frequency_index().ranks
+    by_frequency = sorted(
+        known_words, key=lambda w: ranks.get(w.lower(), len(ranks) + 1)
     )
-    res = requests.post(
-        url,
-        headers={"api-key": api_key, "Content-Type": "application/json"},
-        json={"messages": [{"role": "user", "content": prompt}]},
-        timeout=15,
+    candidates = list(dict.fromkeys(list(l_plus_one_words) + by_frequency))
+
+    max_chars = token_budget * _CHARS_PER_TOKEN
+    chars = len(_blurb_prompt([], length))
+    words: List[str] = []
+    for word in candidates:
+        cost = len(word) + (2 if words else 0)  # ", " separator
+        if words and chars + cost > max_chars:
+            break
+        words.append(word)
+        chars += cost
+    return BlurbPrompt(_blurb_prompt(words, length), words, len(candidates) - len(words))
+
+
+def _log_prompt(prompt: BlurbPrompt) -> None:
+    logger.debug(
+        "Blurb prompt: ~%d tokens, %d words listed, %d omitted",
+        prompt.estimated_tokens,
+        len(prompt.words),
+        prompt.omitted,
     )
-    res.raise_for_status()
-    content = res.json()["choices"][0]["message"]["content"].strip()
+
+
+def _truncate(content: str, length: int) -> str:
+    content = content.strip()
     words = content.split()
     if len(words) > length:
         content = " ".join(words[:length])
     return content
 
 
+def _generate_with_llm(
+    known_words: Iterable[str],
+    l_plus_one_words: Iterable[str],
+    length: int,
+) -> str:
+    """Generate a blurb using an LLM with a restricted vocabulary.
+
+    The prompt lists a budgeted subset of the words (see
+    :func:`build_blurb_prompt`); its estimated size and the number of
+    omitted words are logged at debug level.
+    """
+
+    prompt = build_blurb_prompt(known_words, l_plus_one_words, length)
+    _log_prompt(prompt)
+    if length <= 0 or not prompt.words:
+        return ""
+    content = get_llm_client().chat(prompt.text)
+    return _truncate(content, length)
+
+
+async def _generate_with_llm_async(
+    known_words: Iterable[str],
+    l_plus_one_words: Iterable[str],
+    length: int,
+) -> str:
+    """Async version of :func:`_generate_with_llm`."""
+
+    # Building the prompt may load the frequency index from disk.
+    prompt = await asyncio.to_thread(
+        build_blurb_prompt, known_words, l_plus_one_words, length
+    )
+    _log_prompt(prompt)
+    if length <= 0 or not prompt.words:
+        return ""
+    content = await get_async_llm_client().chat(prompt.text)
+    return _truncate(content, length)
+
+
+def _blurb_retries() -> int:
+    return int(os.getenv("LLM_BLURB_RETRIES", "1"))
+
+
+def _generate_checked(
+    known_words: List[str], l_plus_one_words: List[str], length: int
+) -> str:
+    """Generate an LLM blurb, rejecting and retrying out-of-vocabulary output.
+
+    Up to ``LLM_BLURB_RETRIES`` extra attempts are made; if every blurb uses
+    a disallowed word, :class:`ValueError` is raised.
+    """
+
+    vocab = get_allowed_vocabulary(known_words, l_plus_one_words)
+    for _ in range(1 + _blurb_retries()):
+        blurb = _generate_with_llm(known_words, l_plus_one_words, length)
+        if vocab.check(blurb).ok:
+            return blurb
+    raise ValueError("LLM blurb used words outside the allowed vocabulary")
+
+
+async def _generate_checked_async(
+    known_words: List[str], l_plus_one_words: List[str], length: int
+) -> str:
+    """Async version of :func:`_generate_checked`."""
+
+    vocab = await asyncio.to_thread(get_allowed_vocabulary, known_words, l_plus_one_words)
+    for _ in range(1 + _blurb_retries()):
+        blurb = await _generate_with_llm_async(known_words, l_plus_one_words, length)
+        if vocab.check(blurb).ok:
+            return blurb
+    raise ValueError("LLM blurb used words outside the allowed vocabulary")
+
+
+def _blurb_key(
+    known_words: Iterable[str], l_plus_one_words: Iterable[str], length: int
+) -> str:
+    """Cache key ignoring word order, case and duplicates."""
+
+    def norm(words: Iterable[str]) -> List[str]:
+        return sorted({w.strip().lower() for w in words})
+
+    return make_key(norm(known_words), norm(l_plus_one_words), length)
+
+
+def _blurb_inputs(
+    known_words: Iterable[str] | None,
+    l_plus_one_words: Iterable[str] | None,
+    use_llm: Optional[bool],
+) -> Tuple[List[str], List[str], bool]:
+    known_words = list(known_words or [])
+    l_plus_one_words = list(l_plus_one_words or [])
+    if not known_words and not l_plus_one_words:
+        known_words = get_top_coca_words()
+        l_plus_one_words = []
+    if use_llm is None:
+        use_llm = os.getenv("USE_LLM_BLURB", "").lower() in {"1", "true", "yes"}
+    return known_words, l_plus_one_words, use_llm
+
+
 def generate_blurb(
     known_words: Iterable[str] | None,
     l_plus_one_words: Iterable[str] | None,
@@ -83,21 +234,127 @@ def generate_blurb(
 
     If both ``known_words`` and ``l_plus_one_words`` are empty, the function
     falls back to the most common words from the COCA frequency list.
+    LLM blurbs containing words outside the allowed vocabulary are rejected
+    and regenerated (see :func:`_generate_checked`); accepted ones are
+    cached per normalised input.
     """
 
-    known_words = list(known_words or [])
-    l_plus_one_words = list(l_plus_one_words or [])
-    if not known_words and not l_plus_one_words:
-        known_words = get_top_coca_words()
-        l_plus_one_words = []
+    known_words, l_plus_one_words, use_llm = _blurb_inputs(
+        known_words, l_plus_one_words, use_llm
+    )
+    if use_llm:
+        cache = get_cache("blurbs")
+        key = _blurb_key(known_words, l_plus_one_words, length)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            blurb = _generate_checked(known_words, l_plus_one_words, length)
+        except Exception:
+            pass
+        else:
+            cache.set(key, blurb)
+            return blurb
+    return _generate_simple(known_words, l_plus_one_words, length)
 
-    if use_llm is None:
-        use_llm = os.getenv("USE_LLM_BLURB", "").lower() in {"1", "true", "yes"}
 
+async def generate_blurb_async(
+    known_words: Iterable[str] | None,
+    l_plus_one_words: Iterable[str] | None,
+    length: int,
+    use_llm: Optional[bool] = None,
+) -> str:
+    """Async version of :func:`generate_blurb` for use inside an event loop.
+
+    The LLM is called through the shared async client, so waiting for a
+    completion does not tie up a worker thread.  Cache lookups, which may hit
+    the SQLite tier, run in a worker thread to keep the event loop free.
+    """
+
+    known_words, l_plus_one_words, use_llm = _blurb_inputs(
+        known_words, l_plus_one_words, use_llm
+    )
     if use_llm:
+        cache = get_cache("blurbs")
+        key = _blurb_key(known_words, l_plus_one_words, length)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
         try:
-            return _generate_with_llm(known_words, l_plus_one_words, length)
+            blurb = await _generate_checked_async(known_words, l_plus_one_words, length)
         except Exception:
             pass
+        else:
+            await asyncio.to_thread(cache.set, key, blurb)
+            return blurb
     return _generate_simple(known_words, l_plus_one_words, length)
 
+
+async def _split_words(pieces: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Re-chunk streamed text fragments into whitespace-separated words."""
+
+    carry = ""
+    async for piece in pieces:
+        parts = (carry + piece).split()
+        if not parts:
+            carry = ""
+            continue
+        # The last part may continue in the next fragment.
+        carry = "" if piece[-1:].isspace() else parts.pop()
+        for word in parts:
+            yield word
+    if carry:
+        yield carry
+
+
+async def stream_blurb(
+    known_words: Iterable[str] | None,
+    l_plus_one_words: Iterable[str] | None,
+    length: int,
+) -> AsyncIterator[str]:
+    """Yield the words of an LLM blurb as the completion streams in.
+
+    Each word is checked against the allowed vocabulary as it arrives and
+    dropped if it contains any other token.  The stream is closed as soon as
+    ``length`` words have been emitted, so the LLM stops generating instead
+    of being truncated afterwards.  If the request fails, or produces no
+    usable word, before anything is emitted, the deterministic generator's
+    words are yielded instead.
+    """
+
+    known_words, l_plus_one_words, _ = _blurb_inputs(known_words, l_plus_one_words, True)
+    allowed_words = list(dict.fromkeys(l_plus_one_words + known_words))
+    if length <= 0 or not allowed_words:
+        return
+
+    cache = get_cache("blurbs")
+    key = _blurb_key(known_words, l_plus_one_words, length)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        for word in cached.split():
+            yield word
+        return
+
+    vocab = await asyncio.to_thread(get_allowed_vocabulary, known_words, l_plus_one_words)
+    emitted: List[str] = []
+    prompt = (
+        await asyncio.to_thread(build_blurb_prompt, known_words, l_plus_one_words, length)
+    ).text
+    try:
+        async with aclosing(get_async_llm_client().stream_chat(prompt)) as pieces:
+            async with aclosing(_split_words(pieces)) as words:
+                async for word in words:
+                    if not vocab.allows(word):
+                        continue
+                    emitted.append(word)
+                    yield word
+                    if len(emitted) >= length:
+                        break
+    except Exception:
+        if emitted:
+            return
+    if emitted:
+        await asyncio.to_thread(cache.set, key, " ".join(emitted))
+        return
+    for word in _generate_simple(known_words, l_plus_one_words, length).split():
+        yield word
@@ -1,12 +1,16 @@
 """Minimal helpers for AI-driven lesson generation."""
 
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
 import json
 import os
 import random
 
-import requests
-
+from .cache import get_cache, make_key
+from .distractor_bank import lookup_distractors
+from .llm_client import get_async_llm_client, get_llm_client
+from .sentence_index import SentenceIndex
 from .vocabulary import get_top_coca_words
 
 
@@ -29,33 +33,78 @@ def generate_lesson(topic: str, vocabulary: Optional[List[str]] = None) -> Dict[
     return lesson
 
 
-def _generate_distractors_llm(word: str) -> List[str]:
-    """Return distractors for *word* using an LLM service."""
-
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-    api_key = os.getenv("AZURE_OPENAI_API_KEY")
-    if not (endpoint and deployment and api_key):
-        raise RuntimeError("Azure OpenAI configuration missing")
-
-    url = (
-        f"{endpoint}/openai/deployments/{deployment}/chat/completions"
-        "?api-version=2025-01-01-preview"
-    )
-    prompt = (
+def _distractor_prompt(word: str) -> str:
+    return (
         "Provide three plausible but incorrect distractor answers for a "
         f"vocabulary question about the word '{word}'. Return the answers as a "
         "JSON array of strings."
     )
-    res = requests.post(
-        url,
-        headers={"api-key": api_key, "Content-Type": "application/json"},
-        json={"messages": [{"role": "user", "content": prompt}]},
-        timeout=15,
+
+
+def _distractor_batch_prompt(words: List[str]) -> str:
+    return (
+        "For each of the following vocabulary words provide three plausible "
+        "but incorrect distractor answers for a vocabulary question about the "
+        f"word: {json.dumps(words, ensure_ascii=False)}. Return a JSON object "
+        "mapping each word to a JSON array of strings."
     )
-    res.raise_for_status()
-    content = res.json()["choices"][0]["message"]["content"]
-    return json.loads(content)
+
+
+def _is_distractor_list(value: object) -> bool:
+    return isinstance(value, list) and all(isinstance(d, str) for d in value)
+
+
+def _parse_distractor_list(content: str) -> List[str]:
+    reply = json.loads(content)
+    if not _is_distractor_list(reply):
+        raise ValueError("Expected a JSON array of distractor strings")
+    return reply
+
+
+def _parse_distractor_map(content: str, words: List[str]) -> Dict[str, List[str]]:
+    reply = json.loads(content)
+    if not isinstance(reply, dict):
+        raise ValueError("Expected a JSON object of distractors")
+    return {
+        word: list(reply[word])
+        for word in words
+        if _is_distractor_list(reply.get(word))
+    }
+
+
+def _generate_distractors_llm(word: str) -> List[str]:
+    """Return distractors for *word* using an LLM service.
+
+    Raises :class:`ValueError` unless the reply is a JSON array of strings.
+    """
+
+    content = get_llm_client().chat(_distractor_prompt(word))
+    return _parse_distractor_list(content)
+
+
+async def _generate_distractors_llm_async(word: str) -> List[str]:
+    """Async version of :func:`_generate_distractors_llm`."""
+
+    content = await get_async_llm_client().chat(_distractor_prompt(word))
+    return _parse_distractor_list(content)
+
+
+def _generate_distractors_llm_batch(words: List[str]) -> Dict[str, List[str]]:
+    """Return distractors for all *words* from a single LLM request.
+
+    Entries missing from the reply or not shaped as a list of strings are
+    dropped, so callers must be prepared to fill gaps.
+    """
+
+    content = get_llm_client().chat(_distractor_batch_prompt(words))
+    return _parse_distractor_map(content, words)
+
+
+async def _generate_distractors_llm_batch_async(words: List[str]) -> Dict[str, List[str]]:
+    """Async version of :func:`_generate_distractors_llm_batch`."""
+
+    content = await get_async_llm_client().chat(_distractor_batch_prompt(words))
+    return _parse_distractor_map(content, words)
 
 
 def _generate_distractors_simple(word: str) -> List[str]:
@@ -64,43 +113,180 @@ def _generate_distractors_simple(word: str) -> List[str]:
     return [f"{word}_{suffix}" for suffix in ("a", "b", "c")]
 
 
+def _use_llm_distractors() -> bool:
+    return os.getenv("USE_LLM_DISTRACTORS", "").lower() in {"1", "true", "yes"}
+
+
+def _distractor_key(word: str) -> str:
+    return make_key(word.strip().lower())
+
+
+def _fetch_distractors(word: str) -> List[str]:
+    """Ask the LLM for distractors, caching successes and falling back on errors."""
+
+    try:
+        distractors = _generate_distractors_llm(word)
+    except Exception:
+        return _generate_distractors_simple(word)
+    get_cache("distractors").set(_distractor_key(word), distractors)
+    return distractors
+
+
+async def _fetch_distractors_async(word: str) -> List[str]:
+    """Async version of :func:`_fetch_distractors`."""
+
+    try:
+        distractors = await _generate_distractors_llm_async(word)
+    except Exception:
+        return _generate_distractors_simple(word)
+    await asyncio.to_thread(get_cache("distractors").set, _distractor_key(word), distractors)
+    return distractors
+
+
 def _generate_distractors(word: str) -> List[str]:
-    """Return distractors for *word*, optionally using an LLM service."""
+    """Return distractors for *word*, optionally using an LLM service.
+
+    The precomputed distractor bank is consulted first.  LLM results for
+    words outside the bank are cached per normalised word, so repeated
+    lessons reuse them until they expire.
+    """
+
+    banked = lookup_distractors(word)
+    if banked is not None:
+        return banked
+    if _use_llm_distractors():
+        cached = get_cache("distractors").get(_distractor_key(word))
+        if cached is not None:
+            return list(cached)
+        return _fetch_distractors(word)
+    return _generate_distractors_simple(word)
+
+
+def _resolve_distractors_offline(
+    words: Iterable[str],
+) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Return distractors available without the LLM and the words still missing.
+
+    Banked words are always resolved.  Without ``USE_LLM_DISTRACTORS`` the
+    rest get placeholder distractors; otherwise cached LLM results are used
+    and the remaining words are returned as missing.
+    """
+
+    result: Dict[str, List[str]] = {}
+    unbanked: List[str] = []
+    for word in dict.fromkeys(words):
+        banked = lookup_distractors(word)
+        if banked is not None:
+            result[word] = banked
+        else:
+            unbanked.append(word)
+    if not _use_llm_distractors():
+        result.update((word, _generate_distractors_simple(word)) for word in unbanked)
+        return result, []
+
+    cache = get_cache("distractors")
+    missing: List[str] = []
+    for word in unbanked:
+        cached = cache.get(_distractor_key(word))
+        if cached is not None:
+            result[word] = list(cached)
+        else:
+            missing.append(word)
+    return result, missing
+
+
+def _cache_distractors(fetched: Dict[str, List[str]]) -> None:
+    cache = get_cache("distractors")
+    for word, distractors in fetched.items():
+        cache.set(_distractor_key(word), distractors)
+
+
+def _generate_distractors_batch(
+    words: Iterable[str], max_workers: int = 8
+) -> Dict[str, List[str]]:
+    """Return distractors for every word in *words*.
 
-    if os.getenv("USE_LLM_DISTRACTORS", "").lower() in {"1", "true", "yes"}:
+    Words in the precomputed bank never reach the network.  For the others,
+    with ``USE_LLM_DISTRACTORS`` enabled, cached distractors are used first
+    and the remaining words are requested in one batched prompt.  Any word
+    the reply does not cover is then fetched with per-word requests issued
+    concurrently, each falling back to the deterministic distractors on
+    failure.  A lesson therefore costs at most roughly one LLM round trip
+    instead of one per word.
+    """
+
+    result, missing = _resolve_distractors_offline(words)
+    if len(missing) > 1:
         try:
-            return _generate_distractors_llm(word)
+            fetched = _generate_distractors_llm_batch(missing)
         except Exception:
-            pass
-    return _generate_distractors_simple(word)
+            fetched = {}
+        _cache_distractors(fetched)
+        result.update(fetched)
+        missing = [word for word in missing if word not in result]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            result.update(zip(missing, pool.map(_fetch_distractors, missing)))
+    return result
 
 
-def generate_mcq_lesson(
-    topic: str,
-    new_words: list[str] | None = None,
-    review_words: list[str] | None = None,
-) -> List[Dict[str, object]]:
-    """Return a sequence of MCQ prompts and grammar micro-lessons.
+async def _generate_distractors_batch_async(words: Iterable[str]) -> Dict[str, List[str]]:
+    """Async version of :func:`_generate_distractors_batch`.
 
-    The resulting lesson alternates between multiple-choice questions for new
-    and review vocabulary and simple grammar tips.  Each word yields an MCQ
-    followed by a grammar hint.  ``new_words`` and ``review_words`` are
-    interleaved so that learners constantly revisit prior material while
-    encountering new vocabulary.  If either list is missing or empty,
-    ``get_top_coca_words`` is used as a fallback so the lesson always has
-    material to draw from.
+    Per-word fallback requests run concurrently on the event loop, bounded
+    by the async client's concurrency limit.  Bank and cache access, which
+    may read files or the SQLite cache tier, runs in worker threads.
     """
 
-    if not new_words:
-        new_words = get_top_coca_words()
-    if not review_words:
-        review_words = get_top_coca_words()
+    result, missing = await asyncio.to_thread(_resolve_distractors_offline, list(words))
+    if len(missing) > 1:
+        try:
+            fetched = await _generate_distractors_llm_batch_async(missing)
+        except Exception:
+            fetched = {}
+        await asyncio.to_thread(_cache_distractors, fetched)
+        result.update(fetched)
+        missing = [word for word in missing if word not in result]
+    if missing:
+        fetched_each = await asyncio.gather(*map(_fetch_distractors_async, missing))
+        result.update(zip(missing, fetched_each))
+    return result
+
+
+def _mcq_lesson_words(
+    new_words: list[str] | None, review_words: list[str] | None
+) -> Tuple[List[str], List[str]]:
+    return new_words or get_top_coca_words(), review_words or get_top_coca_words()
+
+
+def _attach_example(
+    entry: Dict[str, object],
+    sentence_index: Optional[SentenceIndex],
+    known_words: Iterable[str],
+) -> Dict[str, object]:
+    """Add an ``example`` sentence in which the entry's word is the only unknown."""
+
+    if sentence_index is not None:
+        examples = sentence_index.examples(str(entry["word"]), known_words, limit=1)
+        if examples:
+            entry["example"] = examples[0]
+    return entry
+
+
+def _build_mcq_lesson(
+    new_words: List[str],
+    review_words: List[str],
+    distractors: Dict[str, List[str]],
+    sentence_index: Optional[SentenceIndex] = None,
+    known_words: Iterable[str] = (),
+) -> List[Dict[str, object]]:
+    known_words = list(known_words)
 
     def mcq_entry(word: str) -> Dict[str, object]:
         answer = f"meaning of {word}"
-        choices = [answer] + _generate_distractors(word)
+        choices = [answer] + distractors[word]
         random.shuffle(choices)
-        return {
+        entry: Dict[str, object] = {
             "type": "mcq",
             "word": word,
             "question": f"What is the meaning of '{word}'?",
@@ -108,6 +294,7 @@ def generate_mcq_lesson(
             "answer": answer,
             "answer_index": choices.index(answer),
         }
+        return _attach_example(entry, sentence_index, known_words)
 
     def grammar_entry(word: str) -> Dict[str, str]:
         return {
@@ -129,6 +316,52 @@ def generate_mcq_lesson(
     return lesson
 
 
+def generate_mcq_lesson(
+    topic: str,
+    new_words: list[str] | None = None,
+    review_words: list[str] | None = None,
+    sentence_index: Optional[SentenceIndex] = None,
+    known_words: Iterable[str] = (),
+) -> List[Dict[str, object]]:
+    """Return a sequence of MCQ prompts and grammar micro-lessons.
+
+    The resulting lesson alternates between multiple-choice questions for new
+    and review vocabulary and simple grammar tips.  Each word yields an MCQ
+    followed by a grammar hint.  ``new_words`` and ``review_words`` are
+    interleaved so that learners constantly revisit prior material while
+    encountering new vocabulary.  If either list is missing or empty,
+    ``get_top_coca_words`` is used as a fallback so the lesson always has
+    material to draw from.
+
+    With a ``sentence_index``, each MCQ gets an ``example`` sentence whose
+    only word outside ``known_words`` is the word being tested, when the
+    index has one.
+    """
+
+    new_words, review_words = _mcq_lesson_words(new_words, review_words)
+    distractors = _generate_distractors_batch(new_words + review_words)
+    return _build_mcq_lesson(
+        new_words, review_words, distractors, sentence_index, known_words
+    )
+
+
+async def generate_mcq_lesson_async(
+    topic: str,
+    new_words: list[str] | None = None,
+    review_words: list[str] | None = None,
+    sentence_index: Optional[SentenceIndex] = None,
+    known_words: Iterable[str] = (),
+) -> List[Dict[str, object]]:
+    """Async version of :func:`generate_mcq_lesson`."""
+
+    new_words, review_words = _mcq_lesson_words(new_words, review_words)
+    distractors = await _generate_distractors_batch_async(new_words + review_words)
+    # Example lookups query the sentence index's SQLite file.
+    return await asyncio.to_thread(
+        _build_mcq_lesson, new_words, review_words, distractors, sentence_index, known_words
+    )
+
+
 if __name__ == "__main__":  # pragma: no cover - example usage
     sample = generate_lesson("travel", ["ticket", "airport"])
     print(sample)
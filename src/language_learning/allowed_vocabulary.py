@@ -0,0 +1,115 @@
+"""Compiled allowed-vocabulary checks for generated text.
+
+Blurbs must only use a learner's known and L+1 words.  :class:`AllowedVocabulary`
+compiles those lists once into a frozen token set, using the same
+tokenization as :func:`~language_learning.vocabulary.extract_vocabulary`, and
+validates a text in a single pass, reporting coverage and the out-of-vocabulary
+tokens.  :func:`get_allowed_vocabulary` keeps recently compiled vocabularies
+so repeated requests for the same learner reuse them.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, List, Tuple
+
+from .vocabulary import iter_tokens
+
+
+def _tokens(words: Iterable[str]) -> FrozenSet[str]:
+    # Join with spaces: iter_tokens treats its pieces as one continuous text.
+    return frozenset(iter_tokens([" ".join(words)]))
+
+
+@dataclass(frozen=True)
+class CoverageReport:
+    """Result of checking a text against an :class:`AllowedVocabulary`."""
+
+    total: int
+    allowed: int
+    oov: List[str] = field(default_factory=list)
+    l_plus_one_used: List[str] = field(default_factory=list)
+
+    @property
+    def coverage(self) -> float:
+        """Share of tokens that are allowed; ``1.0`` for an empty text."""
+
+        return self.allowed / self.total if self.total else 1.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.oov
+
+
+@dataclass(frozen=True)
+class AllowedVocabulary:
+    """Frozen set of allowed tokens plus the L+1 subset being practised."""
+
+    tokens: FrozenSet[str]
+    l_plus_one: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_words(
+        cls, known_words: Iterable[str], l_plus_one_words: Iterable[str] = ()
+    ) -> "AllowedVocabulary":
+        l_plus_one = _tokens(l_plus_one_words)
+        return cls(_tokens(known_words) | l_plus_one, l_plus_one)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.tokens
+
+    def allows(self, text: str) -> bool:
+        """Return whether *text* has at least one token and all are allowed."""
+
+        tokens = list(iter_tokens([text]))
+        return bool(tokens) and all(token in self.tokens for token in tokens)
+
+    def check(self, text: str) -> CoverageReport:
+        """Tokenize *text* once and report coverage.
+
+        ``oov`` lists each disallowed token once, in order of first
+        appearance; ``l_plus_one_used`` does the same for L+1 tokens.
+        """
+
+        total = allowed = 0
+        oov: "OrderedDict[str, None]" = OrderedDict()
+        used: "OrderedDict[str, None]" = OrderedDict()
+        for token in iter_tokens([text]):
+            total += 1
+            if token in self.tokens:
+                allowed += 1
+                if token in self.l_plus_one:
+                    used[token] = None
+            else:
+                oov[token] = None
+        return CoverageReport(total, allowed, list(oov), list(used))
+
+
+_compiled: "OrderedDict[Tuple[FrozenSet[str], FrozenSet[str]], AllowedVocabulary]" = OrderedDict()
+_compiled_lock = threading.Lock()
+MAX_COMPILED = 256
+
+
+def get_allowed_vocabulary(
+    known_words: Iterable[str], l_plus_one_words: Iterable[str] = ()
+) -> AllowedVocabulary:
+    """Return the compiled vocabulary for these word lists.
+
+    Up to ``MAX_COMPILED`` vocabularies are kept, least recently used first
+    out, keyed on the word sets so order and duplicates do not matter.
+    """
+
+    key = (frozenset(known_words), frozenset(l_plus_one_words))
+    with _compiled_lock:
+        vocab = _compiled.get(key)
+        if vocab is not None:
+            _compiled.move_to_end(key)
+            return vocab
+    vocab = AllowedVocabulary.from_words(*key)
+    with _compiled_lock:
+        _compiled[key] = vocab
+        while len(_compiled) > MAX_COMPILED:
+            _compiled.popitem(last=False)
+    return vocab
@@ -2,21 +2,30 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import asdict
+import json
 import os
-from tempfile import NamedTemporaryFile
-from typing import List, Optional
+import threading
+from typing import List, Optional, Tuple, Union
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from .ai_lessons import generate_lesson, generate_mcq_lesson
-from .ai_blurbs import generate_blurb
+from .ai_lessons import generate_lesson, generate_mcq_lesson_async
+from .ai_blurbs import generate_blurb_async, stream_blurb
+from .distractor_bank import get_distractor_bank
+from .frequency import get_frequency_index
 from .goals import GoalItem, GoalManager, load_default_goals
-from .media_integration import suggest_media
-from .storage import JSONStorage
-from .vocabulary import extract_vocabulary, get_top_coca_words
+from .media_integration import (
+    suggest_comprehensible_media,
+    suggest_media,
+    suggest_media_batch,
+)
+from .storage import DEFAULT_USER_ID, ShardedSQLiteStorage, Storage, open_storage
+from .vocabulary import count_tokens, get_top_coca_words, rank_vocabulary
 
 
 class GoalIn(BaseModel):
@@ -26,6 +35,8 @@ class GoalIn(BaseModel):
 
 class VocabularyIn(BaseModel):
     corpus: str
+    limit: Optional[int] = Field(default=None, ge=0)
+    offset: int = Field(default=0, ge=0)
 
 
 class LessonPromptsIn(BaseModel):
@@ -40,18 +51,73 @@ class BlurbIn(BaseModel):
     length: int = 0
 
 
-def create_app(storage: Optional[JSONStorage] = None) -> FastAPI:
-    """Application factory used by tests and external runners."""
+class MediaBatchIn(BaseModel):
+    words: List[str]
+    level: int
+    per_word_limit: Optional[int] = Field(default=None, ge=1)
 
-    store = storage or JSONStorage(os.environ.get("DATA_PATH", "storage.json"))
-    goal_manager = GoalManager()
-    stored_goals = store.load_goals()
-    if not stored_goals:
-        stored_goals = list(load_default_goals())
-        if stored_goals:
-            store.save_goals(stored_goals)
-    for item in stored_goals:
-        goal_manager.create_goal(item)
+
+class ComprehensibleMediaIn(BaseModel):
+    known_words: List[str]
+    k: int = Field(default=10, ge=1)
+    max_coverage: Optional[float] = Field(default=None, ge=0, le=1)
+
+
+def create_app(
+    storage: Optional[Union[Storage, ShardedSQLiteStorage]] = None,
+    max_cached_users: int = 1024,
+) -> FastAPI:
+    """Application factory used by tests and external runners.
+
+    Without an explicit *storage* the store at ``DATA_PATH`` is opened;
+    ``STORAGE_BACKEND`` (``json``, ``sqlite`` or ``sharded``) overrides the
+    backend otherwise inferred from the file extension.
+
+    Endpoints identify the learner with the ``X-User-Id`` header.  With a
+    :class:`ShardedSQLiteStorage` every learner has their own goals and at
+    most ``max_cached_users`` goal lists are kept in memory; single-user
+    stores serve the same data to every id.
+    """
+
+    store = storage or open_storage(
+        os.environ.get("DATA_PATH", "storage.json"),
+        os.environ.get("STORAGE_BACKEND") or None,
+    )
+    multi_user = isinstance(store, ShardedSQLiteStorage)
+    managers: "OrderedDict[str, Tuple[GoalManager, Storage]]" = OrderedDict()
+    managers_lock = threading.Lock()
+
+    def user_goals(user_id: str) -> Tuple[GoalManager, Storage]:
+        """Return the cached goal manager and store for *user_id*."""
+
+        key = user_id if multi_user else DEFAULT_USER_ID
+        with managers_lock:
+            if key in managers:
+                managers.move_to_end(key)
+                return managers[key]
+        # Load outside the lock so one slow shard does not stall other users.
+        user_store = store.for_user(key) if multi_user else store
+        goal_manager = GoalManager()
+        stored_goals = user_store.load_goals()
+        if not stored_goals:
+            stored_goals = list(load_default_goals())
+            if stored_goals:
+                user_store.save_goals(stored_goals)
+        for item in stored_goals:
+            goal_manager.create_goal(item)
+        with managers_lock:
+            entry = managers.setdefault(key, (goal_manager, user_store))
+            while len(managers) > max_cached_users:
+                managers.popitem(last=False)
+            return entry
+
+    if not multi_user:
+        user_goals(DEFAULT_USER_ID)
+
+    # Load the file-backed word lists now rather than on the event loop
+    # during the first async request.
+    get_frequency_index()
+    get_distractor_bank()
 
     app = FastAPI()
     # Allow cross-origin requests so the frontend can access the API from a
@@ -66,51 +132,55 @@ def create_app(storage: Optional[JSONStorage] = None) -> FastAPI:
     )
 
     @app.post("/goals")
-    def add_goal(goal: GoalIn):
+    def add_goal(goal: GoalIn, x_user_id: str = Header(DEFAULT_USER_ID)):
+        goal_manager, user_store = user_goals(x_user_id)
         item = GoalItem(goal.word, goal.weight)
         goal_manager.create_goal(item)
-        store.save_goals(goal_manager.list_goals())
+        user_store.upsert_goal(item)
         return {"goals": [asdict(g) for g in goal_manager.list_goals()]}
 
     @app.get("/goals")
-    def list_goals():
+    def list_goals(x_user_id: str = Header(DEFAULT_USER_ID)):
+        goal_manager, _ = user_goals(x_user_id)
         return {"goals": [asdict(g) for g in goal_manager.list_goals()]}
 
     @app.get("/lesson")
     def lesson(topic: str):
         return generate_lesson(topic)
 
+    # Endpoints that may call the LLM are async so waiting on the upstream
+    # does not occupy the worker threads serving the other endpoints.
     @app.post("/lesson/prompts")
-    def lesson_prompts(data: LessonPromptsIn):
+    async def lesson_prompts(data: LessonPromptsIn):
         new_words = data.new_words or get_top_coca_words()
         review_words = data.review_words or get_top_coca_words()
-        prompts = generate_mcq_lesson(data.topic, new_words, review_words)
+        prompts = await generate_mcq_lesson_async(data.topic, new_words, review_words)
         return {"prompts": prompts}
 
     @app.post("/vocabulary")
     def vocabulary(data: VocabularyIn):
-        with NamedTemporaryFile("w+", encoding="utf-8", delete=False) as tmp:
-            tmp.write(data.corpus)
-            tmp.flush()
-            path = tmp.name
-        try:
-            words = extract_vocabulary(path)
-        finally:
-            os.unlink(path)
-        return {"vocabulary": words}
+        counts = count_tokens([data.corpus])
+        total = len(counts)
+        words = rank_vocabulary(counts, limit=data.limit, offset=data.offset)
+        return {
+            "vocabulary": words,
+            "total": total,
+            "offset": data.offset,
+            "limit": data.limit,
+        }
 
     @app.post("/blurb")
-    def blurb(data: BlurbIn):
+    async def blurb(data: BlurbIn):
         known_words = data.known_words or get_top_coca_words()
         l_plus_one_words = data.l_plus_one_words or get_top_coca_words()
-        text = generate_blurb(known_words, l_plus_one_words, data.length)
+        text = await generate_blurb_async(known_words, l_plus_one_words, data.length)
         return {"blurb": text}
 
     @app.post("/blurb/llm")
-    def blurb_llm(data: BlurbIn):
+    async def blurb_llm(data: BlurbIn):
         known_words = data.known_words or get_top_coca_words()
         l_plus_one_words = data.l_plus_one_words or get_top_coca_words()
-        text = generate_blurb(
+        text = await generate_blurb_async(
             known_words,
             l_plus_one_words,
             data.length,
@@ -118,10 +188,38 @@ def create_app(storage: Optional[JSONStorage] = None) -> FastAPI:
         )
         return {"blurb": text}
 
+    @app.post("/blurb/llm/stream")
+    async def blurb_llm_stream(data: BlurbIn):
+        """Stream blurb words as server-sent events.
+
+        Each word arrives as a ``data: {"word": ...}`` event; a final
+        ``done`` event carries the complete blurb.
+        """
+
+        known_words = data.known_words or get_top_coca_words()
+        l_plus_one_words = data.l_plus_one_words or get_top_coca_words()
+
+        async def events():
+            words: List[str] = []
+            async for word in stream_blurb(known_words, l_plus_one_words, data.length):
+                words.append(word)
+                yield f"data: {json.dumps({'word': word})}\n\n"
+            yield f"event: done\ndata: {json.dumps({'blurb': ' '.join(words)})}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
     @app.get("/media")
     def media(word: str, level: int):
         return suggest_media(word, level)
 
+    @app.post("/media/batch")
+    def media_batch(data: MediaBatchIn):
+        return suggest_media_batch(data.words, data.level, data.per_word_limit)
+
+    @app.post("/media/comprehensible")
+    def media_comprehensible(data: ComprehensibleMediaIn):
+        return suggest_comprehensible_media(data.known_words, data.k, data.max_coverage)
+
     return app
 
 
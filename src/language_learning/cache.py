@@ -0,0 +1,255 @@
+"""Small TTL + LRU cache for expensive LLM results.
+
+Distractors for a word and blurbs for a given vocabulary do not depend on the
+learner, so generated results are worth reusing.  :class:`TTLCache` keeps an
+in-process LRU map whose entries expire after a time-to-live and can be
+backed by an on-disk SQLite tier shared between processes and restarts.
+Hit and miss counters make the cache's effectiveness observable.
+
+Shared caches are obtained with :func:`get_cache`, configured from the
+environment: ``LLM_CACHE_SIZE`` (entries kept in memory, ``0`` disables
+caching), ``LLM_CACHE_TTL`` (seconds) and ``LLM_CACHE_PATH`` (SQLite file for
+the disk tier, unset for memory only).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL = 24 * 60 * 60.0
+
+
+# ``cache_counts`` tracks the rows per namespace through triggers, so the
+# disk tier can be trimmed without counting its rows.  Writes use an upsert,
+# which fires the insert trigger only for new keys.
+_DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL, key TEXT NOT NULL,
+    value TEXT NOT NULL, expires REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (namespace, expires);
+CREATE TABLE IF NOT EXISTS cache_counts (
+    namespace TEXT PRIMARY KEY, rows INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS cache_counts_insert AFTER INSERT ON cache BEGIN
+    INSERT INTO cache_counts VALUES (NEW.namespace, 1)
+    ON CONFLICT (namespace) DO UPDATE SET rows = rows + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_counts_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_counts SET rows = rows - 1 WHERE namespace = OLD.namespace;
+END;
+"""
+
+
+class TTLCache:
+    """LRU cache of JSON-serialisable values with per-entry expiry.
+
+    Parameters
+    ----------
+    maxsize:
+        Maximum number of entries kept in memory; the least recently used
+        entry is evicted first.  ``0`` disables the cache entirely.
+    ttl:
+        Seconds an entry stays valid after it was stored.
+    path:
+        Optional SQLite file used as a second tier.  Memory misses fall back
+        to it and hits are promoted into memory.
+    namespace:
+        Prefix separating independent caches stored in the same file.
+    disk_maxsize:
+        Maximum number of rows kept per namespace in the disk tier.  The
+        limit is enforced every *disk_evict_every* writes, dropping expired
+        rows and then those closest to expiry, so the tier can briefly hold
+        up to that many extra rows.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        ttl: float = DEFAULT_TTL,
+        path: Optional[str] = None,
+        namespace: str = "default",
+        disk_maxsize: int = 100_000,
+        disk_evict_every: int = 256,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.namespace = namespace
+        self.disk_maxsize = disk_maxsize
+        self.disk_evict_every = max(1, disk_evict_every)
+        self._disk_writes = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path and maxsize > 0:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            seed_counts = not self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'cache_counts'"
+            ).fetchone()
+            self._db.executescript(_DISK_SCHEMA)
+            if seed_counts:
+                # Files written before row counting existed.
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache_counts "
+                        "SELECT namespace, COUNT(*) FROM cache GROUP BY namespace"
+                    )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for *key* or *default* if absent or expired."""
+
+        if self.maxsize <= 0:
+            return default
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            entry = self._disk_get(key, now)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._store(key, entry)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store *value* under *key* in memory and, if configured, on disk."""
+
+        if self.maxsize <= 0:
+            return
+        entry = (self._clock() + self.ttl, value)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT INTO cache VALUES (?, ?, ?, ?) ON CONFLICT (namespace, key) "
+                    "DO UPDATE SET value = excluded.value, expires = excluded.expires",
+                    (self.namespace, key, json.dumps(value), entry[0]),
+                )
+                self._disk_writes += 1
+                if self._disk_writes >= self.disk_evict_every:
+                    self._disk_writes = 0
+                    self._disk_evict(entry[0] - self.ttl)
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop all entries, including this namespace's disk rows, and reset counters."""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of in-memory entries."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _store(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _disk_evict(self, now: float) -> None:
+        """Trim this namespace's disk rows to ``disk_maxsize``.
+
+        The row count comes from ``cache_counts`` and both deletes walk the
+        ``(namespace, expires)`` index from the oldest end, so the cost is
+        proportional to the rows removed.
+        """
+
+        assert self._db is not None
+        self._db.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires <= ?", (self.namespace, now)
+        )
+        row = self._db.execute(
+            "SELECT rows FROM cache_counts WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        rows = row[0] if row else 0
+        if rows > self.disk_maxsize:
+            self._db.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache "
+                "WHERE namespace = ? ORDER BY expires LIMIT ?)",
+                (self.namespace, rows - self.disk_maxsize),
+            )
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._db.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+            self._db.commit()
+            return None
+        return row[1], json.loads(row[0])
+
+
+def make_key(*parts: Any) -> str:
+    """Return a stable string key for JSON-serialisable *parts*."""
+
+    return json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str) -> TTLCache:
+    """Return the shared cache for *namespace*, creating it from the environment."""
+
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = TTLCache(
+                maxsize=int(os.getenv("LLM_CACHE_SIZE", DEFAULT_MAXSIZE)),
+                ttl=float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL)),
+                path=os.getenv("LLM_CACHE_PATH") or None,
+                namespace=namespace,
+            )
+        return cache
+
+
+def reset_caches() -> None:
+    """Forget all shared caches so they are rebuilt from the environment."""
+
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
@@ -0,0 +1,172 @@
+"""Precomputed multiple-choice distractors for the COCA word list.
+
+Distractors only depend on the target word, so they can be generated once,
+offline, and shipped with the package.  The bank is a tab-separated file with
+one ``word<TAB>distractor<TAB>...`` line per word.  It is built by running::
+
+    python -m language_learning.distractor_bank [--llm] [COCA.csv] [OUT.tsv]
+
+The default builder is deterministic: for each word it picks the words of
+similar frequency (within ``band`` ranks) that are closest in spelling, so
+distractors look and feel like the answer.  ``--llm`` asks the configured LLM
+instead, keeping heuristic distractors for any word the model skips.
+
+At runtime :func:`lookup_distractors` consults the bank, which is loaded once
+per path.  ``DISTRACTOR_BANK_PATH`` overrides the bundled file.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .frequency import FrequencyIndex, get_frequency_index
+
+DEFAULT_BANK_PATH = Path(__file__).with_name("distractors.tsv")
+DISTRACTORS_PER_WORD = 3
+
+Bank = Dict[str, Tuple[str, ...]]
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Return the Levenshtein distance between *a* and *b*."""
+
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+def build_distractor_bank(
+    index: FrequencyIndex,
+    band: int = 50,
+    count: int = DISTRACTORS_PER_WORD,
+) -> Bank:
+    """Choose *count* distractors for every word in *index*.
+
+    Candidates are the words within *band* ranks of the target.  They are
+    ordered by edit distance, then by rank distance and finally
+    alphabetically, so the result is deterministic.
+    """
+
+    words = index.words
+    bank: Bank = {}
+    for pos, word in enumerate(words):
+        lo, hi = max(0, pos - band), min(len(words), pos + band + 1)
+        candidates = [
+            (edit_distance(word, other), abs(pos - other_pos), other)
+            for other_pos, other in enumerate(words[lo:hi], lo)
+            if other != word
+        ]
+        candidates.sort()
+        bank[word] = tuple(other for _, _, other in candidates[:count])
+    return bank
+
+
+def build_distractor_bank_llm(
+    index: FrequencyIndex, batch_size: int = 50
+) -> Bank:
+    """Like :func:`build_distractor_bank` but asking the LLM per batch of words.
+
+    Words missing from a reply, and whole batches whose request fails, keep
+    their heuristic distractors.
+    """
+
+    from .ai_lessons import _generate_distractors_llm_batch
+
+    bank = build_distractor_bank(index)
+    words = list(index.words)
+    for start in range(0, len(words), batch_size):
+        try:
+            fetched = _generate_distractors_llm_batch(words[start : start + batch_size])
+        except Exception:
+            continue
+        for word, distractors in fetched.items():
+            if len(distractors) >= DISTRACTORS_PER_WORD:
+                bank[word] = tuple(distractors[:DISTRACTORS_PER_WORD])
+    return bank
+
+
+def write_distractor_bank(bank: Bank, path: Union[str, os.PathLike]) -> None:
+    """Write *bank* to *path* as TSV, one word per line."""
+
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        for word, distractors in bank.items():
+            fh.write("\t".join((word, *distractors)) + "\n")
+
+
+def read_distractor_bank(path: Union[str, os.PathLike]) -> Bank:
+    """Parse a TSV bank file written by :func:`write_distractor_bank`."""
+
+    bank: Bank = {}
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) > 1 and fields[0]:
+                bank[fields[0]] = tuple(fields[1:])
+    return bank
+
+
+_banks: Dict[str, Bank] = {}
+_banks_lock = threading.Lock()
+
+
+def get_distractor_bank(path: Union[str, os.PathLike, None] = None) -> Bank:
+    """Return the bank at *path*, loading it on first use.
+
+    *path* defaults to ``DISTRACTOR_BANK_PATH`` or the bundled file.  A
+    missing file yields an empty bank.
+    """
+
+    key = os.fspath(path or os.getenv("DISTRACTOR_BANK_PATH") or DEFAULT_BANK_PATH)
+    with _banks_lock:
+        bank = _banks.get(key)
+        if bank is None:
+            try:
+                bank = read_distractor_bank(key)
+            except OSError:
+                bank = {}
+            _banks[key] = bank
+        return bank
+
+
+def lookup_distractors(word: str) -> Optional[List[str]]:
+    """Return the precomputed distractors for *word*, or ``None`` if unknown."""
+
+    distractors = get_distractor_bank().get(word.strip().lower())
+    return list(distractors) if distractors else None
+
+
+def clear_distractor_banks() -> None:
+    """Forget all loaded banks."""
+
+    with _banks_lock:
+        _banks.clear()
+
+
+def main(argv: Sequence[str]) -> None:
+    args = list(argv)
+    use_llm = "--llm" in args
+    if use_llm:
+        args.remove("--llm")
+    if len(args) > 2:
+        raise SystemExit(
+            "usage: python -m language_learning.distractor_bank [--llm] [COCA.csv] [OUT.tsv]"
+        )
+    index = get_frequency_index(args[0] if args else None)
+    bank = build_distractor_bank_llm(index) if use_llm else build_distractor_bank(index)
+    write_distractor_bank(bank, args[1] if len(args) > 1 else DEFAULT_BANK_PATH)
+
+
+if __name__ == "__main__":  # pragma: no cover - offline build
+    main(sys.argv[1:])
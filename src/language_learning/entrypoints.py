@@ -1,155 +1,391 @@
+import argparse
 import json
+import os
+import socketserver
 import sys
+import threading
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import IO, Any, Dict
 
 from .goals import GoalManager, GoalItem, load_default_goals
 from .vocabulary import extract_vocabulary
-from .spaced_repetition import SRSFilter, SpacedRepetitionScheduler
+from .spaced_repetition import (
+    ReviewState,
+    SRSFilter,
+    SpacedRepetitionScheduler,
+    decode_review_states,
+    encode_review_states,
+    is_encoded_review_states,
+)
 from .ai_lessons import generate_lesson, generate_mcq_lesson
-from .media_integration import suggest_media, record_media_interaction
+from .media_integration import (
+    drain_media_interactions,
+    flush_media_interactions,
+    record_media_interaction,
+    suggest_comprehensible_media,
+    suggest_media,
+    suggest_media_batch,
+)
 from .ai_blurbs import generate_blurb
 
 
-def vocabulary(goals_json: str, corpus_path: str) -> None:
+# Binary stream that a ``-`` argument reads from.  Only :func:`main` binds it
+# for one-shot commands; ``serve`` uses stdin for requests, so ``-`` is
+# rejected there.
+_arg_stdin: ContextVar[IO[bytes] | None] = ContextVar("_arg_stdin", default=None)
+
+
+def _read_arg(value: str) -> bytes:
+    """Return the raw payload of a JSON or state argument.
+
+    Large payloads can bypass argv limits: ``@path`` reads the file at *path*
+    and ``-`` reads standard input (one-shot mode only, since ``serve`` uses
+    stdin for requests).  Anything else is the payload itself.
+    """
+
+    if value == "-":
+        stdin = _arg_stdin.get()
+        if stdin is None:
+            raise ValueError("'-' arguments are only supported in one-shot mode")
+        return stdin.read()
+    if value.startswith("@"):
+        with open(value[1:], "rb") as fh:
+            return fh.read()
+    return value.encode("utf-8")
+
+
+def _load_json(value: str) -> Any:
+    return json.loads(_read_arg(value))
+
+
+def _load_states(value: str) -> Dict[str, ReviewState]:
+    """Parse review state given as JSON or the compact binary encoding."""
+
+    data = _read_arg(value)
+    if is_encoded_review_states(data):
+        return decode_review_states(data)
+    return {w: ReviewState.from_dict(info) for w, info in json.loads(data).items()}
+
+
+def _load_filter(goal_ranks: Dict[str, int], states: Dict[str, ReviewState]) -> SRSFilter:
+    """Build an :class:`SRSFilter` from goal ranks and review states."""
+
+    filt = SRSFilter(goal_ranks)
+    for word, st in states.items():
+        filt.schedulers.setdefault(word, SpacedRepetitionScheduler()).state = st
+    return filt
+
+
+def vocabulary(
+    goals_json: str, corpus_path: str, limit_str: str = "", offset_str: str = "0"
+) -> dict:
     goals = json.loads(goals_json)
     manager = GoalManager()
     for g in goals:
         manager.create_goal(GoalItem(g["word"], float(g.get("weight", 1))))
-    vocab = extract_vocabulary(corpus_path, manager)
-    print(json.dumps({"vocab": vocab}))
+    limit = int(limit_str) if limit_str else None
+    vocab = extract_vocabulary(
+        corpus_path, manager, limit=limit, offset=int(offset_str)
+    )
+    return {"vocab": vocab}
 
 
-def lesson_queue(goal_ranks_json: str, goals_json: str, review_json: str) -> None:
-    goal_ranks = json.loads(goal_ranks_json)
-    goals = json.loads(goals_json)
-    review = json.loads(review_json)
+def lesson_queue(goal_ranks_json: str, goals_json: str, review_json: str) -> dict:
+    goal_ranks = _load_json(goal_ranks_json)
+    goals = _load_json(goals_json)
+    review = _load_states(review_json)
     visible_words = {g["word"] for g in goals}
-    filt = SRSFilter(goal_ranks)
-    for word, info in review.items():
-        st = filt.schedulers.setdefault(word, SpacedRepetitionScheduler()).state
-        st.repetitions = int(info.get("repetitions", 0))
-        st.interval = int(info.get("interval", 0))
-        st.efactor = float(info.get("efactor", 2.5))
-        st.next_review = datetime.fromisoformat(info["next_review"])
-    review_words: list[str] = []
-    while True:
-        nxt = filt.pop_next_due()
-        if not nxt:
-            break
-        if visible_words and nxt not in visible_words:
-            del filt.schedulers[nxt]
-            continue
-        review_words.append(nxt)
-        del filt.schedulers[nxt]
+    filt = _load_filter(goal_ranks, review)
+    review_words = [
+        w for w in filt.drain_due(datetime.now()) if not visible_words or w in visible_words
+    ]
     new_words = [
         g["word"]
         for g in goals
-        if g["word"] not in review or review[g["word"]].get("repetitions", 0) == 0
+        if g["word"] not in review or review[g["word"]].repetitions == 0
     ]
     new_words = [w for w in new_words if w not in review_words][:3]
     lesson = generate_mcq_lesson("practice", new_words, review_words)
-    print(json.dumps({"lesson": lesson, "words": list(dict.fromkeys(new_words + review_words))}))
+    return {"lesson": lesson, "words": list(dict.fromkeys(new_words + review_words))}
+
+
+def review(
+    goal_ranks_json: str,
+    state_json: str,
+    word: str,
+    quality_str: str,
+    output: str = "full",
+) -> dict:
+    """Review *word* and return the updated state.
 
+    With ``output="delta"`` only the reviewed word's state is returned
+    instead of the whole deck.
+    """
 
-def review(goal_ranks_json: str, state_json: str, word: str, quality_str: str) -> None:
-    goal_ranks = json.loads(goal_ranks_json)
-    state = json.loads(state_json)
+    if output not in {"full", "delta"}:
+        raise ValueError(f"Unknown output mode: {output}")
+    goal_ranks = _load_json(goal_ranks_json)
+    state = _load_states(state_json)
     quality = int(quality_str)
-    filt = SRSFilter(goal_ranks)
-    for w, info in state.items():
-        st = filt.schedulers.setdefault(w, SpacedRepetitionScheduler()).state
-        st.repetitions = int(info.get("repetitions", 0))
-        st.interval = int(info.get("interval", 0))
-        st.efactor = float(info.get("efactor", 2.5))
-        st.next_review = datetime.fromisoformat(info["next_review"])
+    filt = _load_filter(goal_ranks, state)
     filt.review(word, quality)
-    new_state = {
-        w: {
-            "repetitions": s.state.repetitions,
-            "interval": s.state.interval,
-            "efactor": s.state.efactor,
-            "next_review": s.state.next_review.isoformat(),
-        }
-        for w, s in filt.schedulers.items()
+    words = [word] if output == "delta" else list(filt.schedulers)
+    new_state = {w: filt.schedulers[w].state.to_dict() for w in words}
+    return {"state": new_state, "next_review": new_state[word]["next_review"]}
+
+
+def review_batch(goal_ranks_json: str, state_json: str, reviews_json: str) -> dict:
+    """Apply a list of reviews and return only the changed words' state.
+
+    ``reviews_json`` is a list of ``{"word", "quality", "reviewed_at"}``
+    objects (or ``[word, quality, reviewed_at]`` triples) where
+    ``reviewed_at`` is an optional ISO timestamp.
+    """
+
+    goal_ranks = _load_json(goal_ranks_json)
+    state = _load_states(state_json)
+    reviews = []
+    for item in _load_json(reviews_json):
+        if isinstance(item, dict):
+            item = (item["word"], item["quality"], item.get("reviewed_at"))
+        word, quality, reviewed_at = (list(item) + [None])[:3]
+        when = datetime.fromisoformat(reviewed_at) if reviewed_at else None
+        reviews.append((word, int(quality), when))
+    filt = _load_filter(goal_ranks, state)
+    delta = filt.review_many(reviews)
+    return {
+        "state": delta,
+        "next_review": {w: info["next_review"] for w, info in delta.items()},
     }
-    print(json.dumps({"state": new_state, "next_review": new_state[word]["next_review"]}))
 
 
-def lesson(topic: str) -> None:
-    print(json.dumps(generate_lesson(topic)))
+def pack_state(state_json: str, out_path: str) -> dict:
+    """Write review state to *out_path* in the compact binary encoding.
+
+    The resulting file can be passed to the review commands as ``@out_path``.
+    """
 
+    states = _load_states(state_json)
+    with open(out_path, "wb") as fh:
+        fh.write(encode_review_states(states))
+    return {"path": out_path, "words": len(states)}
 
-def default_goals() -> None:
-    print(json.dumps([g.__dict__ for g in load_default_goals()]))
 
+def lesson(topic: str) -> dict:
+    return generate_lesson(topic)
 
-def default_words() -> None:
-    print(json.dumps([g.word for g in load_default_goals()]))
 
+def default_goals() -> list:
+    return [g.__dict__ for g in load_default_goals()]
 
-def media_suggest(word: str, level_str: str) -> None:
+
+def default_words() -> list:
+    return [g.word for g in load_default_goals()]
+
+
+def media_suggest(word: str, level_str: str) -> list:
     level = int(level_str)
-    print(json.dumps(suggest_media(word, level)))
+    return suggest_media(word, level)
+
 
+def media_suggest_batch(words_json: str, level_str: str, limit_str: str = "") -> dict:
+    words = _load_json(words_json)
+    limit = int(limit_str) if limit_str else None
+    return suggest_media_batch(words, int(level_str), limit)
 
-def media_record(user_id: str, media_id: str, word: str) -> None:
+
+def media_comprehensible(known_json: str, k_str: str = "10", max_coverage_str: str = "") -> list:
+    known = _load_json(known_json)
+    max_coverage = float(max_coverage_str) if max_coverage_str else None
+    return suggest_comprehensible_media(known, int(k_str), max_coverage)
+
+
+def media_record(user_id: str, media_id: str, word: str) -> dict:
     record_media_interaction(user_id, media_id, word)
-    print(json.dumps({"status": "ok"}))
+    # One-shot invocations exit right away, so persist the record now.
+    flush_media_interactions()
+    return {"status": "ok"}
+
 
+def media_drain(max_records_str: str = "") -> dict:
+    max_records = int(max_records_str) if max_records_str else None
+    drained = drain_media_interactions(max_records)
+    return {user: [list(entry) for entry in entries] for user, entries in drained.items()}
 
-def blurb(known_json: str, lplus_json: str, length_str: str) -> None:
+
+def blurb(known_json: str, lplus_json: str, length_str: str) -> dict:
     known = json.loads(known_json)
     lplus = json.loads(lplus_json)
     length = int(length_str)
-    print(json.dumps({"blurb": generate_blurb(known, lplus, length)}))
+    return {"blurb": generate_blurb(known, lplus, length)}
 
 
-def analytics_next(goal_ranks_json: str, review_json: str, visible_json: str) -> None:
-    goal_ranks = json.loads(goal_ranks_json)
-    review = json.loads(review_json)
-    visible = set(json.loads(visible_json))
-    filt = SRSFilter(goal_ranks)
-    for word, info in review.items():
-        st = filt.schedulers.setdefault(word, SpacedRepetitionScheduler()).state
-        st.repetitions = int(info.get("repetitions", 0))
-        st.interval = int(info.get("interval", 0))
-        st.efactor = float(info.get("efactor", 2.5))
-        st.next_review = datetime.fromisoformat(info["next_review"])
-    next_words: list[str] = []
-    for _ in range(5):
-        nxt = filt.pop_next_due()
-        if not nxt:
-            break
-        if visible and nxt not in visible:
-            del filt.schedulers[nxt]
-            continue
-        next_words.append(nxt)
-        del filt.schedulers[nxt]
-    print(json.dumps({"next": next_words}))
+def analytics_next(goal_ranks_json: str, review_json: str, visible_json: str) -> dict:
+    goal_ranks = _load_json(goal_ranks_json)
+    review = _load_states(review_json)
+    visible = set(_load_json(visible_json))
+    filt = _load_filter(goal_ranks, review)
+    next_words = [
+        w for w in filt.top_due(5, datetime.now()) if not visible or w in visible
+    ]
+    return {"next": next_words}
 
 
 COMMANDS = {
     "vocabulary": vocabulary,
     "lesson_queue": lesson_queue,
     "review": review,
+    "review_batch": review_batch,
+    "pack_state": pack_state,
     "lesson": lesson,
     "default_goals": default_goals,
     "default_words": default_words,
     "media_suggest": media_suggest,
+    "media_suggest_batch": media_suggest_batch,
+    "media_comprehensible": media_comprehensible,
     "media_record": media_record,
+    "media_drain": media_drain,
     "blurb": blurb,
     "analytics_next": analytics_next,
 }
 
 
+def dispatch(cmd: str, args: list) -> Any:
+    """Run *cmd* from :data:`COMMANDS` and return its JSON-serialisable result.
+
+    Non-string arguments are JSON encoded first so that callers talking to a
+    worker can pass goal ranks or review state as structured values instead of
+    pre-encoded strings.
+    """
+
+    if cmd not in COMMANDS:
+        raise ValueError(f"Unknown command: {cmd}")
+    argv = [a if isinstance(a, str) else json.dumps(a) for a in args]
+    return COMMANDS[cmd](*argv)
+
+
+def handle_request(line: str) -> Dict[str, Any]:
+    """Answer one newline-delimited JSON request.
+
+    Requests look like ``{"id": 1, "command": "review", "args": [...]}``.  The
+    response echoes ``id`` and carries either ``result`` or ``error``.
+    """
+
+    req_id = None
+    try:
+        req = json.loads(line)
+        req_id = req.get("id")
+        result = dispatch(req["command"], list(req.get("args", [])))
+    except Exception as exc:
+        return {"id": req_id, "error": str(exc), "type": type(exc).__name__}
+    return {"id": req_id, "result": result}
+
+
+def _serve_stream(
+    rfile: IO[str], wfile: IO[str], executor: ThreadPoolExecutor
+) -> None:
+    lock = threading.Lock()
+
+    def respond(line: str) -> None:
+        out = json.dumps(handle_request(line))
+        with lock:
+            wfile.write(out + "\n")
+            wfile.flush()
+
+    # Keep only in-flight futures so a long-lived stream does not accumulate
+    # completed ones; the stream is finished once all of them have answered.
+    pending: set = set()
+    for line in rfile:
+        if line.strip():
+            fut = executor.submit(respond, line)
+            pending.add(fut)
+            fut.add_done_callback(pending.discard)
+    for fut in list(pending):
+        fut.result()
+
+
+def serve(
+    stdin: IO[str] | None = None,
+    stdout: IO[str] | None = None,
+    workers: int = 4,
+) -> None:
+    """Serve newline-delimited JSON requests from *stdin* until EOF.
+
+    Up to ``workers`` requests are processed concurrently, so responses may be
+    written out of order; clients match them to requests by ``id``.
+    """
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        _serve_stream(stdin or sys.stdin, stdout or sys.stdout, executor)
+
+
+class _SocketWriter:
+    """Minimal text adapter over a socket's binary write file."""
+
+    def __init__(self, wfile: IO[bytes]) -> None:
+        self._wfile = wfile
+
+    def write(self, text: str) -> None:
+        self._wfile.write(text.encode("utf-8"))
+
+    def flush(self) -> None:
+        self._wfile.flush()
+
+
+def serve_socket(path: str, workers: int = 4) -> None:
+    """Serve the stdin protocol on a Unix domain socket at *path*.
+
+    Every connection is an independent request stream; all connections share
+    one pool of ``workers`` threads.
+    """
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            rfile = (line.decode("utf-8") for line in self.rfile)
+            wfile = _SocketWriter(self.wfile)
+            _serve_stream(rfile, wfile, executor)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    try:
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+            server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _serve_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="language_learning.entrypoints serve")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of stdin")
+    parser.add_argument("--workers", type=int, default=4)
+    opts = parser.parse_args(argv)
+    if opts.socket:
+        serve_socket(opts.socket, opts.workers)
+    else:
+        serve(workers=opts.workers)
+
+
 def main(argv: list[str] | None = None) -> None:
     argv = list(sys.argv[1:] if argv is None else argv)
     if not argv:
         raise SystemExit("No command provided")
     cmd = argv.pop(0)
+    if cmd == "serve":
+        _serve_main(argv)
+        return
     if cmd not in COMMANDS:
         raise SystemExit(f"Unknown command: {cmd}")
-    COMMANDS[cmd](*argv)
+    token = _arg_stdin.set(sys.stdin.buffer)
+    try:
+        print(json.dumps(COMMANDS[cmd](*argv)))
+    finally:
+        _arg_stdin.reset(token)
 
 
 if __name__ == "__main__":
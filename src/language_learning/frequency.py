@@ -0,0 +1,111 @@
+"""Shared, loaded-once index of COCA word frequencies.
+
+``coca.csv`` is parsed at most once per file version: :func:`get_frequency_index`
+caches the parsed index per path and only re-reads the file when its
+modification time or size changes.  The index offers constant-time rank and
+count lookups and top-k slices of the rank-ordered word list.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_COCA_PATH = Path(__file__).with_name("coca.csv")
+
+
+@dataclass(frozen=True)
+class FrequencyIndex:
+    """Word frequencies in COCA list order.
+
+    ``words`` holds each lowercased word once, in file order, so the word at
+    position ``i`` has rank ``i + 1``.  ``counts`` sums the numeric frequency
+    column per word; rows without a valid frequency still receive a rank.
+    """
+
+    words: Tuple[str, ...] = ()
+    counts: Dict[str, float] = field(default_factory=dict)
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_csv(cls, path: Union[str, os.PathLike]) -> "FrequencyIndex":
+        """Parse a two-column ``word,frequency`` CSV file."""
+
+        words: List[str] = []
+        counts: Dict[str, float] = {}
+        ranks: Dict[str, int] = {}
+        with open(path, "r", encoding="utf-8", newline="") as fh:
+            for row in csv.reader(fh):
+                if not row:
+                    continue
+                word = row[0].strip().lower()
+                if word not in ranks:
+                    words.append(word)
+                    ranks[word] = len(words)
+                if len(row) < 2:
+                    continue
+                try:
+                    counts[word] = counts.get(word, 0.0) + float(row[1].strip())
+                except ValueError:
+                    continue
+        return cls(tuple(words), counts, ranks)
+
+    def top(self, k: int) -> List[str]:
+        """Return the ``k`` most frequent words."""
+
+        return list(self.words[: max(k, 0)])
+
+    def rank(self, word: str) -> Optional[int]:
+        """Return the 1-based rank of *word* or ``None`` if it is not listed."""
+
+        return self.ranks.get(word)
+
+    def count(self, word: str) -> float:
+        """Return the frequency of *word*, ``0`` if it has none."""
+
+        return self.counts.get(word, 0.0)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+_EMPTY = FrequencyIndex()
+_cache: Dict[str, Tuple[Tuple[int, int], FrequencyIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_frequency_index(path: Union[str, os.PathLike, None] = None) -> FrequencyIndex:
+    """Return the cached :class:`FrequencyIndex` for *path*.
+
+    *path* defaults to the bundled ``coca.csv``.  The file is re-parsed only
+    when its modification time or size changed since it was last loaded; a
+    missing file yields an empty index.
+    """
+
+    key = os.fspath(path or DEFAULT_COCA_PATH)
+    try:
+        st = os.stat(key)
+    except OSError:
+        with _cache_lock:
+            _cache.pop(key, None)
+        return _EMPTY
+    version = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+    index = FrequencyIndex.from_csv(key)
+    with _cache_lock:
+        _cache[key] = (version, index)
+    return index
+
+
+def clear_frequency_cache() -> None:
+    """Forget all cached indexes."""
+
+    with _cache_lock:
+        _cache.clear()
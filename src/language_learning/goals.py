@@ -1,10 +1,10 @@
 """Goal management utilities."""
 
 from dataclasses import dataclass
-from pathlib import Path
-import csv
 from typing import Dict, Iterable, Iterator, List, Optional
 
+from .frequency import get_frequency_index
+
 
 @dataclass
 class GoalItem:
@@ -44,17 +44,6 @@ class GoalManager:
 def load_default_goals(limit: int = 5) -> Iterator[GoalItem]:
     """Yield the top ``limit`` goals from the bundled COCA frequency list."""
 
-    path = Path(__file__).with_name("coca.csv")
-    with path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.reader(fh)
-        for i, row in enumerate(reader):
-            if i >= limit:
-                break
-            if not row:
-                continue
-            word = row[0].strip()
-            try:
-                weight = float(row[1]) if len(row) > 1 and row[1] else 1.0
-            except ValueError:
-                weight = 1.0
-            yield GoalItem(word=word, weight=weight, is_default=True)
+    index = get_frequency_index()
+    for word in index.top(limit):
+        yield GoalItem(word=word, weight=index.counts.get(word, 1.0), is_default=True)
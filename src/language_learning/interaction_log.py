@@ -0,0 +1,241 @@
+"""Durable, append-only log of media interactions.
+
+:class:`InteractionLog` buffers interactions in memory and appends them to a
+JSON-lines file in batches, flushing when ``flush_size`` records are pending
+or ``flush_interval`` seconds have passed since the last flush.  A background
+timer also flushes a batch ``flush_interval`` seconds after it was started,
+so records are not held indefinitely when no further ones arrive.  Each batch
+is written with a single ``O_APPEND`` write, so several processes can share a
+log file.  A crash can at worst leave a partial last line, which is cut off
+the next time the log is opened.
+
+:meth:`InteractionLog.append` always accepts the record: a failed automatic
+flush is logged and the batch stays buffered for the next attempt.  At most
+``max_buffered`` records are held; beyond that the oldest are dropped with a
+warning, so an unwritable disk cannot exhaust memory.  An explicit
+:meth:`InteractionLog.flush` raises on I/O errors.
+
+Consumers call :meth:`InteractionLog.drain` to read everything appended since
+their last drain, grouped by user.  The read position is checkpointed in a
+``<path>.offset`` file so each interaction is delivered once.  Drains hold an
+exclusive ``flock`` on ``<path>.lock``, so several consumer processes can
+share a log.  Platforms without :mod:`fcntl` must use a single consumer.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:  # pragma: no cover - fcntl is unavailable on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+Interaction = Tuple[str, str]
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionLog:
+    """Buffered, crash-tolerant JSONL log of ``(user, media, word)`` records."""
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        flush_size: int = 256,
+        flush_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_buffered: int = 100_000,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.offset_path = f"{self.path}.offset"
+        self.lock_path = f"{self.path}.lock"
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._last_flush = clock()
+        self._timer: Optional[threading.Timer] = None
+        self.recover()
+
+    def recover(self) -> None:
+        """Truncate a partially written last line left by a crash."""
+
+        with self._lock:
+            try:
+                with open(self.path, "rb+") as fh:
+                    size = fh.seek(0, os.SEEK_END)
+                    if size == 0:
+                        return
+                    fh.seek(size - 1)
+                    if fh.read(1) == b"\n":
+                        return
+                    # Scan back in blocks for the last complete line.
+                    end = size
+                    while end > 0:
+                        start = max(0, end - 65536)
+                        fh.seek(start)
+                        block = fh.read(end - start)
+                        cut = block.rfind(b"\n")
+                        if cut != -1:
+                            fh.truncate(start + cut + 1)
+                            return
+                        end = start
+                    fh.truncate(0)
+            except FileNotFoundError:
+                return
+
+    def append(
+        self, user_id: str, media_id: str, word: str, at: Optional[datetime] = None
+    ) -> None:
+        """Buffer one interaction, flushing if the batch is full or stale.
+
+        Never raises for I/O errors; see the module docstring.
+        """
+
+        record = {
+            "user": user_id,
+            "media": media_id,
+            "word": word,
+            "at": (at or datetime.now()).isoformat(),
+        }
+        with self._lock:
+            self._buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+            excess = len(self._buffer) - self.max_buffered
+            if excess > 0:
+                del self._buffer[:excess]
+                logger.warning(
+                    "Interaction log %s is not writable; dropped %d oldest records",
+                    self.path,
+                    excess,
+                )
+            due = (
+                len(self._buffer) >= self.flush_size
+                or self._clock() - self._last_flush >= self.flush_interval
+            )
+            if not due and self._timer is None:
+                # Flush a quiet log's last records without waiting for the
+                # next append.
+                self._timer = threading.Timer(self.flush_interval, self._flush_quietly)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self._flush_quietly()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except OSError:
+            logger.exception(
+                "Could not write %d interactions to %s; keeping them buffered",
+                self.pending,
+                self.path,
+            )
+
+    def flush(self) -> None:
+        """Write all buffered interactions to disk.
+
+        If the write fails the error propagates and the interactions stay
+        buffered, to be retried by the next flush.
+        """
+
+        with self._lock:
+            self._last_flush = self._clock()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            data = "".join(self._buffer).encode("utf-8")
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            # Only forget the batch once it is on disk; on error it is kept
+            # for the next flush.
+            self._buffer.clear()
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered interactions not yet written."""
+
+        return len(self._buffer)
+
+    def drain(self, max_records: Optional[int] = None) -> Dict[str, List[Interaction]]:
+        """Return interactions appended since the last drain, grouped by user.
+
+        Buffered records are flushed first.  At most *max_records* records
+        are consumed; the rest remain for the next call.  Malformed lines are
+        skipped.
+        """
+
+        self.flush()
+        with self._lock, self._consumer_lock():
+            offset = self._read_offset()
+            grouped: Dict[str, List[Interaction]] = defaultdict(list)
+            taken = 0
+            try:
+                with open(self.path, "rb") as fh:
+                    if offset > os.fstat(fh.fileno()).st_size:
+                        offset = 0  # the log was replaced
+                    fh.seek(offset)
+                    for line in fh:
+                        if not line.endswith(b"\n"):
+                            break  # another process is mid-write
+                        if max_records is not None and taken >= max_records:
+                            break
+                        offset += len(line)
+                        try:
+                            record = json.loads(line)
+                            grouped[record["user"]].append((record["media"], record["word"]))
+                        except (ValueError, KeyError, TypeError):
+                            continue
+                        taken += 1
+            except FileNotFoundError:
+                return {}
+            self._write_offset(offset)
+            return dict(grouped)
+
+    def close(self) -> None:
+        self.flush()
+
+    @contextmanager
+    def _consumer_lock(self) -> Iterator[None]:
+        """Serialise drains across processes sharing this log."""
+
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, "r", encoding="utf-8") as fh:
+                return int(fh.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int) -> None:
+        tmp = f"{self.offset_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(str(offset))
+        os.replace(tmp, self.offset_path)
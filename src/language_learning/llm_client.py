@@ -0,0 +1,468 @@
+"""Shared HTTP client for the Azure OpenAI chat completions API.
+
+Both blurb and distractor generation talk to the same deployment.  Rather
+than opening a new connection per call, they share an :class:`LLMClient` that
+keeps a pooled :class:`requests.Session`, caps the number of concurrent
+requests, retries transient failures with jittered exponential backoff and
+trips a circuit breaker when the upstream keeps failing so callers fall back
+to their deterministic generators immediately.
+
+:class:`AsyncLLMClient` offers the same behaviour on :mod:`httpx` for async
+callers such as the FastAPI endpoints, so slow completions never block the
+event loop.
+
+Configuration comes from the ``AZURE_OPENAI_*`` environment variables plus
+optional ``LLM_*`` tuning knobs (see :meth:`LLMConfig.from_env`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying: rate limiting and upstream/server trouble.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class LLMError(RuntimeError):
+    """Raised when the LLM service cannot produce a completion."""
+
+
+class CircuitOpenError(LLMError):
+    """Raised without contacting the service while the circuit is open."""
+
+
+@dataclass(frozen=True)
+class LLMConfig:
+    """Connection and resilience settings for :class:`LLMClient`."""
+
+    endpoint: str
+    deployment: str
+    api_key: str
+    api_version: str = "2025-01-01-preview"
+    timeout: float = 15.0
+    max_retries: int = 2
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+    max_concurrency: int = 8
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @property
+    def url(self) -> str:
+        return (
+            f"{self.endpoint}/openai/deployments/{self.deployment}/chat/completions"
+            f"?api-version={self.api_version}"
+        )
+
+    @classmethod
+    def from_env(cls) -> "LLMConfig":
+        """Build a config from the environment.
+
+        ``AZURE_OPENAI_ENDPOINT``, ``AZURE_OPENAI_DEPLOYMENT`` and
+        ``AZURE_OPENAI_API_KEY`` are required; ``LLM_TIMEOUT``,
+        ``LLM_MAX_RETRIES``, ``LLM_MAX_CONCURRENCY``, ``LLM_BREAKER_THRESHOLD``
+        and ``LLM_BREAKER_RESET`` override the defaults.
+        """
+
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+        deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+        api_key = os.getenv("AZURE_OPENAI_API_KEY")
+        if not (endpoint and deployment and api_key):
+            raise RuntimeError("Azure OpenAI configuration missing")
+        env = os.environ
+        return cls(
+            endpoint=endpoint.rstrip("/"),
+            deployment=deployment,
+            api_key=api_key,
+            timeout=float(env.get("LLM_TIMEOUT", cls.timeout)),
+            max_retries=int(env.get("LLM_MAX_RETRIES", cls.max_retries)),
+            max_concurrency=int(env.get("LLM_MAX_CONCURRENCY", cls.max_concurrency)),
+            failure_threshold=int(env.get("LLM_BREAKER_THRESHOLD", cls.failure_threshold)),
+            reset_timeout=float(env.get("LLM_BREAKER_RESET", cls.reset_timeout)),
+        )
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``threshold`` consecutive failures the circuit opens and
+    :meth:`allow` refuses calls for ``reset_timeout`` seconds.  Then a single
+    trial call is let through (half-open); its outcome closes the circuit or
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+    def end_trial(self, failed: bool) -> None:
+        """Settle a half-open trial that ended without a recorded outcome.
+
+        Callers use this when a call is interrupted by an unexpected error
+        (``failed=True`` reopens the circuit) or by cancellation
+        (``failed=False`` lets the next call try again).  It is a no-op
+        unless a trial is pending.
+        """
+
+        with self._lock:
+            if not self._trial:
+                return
+            self._trial = False
+            if failed:
+                self._failures += 1
+                self._opened_at = self._clock()
+
+
+def backoff_delay(config: LLMConfig, attempt: int, retry_after: Optional[str] = None) -> float:
+    """Return the sleep before retry number ``attempt + 1``.
+
+    A numeric ``Retry-After`` header wins (capped at ``max_backoff``);
+    otherwise the delay is drawn uniformly from ``[0, backoff * 2**attempt]``
+    ("full jitter") so that concurrent clients do not retry in lockstep.
+    """
+
+    if retry_after:
+        try:
+            return min(float(retry_after), config.max_backoff)
+        except ValueError:
+            pass
+    return random.uniform(0, min(config.max_backoff, config.backoff * 2**attempt))
+
+
+def completion_text(payload: Dict[str, object]) -> str:
+    """Extract the message content from a chat completion response."""
+
+    try:
+        return payload["choices"][0]["message"]["content"]  # type: ignore[index]
+    except (KeyError, IndexError, TypeError) as exc:
+        raise LLMError(f"Unexpected completion payload: {exc}") from exc
+
+
+class LLMClient:
+    """Thread-safe, pooled chat completion client."""
+
+    def __init__(
+        self, config: LLMConfig, session: Optional[requests.Session] = None
+    ) -> None:
+        self.config = config
+        self.breaker = CircuitBreaker(config.failure_threshold, config.reset_timeout)
+        self._slots = threading.BoundedSemaphore(config.max_concurrency)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=config.max_concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def chat(self, prompt: str, **params: object) -> str:
+        """Send *prompt* as a single user message and return the reply text.
+
+        Extra keyword arguments are added to the request body (for example
+        ``max_tokens``).  Raises :class:`CircuitOpenError` while the circuit
+        is open and :class:`LLMError` once retries are exhausted.
+        """
+
+        messages: List[Dict[str, str]] = [{"role": "user", "content": prompt}]
+        return completion_text(self._post({"messages": messages, **params}))
+
+    def _post(self, body: Dict[str, object]) -> Dict[str, object]:
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit is open")
+        # Whatever interrupts the call, a half-open trial must be settled or
+        # the circuit would never let another call through.
+        try:
+            return self._send(body)
+        except Exception:
+            self.breaker.end_trial(failed=True)
+            raise
+        except BaseException:
+            self.breaker.end_trial(failed=False)
+            raise
+
+    def _send(self, body: Dict[str, object]) -> Dict[str, object]:
+        cfg = self.config
+        headers = {"api-key": cfg.api_key, "Content-Type": "application/json"}
+        for attempt in range(cfg.max_retries + 1):
+            retry_after = None
+            try:
+                with self._slots:
+                    res = self.session.post(
+                        cfg.url, headers=headers, json=body, timeout=cfg.timeout
+                    )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error: Exception = exc
+            else:
+                if res.status_code not in RETRY_STATUSES:
+                    if res.status_code >= 400:
+                        # Client errors say nothing about upstream health.
+                        self.breaker.record_success()
+                        raise LLMError(f"LLM request failed with status {res.status_code}")
+                    try:
+                        payload = res.json()
+                    except ValueError as exc:
+                        self.breaker.record_failure()
+                        raise LLMError("LLM returned invalid JSON") from exc
+                    self.breaker.record_success()
+                    return payload
+                error = LLMError(f"LLM request failed with status {res.status_code}")
+                retry_after = res.headers.get("Retry-After")
+            if attempt < cfg.max_retries:
+                time.sleep(backoff_delay(cfg, attempt, retry_after))
+        self.breaker.record_failure()
+        raise LLMError(f"LLM request failed after {cfg.max_retries + 1} attempts") from error
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncLLMClient:
+    """Asyncio counterpart of :class:`LLMClient` built on :mod:`httpx`.
+
+    Concurrency towards the upstream is capped by an :class:`asyncio.Semaphore`
+    of ``max_concurrency`` slots.  Instances are bound to the event loop they
+    are used on; :func:`get_async_llm_client` keeps one per loop.
+    """
+
+    def __init__(
+        self, config: LLMConfig, client: Optional[httpx.AsyncClient] = None
+    ) -> None:
+        self.config = config
+        self.breaker = CircuitBreaker(config.failure_threshold, config.reset_timeout)
+        self._slots = asyncio.Semaphore(config.max_concurrency)
+        self.client = client or httpx.AsyncClient(
+            timeout=config.timeout,
+            limits=httpx.Limits(
+                max_connections=config.max_concurrency,
+                max_keepalive_connections=config.max_concurrency,
+            ),
+        )
+
+    async def chat(self, prompt: str, **params: object) -> str:
+        """Async version of :meth:`LLMClient.chat`."""
+
+        messages: List[Dict[str, str]] = [{"role": "user", "content": prompt}]
+        return completion_text(await self._post({"messages": messages, **params}))
+
+    async def _post(self, body: Dict[str, object]) -> Dict[str, object]:
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit is open")
+        # Cancellation is routine here (for example a client disconnecting
+        # from the API); it must not leave a half-open trial pending.
+        try:
+            return await self._send(body)
+        except Exception:
+            self.breaker.end_trial(failed=True)
+            raise
+        except BaseException:
+            self.breaker.end_trial(failed=False)
+            raise
+
+    async def _send(self, body: Dict[str, object]) -> Dict[str, object]:
+        cfg = self.config
+        headers = {"api-key": cfg.api_key, "Content-Type": "application/json"}
+        for attempt in range(cfg.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._slots:
+                    res = await self.client.post(cfg.url, headers=headers, json=body)
+            except httpx.TransportError as exc:
+                error: Exception = exc
+            else:
+                if res.status_code not in RETRY_STATUSES:
+                    if res.status_code >= 400:
+                        self.breaker.record_success()
+                        raise LLMError(f"LLM request failed with status {res.status_code}")
+                    try:
+                        payload = res.json()
+                    except ValueError as exc:
+                        self.breaker.record_failure()
+                        raise LLMError("LLM returned invalid JSON") from exc
+                    self.breaker.record_success()
+                    return payload
+                error = LLMError(f"LLM request failed with status {res.status_code}")
+                retry_after = res.headers.get("Retry-After")
+            if attempt < cfg.max_retries:
+                await asyncio.sleep(backoff_delay(cfg, attempt, retry_after))
+        self.breaker.record_failure()
+        raise LLMError(f"LLM request failed after {cfg.max_retries + 1} attempts") from error
+
+    async def stream_chat(self, prompt: str, **params: object) -> AsyncIterator[str]:
+        """Yield the reply to *prompt* piece by piece as it is generated.
+
+        The request asks for a server-sent event stream and yields each
+        ``delta.content`` fragment.  Transient failures are retried only
+        before the stream starts.  Closing the generator early closes the
+        connection, which stops the upstream from generating further tokens.
+        """
+
+        cfg = self.config
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit is open")
+        headers = {"api-key": cfg.api_key, "Content-Type": "application/json"}
+        messages = [{"role": "user", "content": prompt}]
+        body = {"messages": messages, **params, "stream": True}
+        started = False
+        try:
+            for attempt in range(cfg.max_retries + 1):
+                retry_after = None
+                try:
+                    async with self._slots, self.client.stream(
+                        "POST", cfg.url, headers=headers, json=body
+                    ) as res:
+                        if res.status_code in RETRY_STATUSES:
+                            error: Exception = LLMError(
+                                f"LLM request failed with status {res.status_code}"
+                            )
+                            retry_after = res.headers.get("Retry-After")
+                        elif res.status_code >= 400:
+                            self.breaker.record_success()
+                            raise LLMError(f"LLM request failed with status {res.status_code}")
+                        else:
+                            started = True
+                            async for line in res.aiter_lines():
+                                piece = _stream_delta(line)
+                                if piece:
+                                    yield piece
+                            self.breaker.record_success()
+                            return
+                except GeneratorExit:
+                    # The consumer stopped early; the upstream was healthy.
+                    self.breaker.record_success()
+                    raise
+                except (httpx.TransportError, LLMError) as exc:
+                    if started:
+                        # Fragments were already yielded; retrying would repeat them.
+                        self.breaker.record_failure()
+                        raise LLMError(f"LLM stream failed: {exc}") from exc
+                    if isinstance(exc, LLMError):
+                        raise
+                    error = exc
+                if attempt < cfg.max_retries:
+                    await asyncio.sleep(backoff_delay(cfg, attempt, retry_after))
+            self.breaker.record_failure()
+            raise LLMError(f"LLM request failed after {cfg.max_retries + 1} attempts") from error
+        except Exception:
+            self.breaker.end_trial(failed=True)
+            raise
+        except BaseException:
+            # Cancelled mid-request: release the trial, if any, unjudged.
+            self.breaker.end_trial(failed=False)
+            raise
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def _stream_delta(line: str) -> Optional[str]:
+    """Return the content fragment carried by one server-sent event line."""
+
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:") :].strip()
+    if not data or data == "[DONE]":
+        return None
+    try:
+        choices = json.loads(data).get("choices") or []
+        return choices[0].get("delta", {}).get("content") if choices else None
+    except (ValueError, AttributeError) as exc:
+        raise LLMError(f"Malformed stream event: {data[:80]}") from exc
+
+
+_clients: Dict[LLMConfig, LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(config: Optional[LLMConfig] = None) -> LLMClient:
+    """Return the shared client for *config* (default: from the environment).
+
+    One client, and therefore one connection pool and circuit breaker, exists
+    per distinct configuration.
+    """
+
+    config = config or LLMConfig.from_env()
+    with _clients_lock:
+        client = _clients.get(config)
+        if client is None:
+            client = _clients[config] = LLMClient(config)
+        return client
+
+
+# One client set per event loop: httpx connections and asyncio primitives
+# must not be shared across loops.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[LLMConfig, AsyncLLMClient]]"
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_llm_client(config: Optional[LLMConfig] = None) -> AsyncLLMClient:
+    """Return the shared async client for *config* on the running event loop."""
+
+    config = config or LLMConfig.from_env()
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(config)
+        if client is None:
+            client = clients[config] = AsyncLLMClient(config)
+        return client
+
+
+def reset_llm_clients() -> None:
+    """Close and forget all shared clients (mainly for tests).
+
+    Async clients are dropped without awaiting their close; their
+    connections are released when the owning event loop shuts down.
+    """
+
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _async_clients.clear()
@@ -0,0 +1,262 @@
+"""File-backed media catalogues indexed by ``(word, level)``.
+
+A catalogue maps vocabulary words to media items (clips with audio, video,
+image URLs and an optional transcript) at a difficulty level.  Three formats
+are supported, chosen by file extension:
+
+``.jsonl``
+    One JSON object per line with ``id``, ``level`` and either ``word`` or a
+    ``words`` list, plus any media fields.
+``.csv``
+    A header row with at least ``id``, ``word`` and ``level`` columns.
+``.db`` / ``.sqlite`` / ``.sqlite3``
+    A ``media`` table with the same columns.  It is queried lazily, one
+    ``(word, level)`` key at a time, so very large catalogues are never
+    loaded into memory.
+
+JSONL and CSV files are read once into a dictionary keyed by
+``(word, level)``, so lookups are constant time.  :func:`get_catalogue`
+caches catalogues per path and reloads one when its file's modification
+time or size changes.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, Union
+
+MediaItem = Dict[str, object]
+Key = Tuple[str, int]
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+class MediaCatalogueError(Exception):
+    """Raised when a catalogue file cannot be read."""
+
+
+def _item_words(record: Mapping[str, object]) -> List[str]:
+    words = record.get("words")
+    if isinstance(words, list):
+        return [str(w).lower() for w in words]
+    word = record.get("word")
+    return [str(word).lower()] if word else []
+
+
+class MediaCatalogue:
+    """In-memory catalogue with an ``O(1)`` ``(word, level)`` index."""
+
+    def __init__(self, records: Iterable[MediaItem] = ()) -> None:
+        self._index: Dict[Key, List[MediaItem]] = defaultdict(list)
+        self._items: Dict[str, MediaItem] = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: MediaItem) -> None:
+        """Index *record* under each of its words at its level."""
+
+        level = int(record["level"])  # type: ignore[arg-type]
+        item = {k: v for k, v in record.items() if k not in ("word", "words")}
+        item["level"] = level
+        item_id = str(item.get("id", ""))
+        for word in _item_words(record):
+            self._index[(word, level)].append(item)
+        if item_id:
+            self._items.setdefault(item_id, item)
+
+    def lookup(self, word: str, level: int) -> List[MediaItem]:
+        """Return the items for *word* at exactly *level*."""
+
+        return list(self._index.get((word.lower(), level), ()))
+
+    def items(self) -> Iterator[MediaItem]:
+        """Iterate over every distinct item once."""
+
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @classmethod
+    def from_mapping(cls, library: Mapping[str, Iterable[MediaItem]]) -> "MediaCatalogue":
+        """Build a catalogue from a ``word -> items`` mapping."""
+
+        return cls({**item, "word": word} for word, items in library.items() for item in items)
+
+    @classmethod
+    def from_jsonl(cls, path: Union[str, os.PathLike]) -> "MediaCatalogue":
+        def records() -> Iterator[MediaItem]:
+            with open(path, "r", encoding="utf-8") as fh:
+                for number, line in enumerate(fh, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError as exc:
+                        raise MediaCatalogueError(f"{path!s}:{number}: {exc}") from exc
+
+        return cls(records())
+
+    @classmethod
+    def from_csv(cls, path: Union[str, os.PathLike]) -> "MediaCatalogue":
+        with open(path, "r", encoding="utf-8", newline="") as fh:
+            rows = csv.DictReader(fh)
+            return cls({k: v for k, v in row.items() if v not in (None, "")} for row in rows)
+
+
+class SQLiteMediaCatalogue:
+    """Lazily queried catalogue stored in a SQLite ``media`` table.
+
+    Lookups use an index on ``(word, level)``; the most recent
+    ``cache_size`` results are memoised.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], cache_size: int = 4096) -> None:
+        self.path = os.fspath(path)
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Key, List[MediaItem]]" = OrderedDict()
+        try:
+            self._conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("SELECT 1 FROM media LIMIT 1")
+        except sqlite3.Error as exc:
+            raise MediaCatalogueError(f"Cannot open media catalogue {self.path}: {exc}") from exc
+
+    def lookup(self, word: str, level: int) -> List[MediaItem]:
+        key = (word.lower(), level)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return list(cached)
+            rows = self._conn.execute(
+                "SELECT * FROM media WHERE word = ? AND level = ? ORDER BY rowid", key
+            ).fetchall()
+            items = [_row_item(row) for row in rows]
+            self._cache[key] = items
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return list(items)
+
+    def items(self) -> Iterator[MediaItem]:
+        """Iterate over every distinct item once, streaming from the database."""
+
+        seen = set()
+        cursor = self._conn.cursor()
+        with self._lock:
+            cursor.execute("SELECT * FROM media ORDER BY rowid")
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for row in rows:
+                item = _row_item(row)
+                if item.get("id") not in seen:
+                    seen.add(item.get("id"))
+                    yield item
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _row_item(row: sqlite3.Row) -> MediaItem:
+    return {k: row[k] for k in row.keys() if k != "word" and row[k] is not None}
+
+
+def create_sqlite_catalogue(
+    path: Union[str, os.PathLike], records: Iterable[MediaItem]
+) -> None:
+    """Write *records* to a new SQLite catalogue at *path*.
+
+    Columns are the union of the record fields; a ``words`` list becomes one
+    row per word.
+    """
+
+    rows: List[MediaItem] = []
+    columns: Dict[str, None] = {"id": None, "word": None, "level": None}
+    for record in records:
+        fields = {k: v for k, v in record.items() if k not in ("word", "words")}
+        columns.update(dict.fromkeys(fields))
+        rows.extend({**fields, "word": w} for w in _item_words(record))
+    names = list(columns)
+    conn = sqlite3.connect(os.fspath(path))
+    try:
+        with conn:
+            conn.execute(
+                "CREATE TABLE media ("
+                + ", ".join(f'"{c}" INTEGER' if c == "level" else f'"{c}" TEXT' for c in names)
+                + ")"
+            )
+            conn.execute("CREATE INDEX media_word_level ON media (word, level)")
+            conn.executemany(
+                f"INSERT INTO media VALUES ({', '.join('?' for _ in names)})",
+                ([row.get(c) for c in names] for row in rows),
+            )
+    finally:
+        conn.close()
+
+
+Catalogue = Union[MediaCatalogue, SQLiteMediaCatalogue]
+
+
+def load_catalogue(path: Union[str, os.PathLike]) -> Catalogue:
+    """Load the catalogue at *path*, choosing the format by extension.
+
+    Raises :class:`MediaCatalogueError` for unreadable or malformed files.
+    """
+
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    if suffix in SQLITE_SUFFIXES:
+        return SQLiteMediaCatalogue(path)
+    try:
+        if suffix == ".csv":
+            return MediaCatalogue.from_csv(path)
+        return MediaCatalogue.from_jsonl(path)
+    except (OSError, KeyError, ValueError) as exc:
+        if isinstance(exc, MediaCatalogueError):
+            raise
+        raise MediaCatalogueError(f"Cannot load media catalogue {path!s}: {exc}") from exc
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], Catalogue]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_catalogue(path: Union[str, os.PathLike]) -> Catalogue:
+    """Return the cached catalogue for *path*, reloading it if the file changed."""
+
+    key = os.fspath(path)
+    try:
+        st = os.stat(key)
+    except OSError as exc:
+        raise MediaCatalogueError(f"Cannot load media catalogue {key}: {exc}") from exc
+    version = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+    catalogue = load_catalogue(key)
+    with _cache_lock:
+        # A replaced SQLite catalogue may still be in use by another thread;
+        # its connection is closed when it is garbage collected.
+        _cache[key] = (version, catalogue)
+    return catalogue
+
+
+def clear_catalogue_cache() -> None:
+    """Forget all cached catalogues."""
+
+    with _cache_lock:
+        for _, catalogue in _cache.values():
+            if isinstance(catalogue, SQLiteMediaCatalogue):
+                catalogue.close()
+        _cache.clear()
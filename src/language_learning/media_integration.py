@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
+import atexit
 from collections import defaultdict
-from typing import Dict, List, Tuple
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .interaction_log import InteractionLog
+from .media_catalogue import Catalogue, MediaCatalogue, get_catalogue
+from .transcript_index import TranscriptIndex
 
 
 # ---------------------------------------------------------------------------
@@ -39,11 +46,61 @@ _MEDIA_LIBRARY: Dict[str, List[Dict[str, str]]] = {
     ]
     for w in _WORDS
 }
+_BUILTIN_CATALOGUE = MediaCatalogue.from_mapping(_MEDIA_LIBRARY)
+
+
+def get_media_catalogue() -> Catalogue:
+    """Return the active media catalogue.
+
+    ``MEDIA_CATALOGUE_PATH`` selects a JSONL, CSV or SQLite catalogue (see
+    :mod:`language_learning.media_catalogue`), which is reloaded when the
+    file changes.  Without it the built-in example library is used.
+    """
+
+    path = os.getenv("MEDIA_CATALOGUE_PATH")
+    return get_catalogue(path) if path else _BUILTIN_CATALOGUE
 
 # ---------------------------------------------------------------------------
 # Interaction queue handling
-# ``interaction_queue`` maps user IDs to a list of ``(media_id, word)`` tuples.
+# Interactions go to a durable :class:`InteractionLog` at
+# ``MEDIA_INTERACTION_LOG``, by default ``media_interactions.jsonl`` next to
+# the ``DATA_PATH`` store.  Setting ``MEDIA_INTERACTION_LOG=memory`` opts into
+# the process-local ``interaction_queue`` instead, which maps user IDs to a
+# list of ``(media_id, word)`` tuples, keeping at most
+# ``MAX_QUEUED_INTERACTIONS`` recent entries per user.
 interaction_queue: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+MAX_QUEUED_INTERACTIONS = 1000
+IN_MEMORY_INTERACTIONS = "memory"
+DEFAULT_INTERACTION_LOG = "media_interactions.jsonl"
+
+_logs: Dict[str, InteractionLog] = {}
+_logs_lock = threading.Lock()
+
+
+def interaction_log_path() -> Optional[str]:
+    """Return the configured interaction log path, or ``None`` for in-memory."""
+
+    path = os.getenv("MEDIA_INTERACTION_LOG")
+    if path == IN_MEMORY_INTERACTIONS:
+        return None
+    if path:
+        return path
+    data_path = os.path.abspath(os.getenv("DATA_PATH", "storage.json"))
+    return os.path.join(os.path.dirname(data_path), DEFAULT_INTERACTION_LOG)
+
+
+def get_interaction_log() -> Optional[InteractionLog]:
+    """Return the shared interaction log, or ``None`` when kept in memory."""
+
+    path = interaction_log_path()
+    if path is None:
+        return None
+    with _logs_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = _logs[path] = InteractionLog(path)
+            atexit.register(log.close)
+        return log
 
 
 def suggest_media(word: str, level: int) -> List[Dict[str, str]]:
@@ -62,23 +119,146 @@ def suggest_media(word: str, level: int) -> List[Dict[str, str]]:
     List[Dict[str, str]]
         Media items matching the requested word filtered to the ``L+1`` level.
         Each item may contain an optional ``transcript`` key in addition to
-        the media URLs.
+        the media URLs.  Items come from :func:`get_media_catalogue` through
+        its ``(word, level)`` index.
     """
 
-    target = level + 1
-    return [
-        item for item in _MEDIA_LIBRARY.get(word, []) if item.get("level") == target
-    ]
+    return get_media_catalogue().lookup(word, level + 1)
+
+
+def suggest_media_batch(
+    words: Iterable[str], level: int, per_word_limit: Optional[int] = None
+) -> Dict[str, object]:
+    """Return ``L+1`` media for every word of a lesson in one call.
+
+    Media tagged with several of the lesson's *words* are returned once.
+    Within each word's suggestions, items that cover more lesson words come
+    first, so the same clip can serve several words.  At most
+    *per_word_limit* items are chosen per word (all when ``None``).
+
+    Returns
+    -------
+    dict
+        ``items`` lists each chosen media item once, annotated with the
+        ``words`` it was chosen for.  ``by_word`` maps every requested word
+        to the ids of its chosen items.
+    """
+
+    catalogue = get_media_catalogue()
+    words = list(dict.fromkeys(words))
+    candidates = {word: catalogue.lookup(word, level + 1) for word in words}
+    coverage: Dict[object, int] = defaultdict(int)
+    for found in candidates.values():
+        for item_id in {item.get("id") for item in found}:
+            coverage[item_id] += 1
+
+    items: Dict[object, Dict[str, object]] = {}
+    by_word: Dict[str, List[object]] = {}
+    for word in words:
+        ranked = sorted(candidates[word], key=lambda item: -coverage[item.get("id")])
+        chosen = ranked if per_word_limit is None else ranked[:per_word_limit]
+        by_word[word] = []
+        for item in chosen:
+            item_id = item.get("id")
+            if item_id in by_word[word]:
+                continue
+            by_word[word].append(item_id)
+            entry = items.setdefault(item_id, {**item, "words": []})
+            entry["words"].append(word)  # type: ignore[union-attr]
+    return {"items": list(items.values()), "by_word": by_word}
+
+
+_transcript_index: Optional[Tuple[Catalogue, TranscriptIndex]] = None
+_transcript_lock = threading.Lock()
+
+
+def get_transcript_index() -> TranscriptIndex:
+    """Return the transcript index of the active catalogue.
+
+    The index is rebuilt only when :func:`get_media_catalogue` returns a
+    different catalogue, for example after the catalogue file changed.
+    """
+
+    global _transcript_index
+    catalogue = get_media_catalogue()
+    with _transcript_lock:
+        if _transcript_index is None or _transcript_index[0] is not catalogue:
+            _transcript_index = (catalogue, TranscriptIndex.from_items(catalogue.items()))
+        return _transcript_index[1]
+
+
+def suggest_comprehensible_media(
+    known_words: Iterable[str], k: int = 10, max_coverage: Optional[float] = None
+) -> List[Dict[str, object]]:
+    """Return the *k* media whose transcripts the learner knows best.
+
+    Each item gains a ``coverage`` key: the fraction of its transcript tokens
+    found in *known_words*.  *max_coverage* filters out media with nothing
+    left to learn (see :meth:`TranscriptIndex.top_k`).
+    """
+
+    ranked = get_transcript_index().top_k(known_words, k, max_coverage)
+    return [{**item, "coverage": coverage} for item, coverage in ranked]
 
 
 def record_media_interaction(user_id: str, media_id: str, word: str) -> None:
     """Store that ``user_id`` interacted with ``word`` in ``media_id``.
 
-    The interactions are appended to :data:`interaction_queue` for later spaced
-    repetition review.
+    The interaction is appended to the interaction log, or to
+    :data:`interaction_queue` when in-memory storage was selected, for later
+    spaced repetition review.  Once this returns the record is accepted:
+    write failures are retried by later flushes rather than raised here, so
+    callers must not retry.
+    """
+
+    log = get_interaction_log()
+    if log is not None:
+        log.append(user_id, media_id, word)
+        return
+    queue = interaction_queue[user_id]
+    queue.append((media_id, word))
+    if len(queue) > MAX_QUEUED_INTERACTIONS:
+        del queue[: len(queue) - MAX_QUEUED_INTERACTIONS]
+
+
+def flush_media_interactions() -> None:
+    """Write buffered interactions to the log (a no-op when kept in memory).
+
+    Raises :class:`OSError` if the log cannot be written; the interactions
+    stay buffered.
+    """
+
+    log = get_interaction_log()
+    if log is not None:
+        log.flush()
+
+
+def drain_media_interactions(
+    max_records: Optional[int] = None,
+) -> Dict[str, List[Tuple[str, str]]]:
+    """Remove and return recorded interactions grouped by user.
+
+    The result maps user IDs to ``(media_id, word)`` tuples in recording
+    order, ready to be turned into spaced repetition reviews.
     """
 
-    interaction_queue[user_id].append((media_id, word))
+    log = get_interaction_log()
+    if log is not None:
+        return log.drain(max_records)
+    drained: Dict[str, List[Tuple[str, str]]] = {}
+    remaining = max_records
+    for user_id in list(interaction_queue):
+        if remaining == 0:
+            break
+        queue = interaction_queue[user_id]
+        take = len(queue) if remaining is None else min(remaining, len(queue))
+        drained[user_id] = queue[:take]
+        del queue[:take]
+        if remaining is not None:
+            remaining -= take
+        if not queue:
+            del interaction_queue[user_id]
+    return drained
 
 
 if __name__ == "__main__":  # pragma: no cover - example usage
@@ -87,4 +267,4 @@ if __name__ == "__main__":  # pragma: no cover - example usage
     for entry in items:
         print(entry)
     record_media_interaction("demo_user", items[0]["id"], "you")
-    print(dict(interaction_queue))
+    print(drain_media_interactions())
@@ -0,0 +1,445 @@
+"""Persistent index of corpus sentences for i+1 example mining.
+
+The best example sentence for a new word is one in which that word is the
+only unknown.  :class:`SentenceIndex` splits corpus files into sentences,
+tokenizes them like :func:`~language_learning.vocabulary.extract_vocabulary`
+and stores them in SQLite with a ``word -> sentence`` postings table.  Every
+sentence keeps its sorted distinct word ids, so checking whether all its
+other words are known costs one set lookup per word.
+
+Each posting is also keyed by a *guard* word: the sentence's other word with
+the highest id.  Ids are assigned in order of first appearance, so the guard
+tends to be the sentence's rarest word.  A usable example must have a known
+guard, so :meth:`SentenceIndex.examples` probes the postings once per known
+word and only reads sentences whose guard the learner knows, instead of
+every sentence containing the target.
+
+Building is incremental: :meth:`SentenceIndex.update` re-parses only files
+whose modification time or size changed since they were indexed and drops
+files that no longer exist.  Files are cut into byte ranges that end on
+sentence boundaries, parsed in parallel by a process pool and written to
+SQLite range by range as results arrive, so memory stays bounded however
+large a corpus file is.
+"""
+
+from __future__ import annotations
+
+import codecs
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .vocabulary import DEFAULT_CHUNK_SIZE, CorpusReadError, iter_tokens
+from .vocabulary_index import _from_le, _to_le
+
+MAX_SENTENCE_WORDS = 40
+# Bytes of corpus parsed per task; bounds the size of each result batch.
+DEFAULT_RANGE_BYTES = 4 << 20
+
+# A sentence ends after terminal punctuation followed by whitespace, or at a
+# blank line.
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+_SENTENCE_END_BYTES_RE = re.compile(rb"[.!?][ \t\n\r\f\v]+|\n[ \t\r\f\v]*\n")
+
+# Bumped whenever the tables change; older index files are rebuilt.
+_SCHEMA_VERSION = 2
+
+_TABLES = ("postings", "sentences", "words", "sources")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    word TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentences (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    word_ids BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sentences_source ON sentences (source_id);
+CREATE TABLE IF NOT EXISTS postings (
+    word_id INTEGER NOT NULL,
+    guard_id INTEGER NOT NULL,
+    n_words INTEGER NOT NULL,
+    sentence_id INTEGER NOT NULL,
+    PRIMARY KEY (word_id, guard_id, n_words, sentence_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_sentence ON postings (sentence_id);
+"""
+
+ParsedSentence = Tuple[str, List[str]]
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield whitespace-normalised sentences from consecutive text chunks."""
+
+    carry = ""
+    for chunk in chunks:
+        parts = _SENTENCE_END_RE.split(carry + chunk)
+        carry = parts.pop()
+        for part in parts:
+            sentence = " ".join(part.split())
+            if sentence:
+                yield sentence
+    sentence = " ".join(carry.split())
+    if sentence:
+        yield sentence
+
+
+def _sentence_bounds(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split *path* into up to *parts* byte ranges that end on sentence breaks.
+
+    Like :func:`~language_learning.vocabulary._range_bounds`, but every cut
+    is placed after a sentence terminator and its whitespace, so each range
+    yields exactly the sentences :func:`iter_sentences` would find there.
+    """
+
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            pos = max(size * i // parts, bounds[-1])
+            f.seek(pos)
+            while True:
+                buf = f.read(1 << 16)
+                if not buf:
+                    pos = size
+                    break
+                end = _SENTENCE_END_BYTES_RE.search(buf)
+                if end:
+                    pos += end.end()
+                    break
+                pos += len(buf)
+            bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+RangeTask = Tuple[str, int, int, int, int]
+
+
+def _parse_range(task: RangeTask) -> List[ParsedSentence]:
+    """Parse the sentences in one byte range of a file (process pool worker)."""
+
+    path, start, end, max_words, chunk_size = task
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def chunks(f) -> Iterator[str]:
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data)
+        yield decoder.decode(b"", final=True)
+
+    parsed: List[ParsedSentence] = []
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            for sentence in iter_sentences(chunks(f)):
+                tokens = list(iter_tokens([sentence]))
+                if tokens and len(tokens) <= max_words:
+                    parsed.append((sentence, sorted(set(tokens))))
+    except OSError as exc:
+        raise CorpusReadError(f"Could not read corpus file: {path}") from exc
+    except UnicodeDecodeError as exc:
+        raise CorpusReadError(f"Failed to decode corpus file as UTF-8: {path}") from exc
+    return parsed
+
+
+def parse_sentences(
+    path: str,
+    max_words: int = MAX_SENTENCE_WORDS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[ParsedSentence]:
+    """Return ``(text, distinct tokens)`` for each usable sentence in *path*.
+
+    Sentences with more than *max_words* tokens make poor examples and are
+    skipped.  Raises :class:`CorpusReadError` if the file cannot be read.
+    """
+
+    try:
+        size = os.path.getsize(path)
+    except OSError as exc:
+        raise CorpusReadError(f"Could not read corpus file: {path}") from exc
+    return _parse_range((path, 0, size, max_words, chunk_size))
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _bounded_map(
+    pool: Optional[Executor], fn: Callable[[T], R], tasks: Iterable[T], window: int
+) -> Iterator[R]:
+    """Like ``pool.map`` but with at most *window* tasks in flight.
+
+    Results are yielded in task order.  Without a *pool* tasks run here.
+    """
+
+    if pool is None:
+        yield from map(fn, tasks)
+        return
+    pending: Deque[Future] = deque()
+    try:
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _guard(ids: Sequence[int], word_id: int) -> int:
+    """Return the highest id in sorted *ids* other than *word_id*.
+
+    A one-word sentence guards itself.
+    """
+
+    if ids[-1] != word_id or len(ids) == 1:
+        return ids[-1]
+    return ids[-2]
+
+
+class SentenceIndex:
+    """SQLite-backed sentence index supporting incremental updates."""
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = os.fspath(path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _SCHEMA_VERSION:
+            with self._conn:
+                for table in _TABLES:
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("CREATE TEMP TABLE known (id INTEGER PRIMARY KEY)")
+        self._vocab: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sentences").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Building
+    def update(
+        self,
+        paths: Iterable[Union[str, os.PathLike]],
+        workers: int = 1,
+        max_words: int = MAX_SENTENCE_WORDS,
+        range_bytes: int = DEFAULT_RANGE_BYTES,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Dict[str, int]:
+        """Bring the index in line with *paths*.
+
+        New or modified files are (re-)parsed in ranges of about
+        *range_bytes*, using up to *workers* processes; previously indexed
+        files that no longer exist are removed.  At most ``2 * workers``
+        ranges are parsed ahead of the writer.  Returns counts of
+        ``indexed``, ``unchanged`` and ``removed`` files.
+        """
+
+        with self._lock:
+            known = {
+                path: (mtime, size)
+                for path, mtime, size in self._conn.execute(
+                    "SELECT path, mtime_ns, size FROM sources"
+                )
+            }
+            stale: List[Tuple[str, Tuple[int, int]]] = []
+            wanted = [os.path.abspath(os.fspath(p)) for p in paths]
+            for path in dict.fromkeys(wanted):
+                try:
+                    st = os.stat(path)
+                except OSError as exc:
+                    raise CorpusReadError(f"Could not read corpus file: {path}") from exc
+                version = (st.st_mtime_ns, st.st_size)
+                if known.get(path) != version:
+                    stale.append((path, version))
+            removed = [path for path in known if not os.path.exists(path)]
+            for path in removed:
+                with self._conn:
+                    self._remove_source(path)
+
+            tasks: List[RangeTask] = []
+            owners: List[Tuple[int, bool, bool]] = []  # (file, first, last)
+            for n, (path, (_, size)) in enumerate(stale):
+                parts = max(workers, -(-size // max(1, range_bytes)))
+                ranges = _sentence_bounds(path, parts) or [(0, 0)]
+                for i, (start, end) in enumerate(ranges):
+                    tasks.append((path, start, end, max_words, chunk_size))
+                    owners.append((n, i == 0, i == len(ranges) - 1))
+
+            pool = None
+            if workers > 1 and len(tasks) > 1:
+                pool = ProcessPoolExecutor(max_workers=min(workers, len(tasks)))
+            try:
+                results = _bounded_map(pool, _parse_range, tasks, 2 * workers)
+                source_id = 0
+                for (n, first, last), parsed in zip(owners, results):
+                    path, version = stale[n]
+                    if first:
+                        source_id = self._begin_source(path)
+                    self._store_sentences(source_id, parsed)
+                    if last:
+                        self._finish_source(source_id, version)
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+            return {
+                "indexed": len(stale),
+                "unchanged": len(set(wanted)) - len(stale),
+                "removed": len(removed),
+            }
+
+    def _vocabulary(self) -> Dict[str, int]:
+        if self._vocab is None:
+            self._vocab = dict(self._conn.execute("SELECT word, id FROM words"))
+        return self._vocab
+
+    def _remove_source(self, path: str) -> None:
+        row = self._conn.execute("SELECT id FROM sources WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return
+        self._conn.execute(
+            "DELETE FROM postings WHERE sentence_id IN "
+            "(SELECT id FROM sentences WHERE source_id = ?)",
+            row,
+        )
+        self._conn.execute("DELETE FROM sentences WHERE source_id = ?", row)
+        self._conn.execute("DELETE FROM sources WHERE id = ?", row)
+
+    def _begin_source(self, path: str) -> int:
+        """Replace *path*'s sentences with an empty, not yet versioned source.
+
+        The source keeps an invalid version until :meth:`_finish_source`,
+        so a build interrupted part way re-parses the file next time.
+        """
+
+        with self._conn:
+            self._remove_source(path)
+            return self._conn.execute(
+                "INSERT INTO sources (path, mtime_ns, size) VALUES (?, -1, -1)", (path,)
+            ).lastrowid
+
+    def _finish_source(self, source_id: int, version: Tuple[int, int]) -> None:
+        with self._conn:
+            self._conn.execute(
+                "UPDATE sources SET mtime_ns = ?, size = ? WHERE id = ?", (*version, source_id)
+            )
+
+    def _store_sentences(self, source_id: int, parsed: Sequence[ParsedSentence]) -> None:
+        vocab = self._vocabulary()
+        try:
+            self._insert_sentences(source_id, parsed, vocab)
+        except BaseException:
+            self._vocab = None  # drop word ids from the rolled-back transaction
+            raise
+
+    def _insert_sentences(
+        self, source_id: int, parsed: Sequence[ParsedSentence], vocab: Dict[str, int]
+    ) -> None:
+        with self._conn:
+            for text, tokens in parsed:
+                ids = []
+                for token in tokens:
+                    wid = vocab.get(token)
+                    if wid is None:
+                        wid = vocab[token] = self._conn.execute(
+                            "INSERT INTO words (word) VALUES (?)", (token,)
+                        ).lastrowid
+                    ids.append(wid)
+                ids.sort()
+                sentence_id = self._conn.execute(
+                    "INSERT INTO sentences (source_id, text, word_ids) VALUES (?, ?, ?)",
+                    (source_id, text, _to_le(array("I", ids))),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                    ((wid, _guard(ids, wid), len(ids), sentence_id) for wid in ids),
+                )
+
+    # ------------------------------------------------------------------
+    # Queries
+    def examples(
+        self, word: str, known_words: Iterable[str], limit: int = 3
+    ) -> List[str]:
+        """Return up to *limit* sentences in which *word* is the only unknown.
+
+        Shorter sentences come first.  Every other token of a returned
+        sentence is in *known_words*.
+
+        The query makes one index probe per known word and then decodes
+        only the sentences whose guard word is known.  How many of those
+        fail the full check depends on how closely the learner's vocabulary
+        follows corpus order; a frequent target with a known but common
+        guard can still mean reading many of its sentences.
+        """
+
+        target = word.strip().lower()
+        with self._lock:
+            vocab = self._vocabulary()
+            target_id = vocab.get(target)
+            if target_id is None or limit <= 0:
+                return []
+            allowed = {vocab[t] for t in iter_tokens([" ".join(known_words)]) if t in vocab}
+            allowed.add(target_id)
+            with self._conn:
+                self._conn.execute("DELETE FROM temp.known")
+                self._conn.executemany(
+                    "INSERT INTO temp.known VALUES (?)", ((wid,) for wid in allowed)
+                )
+            # CROSS JOIN keeps SQLite from scanning all of the target's
+            # postings: each known word is one primary-key probe.  Sentences
+            # are then read, shortest first, until enough examples are found.
+            candidates = self._conn.execute(
+                "SELECT p.n_words, p.sentence_id FROM temp.known k "
+                "CROSS JOIN postings p ON p.word_id = ? AND p.guard_id = k.id "
+                "ORDER BY p.n_words, p.sentence_id",
+                (target_id,),
+            ).fetchall()
+            found: List[str] = []
+            for _, sentence_id in candidates:
+                text, blob = self._conn.execute(
+                    "SELECT text, word_ids FROM sentences WHERE id = ?", (sentence_id,)
+                ).fetchone()
+                if all(wid in allowed for wid in _from_le("I", blob)):
+                    found.append(text)
+                    if len(found) >= limit:
+                        break
+            return found
@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import itertools
 import json
+import struct
+
+import numpy as np
 
 from .vocabulary import get_top_coca_words
 
@@ -19,6 +24,27 @@ class ReviewState:
     efactor: float = 2.5
     next_review: datetime = field(default_factory=datetime.now)
 
+    def to_dict(self) -> Dict[str, object]:
+        """Return a JSON-serialisable representation of the state."""
+
+        return {
+            "repetitions": self.repetitions,
+            "interval": self.interval,
+            "efactor": self.efactor,
+            "next_review": self.next_review.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, info: Dict[str, object]) -> "ReviewState":
+        """Build a state from :meth:`to_dict` output, defaulting missing keys."""
+
+        return cls(
+            repetitions=int(info.get("repetitions", 0)),
+            interval=int(info.get("interval", 0)),
+            efactor=float(info.get("efactor", 2.5)),
+            next_review=datetime.fromisoformat(info["next_review"]),
+        )
+
 
 class SpacedRepetitionScheduler:
     """Implements a tiny variant of the SM-2 algorithm."""
@@ -26,8 +52,12 @@ class SpacedRepetitionScheduler:
     def __init__(self) -> None:
         self.state = ReviewState()
 
-    def review(self, quality: int) -> datetime:
-        """Update schedule based on *quality* (0-5) and return next review date."""
+    def review(self, quality: int, reviewed_at: Optional[datetime] = None) -> datetime:
+        """Update schedule based on *quality* (0-5) and return next review date.
+
+        The next review is scheduled relative to *reviewed_at*, which defaults
+        to the current time.
+        """
         if quality < 3:
             self.state.repetitions = 0
             self.state.interval = 1
@@ -46,16 +76,205 @@ class SpacedRepetitionScheduler:
         if self.state.efactor < 1.3:
             self.state.efactor = 1.3
 
-        self.state.next_review = datetime.now() + timedelta(days=self.state.interval)
+        reviewed_at = reviewed_at or datetime.now()
+        self.state.next_review = reviewed_at + timedelta(days=self.state.interval)
         return self.state.next_review
 
 
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+
+
+def _epoch_microseconds(moment: datetime) -> int:
+    """Return *moment* as integer microseconds since the Unix epoch.
+
+    Naive datetimes are measured against a naive epoch so that differences
+    match plain ``datetime`` subtraction exactly.
+    """
+
+    delta = moment - (_EPOCH if moment.tzinfo is None else _EPOCH_UTC)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@dataclass
+class ReviewColumns:
+    """Column-oriented snapshot of review state for vectorised scoring.
+
+    ``next_review`` is stored as integer microseconds since the epoch so the
+    overdue time of every word is exact and priorities match
+    :meth:`SRSFilter._forgetting_probability` bit for bit.
+    """
+
+    words: List[str]
+    repetitions: np.ndarray
+    interval: np.ndarray
+    efactor: np.ndarray
+    next_review: np.ndarray
+    rank: np.ndarray
+
+    @classmethod
+    def from_filter(cls, filt: "SRSFilter") -> "ReviewColumns":
+        """Build columns for every word tracked by *filt*, in scheduler order."""
+
+        words = list(filt.schedulers)
+        states = [filt.schedulers[w].state for w in words]
+        ranks = filt.goal_frequency_ranks
+        return cls(
+            words=words,
+            repetitions=np.fromiter((s.repetitions for s in states), np.int64, len(words)),
+            interval=np.fromiter((s.interval for s in states), np.int64, len(words)),
+            efactor=np.fromiter((s.efactor for s in states), np.float64, len(words)),
+            next_review=np.fromiter(
+                (_epoch_microseconds(s.next_review) for s in states), np.int64, len(words)
+            ),
+            rank=np.fromiter((ranks.get(w, 1) for w in words), np.float64, len(words)),
+        )
+
+    def scores(self, now: datetime) -> np.ndarray:
+        """Return the priority of every word at *now*; ``0`` if not yet due."""
+
+        overdue = _epoch_microseconds(now) - self.next_review
+        interval = np.where(self.interval == 0, 1, self.interval).astype(np.float64)
+        fp = overdue.astype(np.float64) / 1e6 / 86400 / interval
+        return np.where(overdue > 0, fp * (1.0 / self.rank), 0.0)
+
+    def top_due(
+        self, k: Optional[int], now: datetime, reviewed_only: bool = False
+    ) -> List[str]:
+        """Return up to *k* due words ordered by descending priority.
+
+        Ties keep column order, as the scalar scan does.  ``k=None`` returns
+        every due word.  With ``reviewed_only`` words without repetitions are
+        skipped.
+        """
+
+        scores = self.scores(now)
+        due = self.next_review < _epoch_microseconds(now)
+        if reviewed_only:
+            due &= self.repetitions > 0
+        idx = np.flatnonzero(due)
+        if k is not None and k < len(idx):
+            if k <= 0:
+                return []
+            cand = scores[idx]
+            # Keep every candidate tied with the k-th best so the final
+            # ordering can still break ties by position.
+            threshold = cand[np.argpartition(-cand, k - 1)[k - 1]]
+            idx = idx[cand >= threshold]
+        order = idx[np.lexsort((idx, -scores[idx]))]
+        if k is not None:
+            order = order[:k]
+        return [self.words[i] for i in order]
+
+
+# ---------------------------------------------------------------------------
+# Compact binary encoding of review state
+#
+# Layout: ``_STATE_MAGIC``, a little-endian ``uint32`` record count, then per
+# record ``_STATE_RECORD`` (repetitions, interval, efactor, next_review in
+# epoch microseconds, 1 if next_review is UTC-aware, word length) followed by
+# the UTF-8 word.
+_STATE_MAGIC = b"LLRS\x01"
+_STATE_COUNT = struct.Struct("<I")
+_STATE_RECORD = struct.Struct("<IIdqBH")
+
+
+def encode_review_states(states: Dict[str, ReviewState]) -> bytes:
+    """Encode ``word -> ReviewState`` into the compact binary format."""
+
+    parts = [_STATE_MAGIC, _STATE_COUNT.pack(len(states))]
+    for word, st in states.items():
+        raw = word.encode("utf-8")
+        parts.append(
+            _STATE_RECORD.pack(
+                st.repetitions,
+                st.interval,
+                st.efactor,
+                _epoch_microseconds(st.next_review),
+                st.next_review.tzinfo is not None,
+                len(raw),
+            )
+        )
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def is_encoded_review_states(data: bytes) -> bool:
+    """Return ``True`` if *data* starts with the binary state header."""
+
+    return data.startswith(_STATE_MAGIC)
+
+
+def decode_review_states(data: bytes) -> Dict[str, ReviewState]:
+    """Decode :func:`encode_review_states` output.
+
+    Raises :class:`ValueError` if the header is missing or the data is
+    truncated.
+    """
+
+    if not is_encoded_review_states(data):
+        raise ValueError("Not an encoded review state payload")
+    try:
+        offset = len(_STATE_MAGIC)
+        (count,) = _STATE_COUNT.unpack_from(data, offset)
+        offset += _STATE_COUNT.size
+        states: Dict[str, ReviewState] = {}
+        for _ in range(count):
+            reps, interval, efactor, micros, aware, size = _STATE_RECORD.unpack_from(
+                data, offset
+            )
+            offset += _STATE_RECORD.size
+            raw = data[offset : offset + size]
+            if len(raw) != size:
+                raise struct.error("truncated word")
+            word = raw.decode("utf-8")
+            offset += size
+            base = _EPOCH_UTC if aware else _EPOCH
+            states[word] = ReviewState(
+                reps, interval, efactor, base + timedelta(microseconds=micros)
+            )
+    except (struct.error, UnicodeDecodeError) as exc:
+        raise ValueError(f"Malformed review state payload: {exc}") from exc
+    return states
+
+
+class _SchedulerMap(dict):
+    """``dict`` of schedulers that tells its :class:`SRSFilter` about additions.
+
+    Removals need no notification: stale queue entries are discarded lazily
+    when they surface.
+    """
+
+    def __init__(self, owner: "SRSFilter", *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._owner = owner
+
+    def __setitem__(self, word: str, sched: SpacedRepetitionScheduler) -> None:
+        super().__setitem__(word, sched)
+        self._owner._enqueue(word)
+
+    def setdefault(self, word, default=None):  # type: ignore[override]
+        if word not in self:
+            self[word] = default
+        return self[word]
+
+    def update(self, *args, **kwargs) -> None:  # type: ignore[override]
+        for word, sched in dict(*args, **kwargs).items():
+            self[word] = sched
+
+
 class SRSFilter:
     """Manage multiple words and their review state.
 
     Each word has an associated :class:`SpacedRepetitionScheduler` and a
     ``goal_frequency_rank``.  Lower ranks indicate higher frequency.
 
+    Due words are served from an index built on first use: a heap keyed on
+    ``next_review`` holds words that are not yet due and a second heap holds
+    due words ordered by priority for the current ``now``.  Reviews through
+    :meth:`review` update the index incrementally; if a scheduler's state is
+    modified directly after the index has been queried, call :meth:`reindex`.
+
     Items can be serialised to and from JSON using :meth:`save_state` and
     :meth:`load_state`.  To obtain a filter pre-populated with common vocabulary
     use :func:`default_srs_filter`.
@@ -63,9 +282,10 @@ class SRSFilter:
 
     def __init__(self, goal_frequency_ranks: Dict[str, int]) -> None:
         self.goal_frequency_ranks = goal_frequency_ranks
-        self.schedulers: Dict[str, SpacedRepetitionScheduler] = {
-            word: SpacedRepetitionScheduler() for word in goal_frequency_ranks
-        }
+        self._indexed = False
+        self.schedulers: Dict[str, SpacedRepetitionScheduler] = _SchedulerMap(
+            self, {word: SpacedRepetitionScheduler() for word in goal_frequency_ranks}
+        )
 
     # ------------------------------------------------------------------
     # Persistence helpers
@@ -74,14 +294,8 @@ class SRSFilter:
 
         data: Dict[str, Dict[str, object]] = {}
         for word, scheduler in self.schedulers.items():
-            st = scheduler.state
-            data[word] = {
-                "repetitions": st.repetitions,
-                "interval": st.interval,
-                "efactor": st.efactor,
-                "next_review": st.next_review.isoformat(),
-                "goal_frequency_rank": self.goal_frequency_ranks.get(word, 1),
-            }
+            data[word] = scheduler.state.to_dict()
+            data[word]["goal_frequency_rank"] = self.goal_frequency_ranks.get(word, 1)
         with open(path, "w", encoding="utf-8") as fh:
             json.dump(data, fh)
 
@@ -126,10 +340,30 @@ class SRSFilter:
 
     # ------------------------------------------------------------------
     # Review helpers
-    def review(self, word: str, quality: int) -> datetime:
+    def review(
+        self, word: str, quality: int, reviewed_at: Optional[datetime] = None
+    ) -> datetime:
         """Review *word* with given *quality* using its scheduler."""
 
-        return self.schedulers[word].review(quality)
+        nxt = self.schedulers[word].review(quality, reviewed_at)
+        self._enqueue(word)
+        return nxt
+
+    def review_many(
+        self, reviews: Iterable[Tuple[str, int, Optional[datetime]]]
+    ) -> Dict[str, Dict[str, object]]:
+        """Apply several ``(word, quality, reviewed_at)`` reviews in order.
+
+        Explicit ``reviewed_at`` timestamps make replays deterministic; ``None``
+        falls back to the current time.  Returns the serialised state of the
+        reviewed words only, keyed by word.
+        """
+
+        changed: Dict[str, None] = {}
+        for word, quality, reviewed_at in reviews:
+            self.review(word, quality, reviewed_at)
+            changed[word] = None
+        return {w: self.schedulers[w].state.to_dict() for w in changed}
 
     def _forgetting_probability(self, word: str, now: Optional[datetime] = None) -> float:
         """Compute a crude forgetting probability for *word*.
@@ -147,26 +381,174 @@ class SRSFilter:
         interval = sched.state.interval or 1
         return overdue_seconds / 86400 / interval
 
-    def pop_next_due(self) -> Optional[str]:
-        """Return the next due word based on priority.
+    def _priority(self, word: str, now: datetime) -> float:
+        fp = self._forgetting_probability(word, now)
+        if fp <= 0:
+            return 0.0
+        goal_freq = 1.0 / float(self.goal_frequency_ranks.get(word, 1))
+        return fp * goal_freq
 
-        Priority is calculated as ``forgetting_probability * goal_frequency``
-        where ``goal_frequency`` is the reciprocal of ``goal_frequency_rank``.
+    # ------------------------------------------------------------------
+    # Vectorised scoring
+    def columns(self) -> ReviewColumns:
+        """Return a :class:`ReviewColumns` snapshot of the current state."""
+
+        return ReviewColumns.from_filter(self)
+
+    def score_all(self, now: Optional[datetime] = None) -> np.ndarray:
+        """Return priorities for all words, aligned with ``self.schedulers``."""
+
+        return self.columns().scores(now or datetime.now())
+
+    def top_due(
+        self,
+        k: Optional[int],
+        now: Optional[datetime] = None,
+        reviewed_only: bool = False,
+    ) -> List[str]:
+        """Return up to *k* due words by priority in one vectorised pass.
+
+        The ordering is identical to repeated :meth:`pop_next_due` calls at the
+        same *now*, but the due queue is left untouched.
         """
 
-        now = datetime.now()
-        best_word: Optional[str] = None
-        best_score = -1.0
+        return self.columns().top_due(k, now or datetime.now(), reviewed_only)
+
+    # ------------------------------------------------------------------
+    # Due-queue index
+    #
+    # ``_waiting`` entries are ``(next_review, ordinal, version, word,
+    # interval)`` and ``_ready`` entries are ``(-priority, ordinal, version,
+    # word, next_review, interval)``.  An entry is live only while its version
+    # matches ``_versions[word]``; the ordinal preserves the scheduler
+    # insertion order for ties, as in a linear scan.
+    def reindex(self) -> None:
+        """Rebuild the due-queue index from the current scheduler states."""
+
+        self._waiting: List[Tuple] = []
+        self._ready: List[Tuple] = []
+        self._ready_at: Optional[datetime] = None
+        self._versions: Dict[str, int] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._indexed = True
         for word in self.schedulers:
-            fp = self._forgetting_probability(word, now)
-            if fp <= 0:
+            self._enqueue(word)
+
+    def _enqueue(self, word: str) -> None:
+        if not self._indexed:
+            return
+        st = self.schedulers[word].state
+        version = self._versions.get(word, 0) + 1
+        self._versions[word] = version
+        ordinal = self._ordinals.setdefault(word, next(self._counter))
+        heapq.heappush(
+            self._waiting, (st.next_review, ordinal, version, word, st.interval)
+        )
+
+    def _is_current(self, word: str, version: int, next_review, interval) -> bool:
+        """Return ``True`` if a queue entry still describes *word*.
+
+        Entries for removed words or superseded versions are dropped.  Entries
+        whose word was modified in place are re-queued from the live state.
+        """
+
+        if self._versions.get(word) != version or word not in self.schedulers:
+            return False
+        st = self.schedulers[word].state
+        if st.next_review != next_review or st.interval != interval:
+            self._enqueue(word)
+            return False
+        return True
+
+    def _advance(self, now: datetime) -> None:
+        """Bring the ready heap up to date for *now*."""
+
+        if not self._indexed:
+            self.reindex()
+        if self._ready_at is not None and now != self._ready_at:
+            # Priorities depend on ``now``: re-score lazily, only when asked
+            # about a different instant, and send items that are no longer
+            # due back to the waiting heap.
+            stale, self._ready = self._ready, []
+            for _, ordinal, version, word, nr, interval in stale:
+                if not self._is_current(word, version, nr, interval):
+                    continue
+                if nr < now:
+                    score = self._priority(word, now)
+                    self._ready.append((-score, ordinal, version, word, nr, interval))
+                else:
+                    heapq.heappush(
+                        self._waiting, (nr, ordinal, version, word, interval)
+                    )
+            heapq.heapify(self._ready)
+        self._ready_at = now
+        self._promote()
+
+    def _promote(self) -> None:
+        """Move waiting entries that are due at ``_ready_at`` to the ready heap."""
+
+        now = self._ready_at
+        while self._waiting and self._waiting[0][0] < now:
+            nr, ordinal, version, word, interval = heapq.heappop(self._waiting)
+            if not self._is_current(word, version, nr, interval):
                 continue
-            goal_freq = 1.0 / float(self.goal_frequency_ranks.get(word, 1))
-            score = fp * goal_freq
-            if score > best_score:
-                best_score = score
-                best_word = word
-        return best_word
+            score = self._priority(word, now)
+            heapq.heappush(self._ready, (-score, ordinal, version, word, nr, interval))
+
+    def _pop_ready(self) -> Optional[Tuple]:
+        while True:
+            # Entries found stale below may have been re-queued as due.
+            self._promote()
+            if not self._ready:
+                return None
+            entry = heapq.heappop(self._ready)
+            _, _, version, word, nr, interval = entry
+            if self._is_current(word, version, nr, interval):
+                return entry
+
+    def pop_next_due(self, now: Optional[datetime] = None) -> Optional[str]:
+        """Remove and return the next due word based on priority.
+
+        Priority is calculated as ``forgetting_probability * goal_frequency``
+        where ``goal_frequency`` is the reciprocal of ``goal_frequency_rank``.
+        The returned word leaves the due queue until it is reviewed again (or
+        :meth:`reindex` is called).  Pass a fixed *now* when popping
+        repeatedly so priorities are not re-scored on every call.
+        """
+
+        self._advance(now or datetime.now())
+        entry = self._pop_ready()
+        if entry is None:
+            return None
+        word = entry[3]
+        self._versions[word] += 1
+        return word
+
+    def peek_next_k(self, k: int, now: Optional[datetime] = None) -> List[str]:
+        """Return up to *k* due words in priority order without removing them."""
+
+        self._advance(now or datetime.now())
+        taken: List[Tuple] = []
+        while len(taken) < k:
+            entry = self._pop_ready()
+            if entry is None:
+                break
+            taken.append(entry)
+        for entry in taken:
+            heapq.heappush(self._ready, entry)
+        return [entry[3] for entry in taken]
+
+    def drain_due(self, now: Optional[datetime] = None) -> List[str]:
+        """Remove and return every due word in priority order."""
+
+        now = now or datetime.now()
+        words: List[str] = []
+        while True:
+            word = self.pop_next_due(now)
+            if word is None:
+                return words
+            words.append(word)
 
 
 def default_srs_filter() -> "SRSFilter":
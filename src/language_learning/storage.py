@@ -1,9 +1,12 @@
-"""Simple JSON-based persistence helpers.
+"""Simple persistence helpers.
 
-This module provides a tiny wrapper around JSON files for persisting
-user profiles, goal lists and spaced-repetition review state.  The class
-is intentionally lightweight; callers supply the file path and interact
-through dedicated ``save_*`` and ``load_*`` methods.
+This module provides small wrappers for persisting user profiles, goal lists
+and spaced-repetition review state.  :class:`JSONStorage` keeps everything in
+one JSON file; :class:`SQLiteStorage` offers the same interface on top of a
+SQLite database in WAL mode with per-goal and per-word updates.  Callers
+supply the file path and interact through dedicated ``save_*`` and ``load_*``
+methods.  :class:`ShardedSQLiteStorage` serves many learners by spreading them
+over several database files and takes the user id on every call.
 """
 
 from __future__ import annotations
@@ -11,8 +14,14 @@ from __future__ import annotations
 import json
 import os
 import shutil
+import sqlite3
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import asdict
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from .goals import GoalItem
 
@@ -68,6 +77,19 @@ class JSONStorage:
         data = self._read()
         return [GoalItem(**info) for info in data.get("goals", [])]
 
+    def upsert_goal(self, item: GoalItem) -> None:
+        goals = self.load_goals()
+        for i, goal in enumerate(goals):
+            if goal.word == item.word:
+                goals[i] = item
+                break
+        else:
+            goals.append(item)
+        self.save_goals(goals)
+
+    def delete_goal(self, word: str) -> None:
+        self.save_goals([g for g in self.load_goals() if g.word != word])
+
     # ------------------------------------------------------------------
     # Review state persistence
     def save_review_state(self, state: Dict[str, Any]) -> None:
@@ -78,3 +100,419 @@ class JSONStorage:
     def load_review_state(self) -> Dict[str, Any]:
         data = self._read()
         return data.get("review_state", {})
+
+    def upsert_review_state(self, updates: Dict[str, Any]) -> None:
+        data = self._read()
+        data.setdefault("review_state", {}).update(updates)
+        self._write(data)
+
+
+DEFAULT_USER_ID = "default"
+
+_SQLITE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id TEXT PRIMARY KEY,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS goals (
+        user_id TEXT NOT NULL,
+        word TEXT NOT NULL,
+        weight REAL NOT NULL,
+        is_default INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        PRIMARY KEY (user_id, word)
+    );
+    CREATE TABLE IF NOT EXISTS review_state (
+        user_id TEXT NOT NULL,
+        word TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (user_id, word)
+    );
+"""
+
+
+def _connect(path: Union[str, os.PathLike]) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        str(path), isolation_level=None, check_same_thread=False, timeout=30
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SQLITE_SCHEMA)
+    return conn
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class _UserTables:
+    """SQL for one learner's rows; shared by the SQLite storage classes.
+
+    Every method takes an open connection, which the caller must hold
+    exclusively for the duration of the call.
+    """
+
+    @staticmethod
+    def save_user(conn: sqlite3.Connection, user_id: str, user: Dict[str, Any]) -> None:
+        with _transaction(conn):
+            conn.execute(
+                "INSERT INTO users (user_id, data) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+                (user_id, json.dumps(user)),
+            )
+
+    @staticmethod
+    def load_user(conn: sqlite3.Connection, user_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            "SELECT data FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def save_goals(conn: sqlite3.Connection, user_id: str, goals: List[GoalItem]) -> None:
+        with _transaction(conn):
+            conn.execute("DELETE FROM goals WHERE user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT INTO goals (user_id, word, weight, is_default, position) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (user_id, g.word, g.weight, int(g.is_default), pos)
+                    for pos, g in enumerate(goals)
+                ],
+            )
+
+    @staticmethod
+    def load_goals(conn: sqlite3.Connection, user_id: str) -> List[GoalItem]:
+        rows = conn.execute(
+            "SELECT word, weight, is_default FROM goals WHERE user_id = ? "
+            "ORDER BY position",
+            (user_id,),
+        ).fetchall()
+        return [GoalItem(word, weight, bool(is_default)) for word, weight, is_default in rows]
+
+    @staticmethod
+    def upsert_goal(conn: sqlite3.Connection, user_id: str, item: GoalItem) -> None:
+        with _transaction(conn):
+            conn.execute(
+                "INSERT INTO goals (user_id, word, weight, is_default, position) "
+                "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(position), -1) + 1 "
+                "FROM goals WHERE user_id = ?)) "
+                "ON CONFLICT(user_id, word) DO UPDATE SET "
+                "weight = excluded.weight, is_default = excluded.is_default",
+                (user_id, item.word, item.weight, int(item.is_default), user_id),
+            )
+
+    @staticmethod
+    def delete_goal(conn: sqlite3.Connection, user_id: str, word: str) -> None:
+        with _transaction(conn):
+            conn.execute(
+                "DELETE FROM goals WHERE user_id = ? AND word = ?", (user_id, word)
+            )
+
+    @staticmethod
+    def save_review_state(
+        conn: sqlite3.Connection, user_id: str, state: Dict[str, Any]
+    ) -> None:
+        with _transaction(conn):
+            conn.execute("DELETE FROM review_state WHERE user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT INTO review_state (user_id, word, data) VALUES (?, ?, ?)",
+                [(user_id, word, json.dumps(info)) for word, info in state.items()],
+            )
+
+    @staticmethod
+    def load_review_state(conn: sqlite3.Connection, user_id: str) -> Dict[str, Any]:
+        rows = conn.execute(
+            "SELECT word, data FROM review_state WHERE user_id = ?", (user_id,)
+        ).fetchall()
+        return {word: json.loads(data) for word, data in rows}
+
+    @staticmethod
+    def upsert_review_state(
+        conn: sqlite3.Connection, user_id: str, updates: Dict[str, Any]
+    ) -> None:
+        with _transaction(conn):
+            conn.executemany(
+                "INSERT INTO review_state (user_id, word, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id, word) DO UPDATE SET data = excluded.data",
+                [(user_id, word, json.dumps(info)) for word, info in updates.items()],
+            )
+
+
+class SQLiteStorage:
+    """Persist user, goal and review information in a SQLite database.
+
+    The database runs in WAL mode so readers never block the writer, and every
+    write happens in an immediate transaction so concurrent writers (threads
+    or processes) serialise instead of losing updates.  Besides the
+    :class:`JSONStorage` interface it supports per-goal and per-word upserts.
+    Rows belong to ``user_id``, so several learners may share one database.
+    """
+
+    def __init__(
+        self, path: Union[str, os.PathLike], user_id: str = DEFAULT_USER_ID
+    ) -> None:
+        self.path = path
+        self.user_id = user_id
+        self._lock = threading.RLock()
+        self._conn = _connect(path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # User persistence
+    def save_user(self, user: Dict[str, Any]) -> None:
+        with self._lock:
+            _UserTables.save_user(self._conn, self.user_id, user)
+
+    def load_user(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return _UserTables.load_user(self._conn, self.user_id)
+
+    # ------------------------------------------------------------------
+    # Goal persistence
+    def save_goals(self, goals: List[GoalItem]) -> None:
+        with self._lock:
+            _UserTables.save_goals(self._conn, self.user_id, goals)
+
+    def load_goals(self) -> List[GoalItem]:
+        with self._lock:
+            return _UserTables.load_goals(self._conn, self.user_id)
+
+    def upsert_goal(self, item: GoalItem) -> None:
+        """Insert or update a single goal, keeping the position of existing ones."""
+
+        with self._lock:
+            _UserTables.upsert_goal(self._conn, self.user_id, item)
+
+    def delete_goal(self, word: str) -> None:
+        with self._lock:
+            _UserTables.delete_goal(self._conn, self.user_id, word)
+
+    # ------------------------------------------------------------------
+    # Review state persistence
+    def save_review_state(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            _UserTables.save_review_state(self._conn, self.user_id, state)
+
+    def load_review_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return _UserTables.load_review_state(self._conn, self.user_id)
+
+    def upsert_review_state(self, updates: Dict[str, Any]) -> None:
+        """Insert or replace the review state of the words in *updates* only."""
+
+        with self._lock:
+            _UserTables.upsert_review_state(self._conn, self.user_id, updates)
+
+
+class _PooledConnection:
+    def __init__(self, path: str) -> None:
+        self.conn = _connect(path)
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class _ConnectionPool:
+    """Bounded LRU pool of SQLite connections, one per database file.
+
+    Each connection is used by one thread at a time.  When more than
+    ``max_size`` files are open the least recently used idle connections are
+    closed; connections in use are never evicted, so the pool may briefly
+    exceed its bound under heavy concurrency.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _PooledConnection]" = OrderedDict()
+
+    @contextmanager
+    def connection(self, path: str) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = self._entries[path] = _PooledConnection(path)
+            self._entries.move_to_end(path)
+            entry.users += 1
+            self._evict()
+        try:
+            with entry.lock:
+                yield entry.conn
+        finally:
+            with self._lock:
+                entry.users -= 1
+                self._evict()
+
+    def _evict(self) -> None:
+        for path in list(self._entries):
+            if len(self._entries) <= self.max_size:
+                return
+            entry = self._entries[path]
+            if not entry.users:
+                del self._entries[path]
+                entry.conn.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                with entry.lock:
+                    entry.conn.close()
+            self._entries.clear()
+
+
+class ShardedSQLiteStorage:
+    """User-keyed storage spread over several SQLite files.
+
+    Learners are assigned to one of ``shards`` database files in *directory*
+    by a stable hash of their user id, and at most ``pool_size`` shard
+    connections are kept open.  Every ``load_*``/``save_*`` method takes the
+    user id first; :meth:`for_user` returns a view with the single-user
+    interface of :class:`JSONStorage`.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        shards: int = 16,
+        pool_size: int = 8,
+    ) -> None:
+        self.directory = str(directory)
+        self.shards = shards
+        os.makedirs(self.directory, exist_ok=True)
+        self._pool = _ConnectionPool(pool_size)
+
+    def shard_path(self, user_id: str) -> str:
+        shard = zlib.crc32(user_id.encode("utf-8")) % self.shards
+        return os.path.join(self.directory, f"shard-{shard:03d}.db")
+
+    def for_user(self, user_id: str) -> "UserStorage":
+        return UserStorage(self, user_id)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _run(self, method: str, user_id: str, *args: Any) -> Any:
+        with self._pool.connection(self.shard_path(user_id)) as conn:
+            return getattr(_UserTables, method)(conn, user_id, *args)
+
+    def save_user(self, user_id: str, user: Dict[str, Any]) -> None:
+        self._run("save_user", user_id, user)
+
+    def load_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._run("load_user", user_id)
+
+    def save_goals(self, user_id: str, goals: List[GoalItem]) -> None:
+        self._run("save_goals", user_id, goals)
+
+    def load_goals(self, user_id: str) -> List[GoalItem]:
+        return self._run("load_goals", user_id)
+
+    def upsert_goal(self, user_id: str, item: GoalItem) -> None:
+        self._run("upsert_goal", user_id, item)
+
+    def delete_goal(self, user_id: str, word: str) -> None:
+        self._run("delete_goal", user_id, word)
+
+    def save_review_state(self, user_id: str, state: Dict[str, Any]) -> None:
+        self._run("save_review_state", user_id, state)
+
+    def load_review_state(self, user_id: str) -> Dict[str, Any]:
+        return self._run("load_review_state", user_id)
+
+    def upsert_review_state(self, user_id: str, updates: Dict[str, Any]) -> None:
+        self._run("upsert_review_state", user_id, updates)
+
+
+class UserStorage:
+    """One learner's view of a :class:`ShardedSQLiteStorage`."""
+
+    def __init__(self, backend: ShardedSQLiteStorage, user_id: str) -> None:
+        self.backend = backend
+        self.user_id = user_id
+
+    def save_user(self, user: Dict[str, Any]) -> None:
+        self.backend.save_user(self.user_id, user)
+
+    def load_user(self) -> Optional[Dict[str, Any]]:
+        return self.backend.load_user(self.user_id)
+
+    def save_goals(self, goals: List[GoalItem]) -> None:
+        self.backend.save_goals(self.user_id, goals)
+
+    def load_goals(self) -> List[GoalItem]:
+        return self.backend.load_goals(self.user_id)
+
+    def upsert_goal(self, item: GoalItem) -> None:
+        self.backend.upsert_goal(self.user_id, item)
+
+    def delete_goal(self, word: str) -> None:
+        self.backend.delete_goal(self.user_id, word)
+
+    def save_review_state(self, state: Dict[str, Any]) -> None:
+        self.backend.save_review_state(self.user_id, state)
+
+    def load_review_state(self) -> Dict[str, Any]:
+        return self.backend.load_review_state(self.user_id)
+
+    def upsert_review_state(self, updates: Dict[str, Any]) -> None:
+        self.backend.upsert_review_state(self.user_id, updates)
+
+
+Storage = Union[JSONStorage, SQLiteStorage, UserStorage]
+
+_SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def open_storage(
+    path: str, backend: Optional[str] = None
+) -> Union[Storage, ShardedSQLiteStorage]:
+    """Return a storage object for *path*.
+
+    *backend* is ``"json"``, ``"sqlite"`` or ``"sharded"`` (where *path* is a
+    directory of shard databases); when omitted it is inferred from the file
+    extension, defaulting to JSON.
+    """
+
+    if backend is None:
+        backend = "sqlite" if str(path).endswith(_SQLITE_SUFFIXES) else "json"
+    if backend == "sqlite":
+        return SQLiteStorage(path)
+    if backend == "sharded":
+        return ShardedSQLiteStorage(path)
+    if backend == "json":
+        return JSONStorage(path)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def migrate_json_to_sqlite(
+    json_path: Union[str, os.PathLike], db_path: Union[str, os.PathLike]
+) -> SQLiteStorage:
+    """Copy user, goals and review state from a JSON store into SQLite."""
+
+    source = JSONStorage(json_path)
+    target = SQLiteStorage(db_path)
+    user = source.load_user()
+    if user is not None:
+        target.save_user(user)
+    target.save_goals(source.load_goals())
+    target.save_review_state(source.load_review_state())
+    return target
+
+
+if __name__ == "__main__":  # pragma: no cover - command line migration
+    if len(sys.argv) != 3:
+        raise SystemExit("usage: python -m language_learning.storage STORAGE.json TARGET.db")
+    migrate_json_to_sqlite(sys.argv[1], sys.argv[2]).close()
@@ -0,0 +1,94 @@
+"""Inverted index over media transcripts for comprehensibility ranking.
+
+Learners progress fastest on input they mostly understand.  :class:`TranscriptIndex`
+tokenizes each transcript with the same rules as
+:func:`~language_learning.vocabulary.extract_vocabulary` and stores, per word,
+a postings list of ``(document, count)`` pairs plus each document's token
+count.  :meth:`TranscriptIndex.top_k` then scores documents by the share of
+their tokens the learner knows by walking only the postings of the known
+words, so query time grows with the learner's vocabulary rather than with
+the size of the catalogue.
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .vocabulary import iter_tokens
+
+MediaItem = Dict[str, object]
+
+
+class TranscriptIndex:
+    """Word → postings index with per-document token counts."""
+
+    def __init__(self) -> None:
+        self._items: List[MediaItem] = []
+        self._lengths = array("I")
+        self._postings: Dict[str, Tuple[array, array]] = defaultdict(
+            lambda: (array("I"), array("I"))
+        )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: MediaItem) -> None:
+        """Index *item* by its ``transcript``; items without one are skipped."""
+
+        transcript = item.get("transcript")
+        if not isinstance(transcript, str):
+            return
+        counts = Counter(iter_tokens([transcript]))
+        if not counts:
+            return
+        doc = len(self._items)
+        self._items.append(item)
+        self._lengths.append(sum(counts.values()))
+        for word, count in counts.items():
+            docs, freqs = self._postings[word]
+            docs.append(doc)
+            freqs.append(count)
+
+    @classmethod
+    def from_items(cls, items: Iterable[MediaItem]) -> "TranscriptIndex":
+        index = cls()
+        for item in items:
+            index.add(item)
+        return index
+
+    def coverage(self, known_words: Iterable[str]) -> Dict[int, float]:
+        """Return known-token coverage for every document sharing a known word."""
+
+        known_tokens: Dict[int, int] = defaultdict(int)
+        for word in set(iter_tokens([" ".join(known_words)])):
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+            for doc, count in zip(*postings):
+                known_tokens[doc] += count
+        return {doc: n / self._lengths[doc] for doc, n in known_tokens.items()}
+
+    def top_k(
+        self,
+        known_words: Iterable[str],
+        k: int = 10,
+        max_coverage: Optional[float] = None,
+    ) -> List[Tuple[MediaItem, float]]:
+        """Return up to *k* ``(item, coverage)`` pairs, best covered first.
+
+        *max_coverage* excludes media the learner understands too well (for
+        example ``0.98`` keeps only clips with something new to learn).  Ties
+        keep catalogue order.
+        """
+
+        scores = self.coverage(known_words)
+        candidates = (
+            (cov, -doc)
+            for doc, cov in scores.items()
+            if max_coverage is None or cov <= max_coverage
+        )
+        best = heapq.nlargest(k, candidates)
+        return [(self._items[-neg_doc], cov) for cov, neg_doc in best]
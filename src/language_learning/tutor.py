@@ -12,10 +12,11 @@ from __future__ import annotations
 
 from itertools import zip_longest
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .spaced_repetition import SRSFilter
-from .ai_lessons import _generate_distractors
+from .ai_lessons import _attach_example, _generate_distractors, _generate_distractors_batch
+from .sentence_index import SentenceIndex
 
 
 def select_word_batch(
@@ -29,18 +30,13 @@ def select_word_batch(
     ``goal_ranked_words`` should be ordered such that earlier entries are more
     relevant to the learner's current goal.  ``srs_filter`` tracks review
     scheduling.  New words are those with no prior repetitions in
-    ``srs_filter`` while review words are drawn from the SRS queue based on
-    when they are due.
+    ``srs_filter`` while review words are the highest-priority due words that
+    have been reviewed at least once.  Unseen words are due as soon as they
+    are tracked, so they are introduced as new words rather than filling the
+    review slots.
     """
 
-    review_words: List[str] = []
-    seen: set[str] = set()
-    for _ in range(review_limit):
-        word = srs_filter.pop_next_due()
-        if not word or word in seen:
-            break
-        seen.add(word)
-        review_words.append(word)
+    review_words = srs_filter.top_due(review_limit, reviewed_only=True)
 
     new_words: List[str] = []
     for word in goal_ranked_words:
@@ -54,9 +50,11 @@ def select_word_batch(
     return new_words, review_words
 
 
-def _mcq_item(word: str) -> Dict[str, object]:
+def _mcq_item(word: str, distractors: Optional[List[str]] = None) -> Dict[str, object]:
     answer = f"meaning of {word}"
-    choices = [answer] + _generate_distractors(word)
+    if distractors is None:
+        distractors = _generate_distractors(word)
+    choices = [answer] + distractors
     random.shuffle(choices)
     return {
         "type": "mcq",
@@ -81,26 +79,42 @@ def generate_tutor_lesson(
     new_word_limit: int = 3,
     review_limit: int = 5,
     grammar_every: int = 10,
+    sentence_index: Optional[SentenceIndex] = None,
+    known_words: Optional[Iterable[str]] = None,
 ) -> List[Dict[str, object]]:
     """Generate an interleaved lesson sequence.
 
     The function selects new and review words via :func:`select_word_batch`
     then interleaves their multiple-choice questions.  After every
     ``grammar_every`` new words a placeholder grammar tip is inserted.
+
+    With a ``sentence_index`` each question gets an i+1 ``example`` sentence
+    when one exists.  ``known_words`` defaults to the words already reviewed
+    in ``srs_filter``.
     """
 
     new_words, review_words = select_word_batch(
         goal_ranked_words, srs_filter, new_word_limit, review_limit
     )
 
+    distractors = _generate_distractors_batch(new_words + review_words)
+    if known_words is None:
+        known_words = [
+            w for w, sched in srs_filter.schedulers.items() if sched.state.repetitions > 0
+        ]
+    known = list(known_words)
+
+    def item(word: str) -> Dict[str, object]:
+        return _attach_example(_mcq_item(word, distractors[word]), sentence_index, known)
+
     lesson: List[Dict[str, object]] = []
     new_counter = 0
     for new_word, review_word in zip_longest(new_words, review_words):
         if new_word is not None:
-            lesson.append(_mcq_item(new_word))
+            lesson.append(item(new_word))
             new_counter += 1
             if grammar_every and new_counter % grammar_every == 0:
                 lesson.append(_grammar_tip(new_word))
         if review_word is not None:
-            lesson.append(_mcq_item(review_word))
+            lesson.append(item(review_word))
     return lesson
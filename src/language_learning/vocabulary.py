@@ -1,78 +1,250 @@
 """Vocabulary extraction utilities."""
 
-import csv
+import codecs
+import heapq
+import os
 import re
 from collections import Counter
-from pathlib import Path
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
+from .frequency import get_frequency_index
 from .goals import GoalManager
 
+#: Anything :func:`extract_vocabulary` can read: a path, a text file object or
+#: an iterable of strings.
+Corpus = Union[str, os.PathLike, TextIO, Iterable[str]]
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_RANGE_BYTES = 64 << 20
+
+_TOKEN_RE = re.compile(r"\b\w+\b")
+_WHITESPACE_BYTES_RE = re.compile(rb"[ \t\n\r\f\v]")
+
 
 class CorpusReadError(Exception):
     """Error raised when a corpus file cannot be read."""
 
 
-def _load_coca_counts(coca_path: str) -> Counter:
-    """Load COCA frequency data from a CSV file.
+def get_top_coca_words(count: int = 5) -> list[str]:
+    """Return the first ``count`` words from the COCA frequency list.
+
+    The words come from the shared index of the ``coca.csv`` file located
+    alongside this module (see :mod:`language_learning.frequency`) and are
+    normalized to lowercase.  If the file cannot be found, an empty list is
+    returned.
+    """
+
+    return get_frequency_index().top(count)
+
+
+def iter_tokens(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield lowercase word tokens from consecutive pieces of text.
 
-    The CSV file is expected to have two columns: ``word`` and ``frequency``.
+    Words split across chunk boundaries are joined before tokenizing, so the
+    result matches tokenizing the concatenated text in one go.
+    """
+
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk.lower()
+        # Hold back a trailing partial word; ``\w`` is exactly
+        # ``str.isalnum()`` plus the underscore.
+        cut = len(text)
+        while cut and (text[cut - 1].isalnum() or text[cut - 1] == "_"):
+            cut -= 1
+        carry = text[cut:]
+        yield from _TOKEN_RE.findall(text, 0, cut)
+    if carry:
+        yield from _TOKEN_RE.findall(carry)
+
+
+def count_tokens(corpus: Corpus, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Counter:
+    """Count the tokens of *corpus*, reading it incrementally.
+
+    *corpus* may be a file path, a text file object or an iterable of
+    strings (for example lines).  Files are read ``chunk_size`` characters at
+    a time, so memory use is bounded by the vocabulary size.
+
+    Raises
+    ------
+    CorpusReadError
+        If a corpus path cannot be opened or decoded as UTF-8.
     """
 
     counts: Counter = Counter()
-    try:
-        with open(coca_path, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) < 2:
-                    continue
-                word, freq = row[0].strip().lower(), row[1].strip()
-                try:
-                    counts[word] += float(freq)
-                except ValueError:
-                    continue
-    except FileNotFoundError:
-        # Silently ignore missing COCA data; extraction can proceed without it.
-        pass
+    if isinstance(corpus, (str, os.PathLike)):
+        try:
+            with open(corpus, "r", encoding="utf-8") as f:
+                counts.update(iter_tokens(_read_chunks(f, chunk_size)))
+        except FileNotFoundError as exc:
+            raise CorpusReadError(f"Corpus file not found: {corpus}") from exc
+        except UnicodeDecodeError as exc:
+            raise CorpusReadError(
+                f"Failed to decode corpus file as UTF-8: {corpus}"
+            ) from exc
+    elif hasattr(corpus, "read"):
+        counts.update(iter_tokens(_read_chunks(corpus, chunk_size)))
+    else:
+        counts.update(iter_tokens(corpus))
     return counts
 
 
-def get_top_coca_words(count: int = 5) -> list[str]:
-    """Return the first ``count`` words from the COCA frequency list.
+def _read_chunks(f: TextIO, chunk_size: int) -> Iterator[str]:
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _range_bounds(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split *path* into up to *parts* byte ranges that start on whitespace.
 
-    The function reads the ``coca.csv`` file located alongside this module
-    and normalizes all words to lowercase. If the file cannot be found,
-    an empty list is returned.
+    ASCII whitespace bytes never occur inside a UTF-8 multi-byte sequence or
+    a word token, so each range can be decoded and tokenized on its own.
     """
 
-    coca_file = Path(__file__).with_name("coca.csv")
-    words: list[str] = []
-    try:
-        with coca_file.open("r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if not row:
-                    continue
-                words.append(row[0].strip().lower())
-                if len(words) >= count:
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            pos = max(size * i // parts, bounds[-1])
+            f.seek(pos)
+            while True:
+                buf = f.read(1 << 16)
+                if not buf:
+                    pos = size
+                    break
+                ws = _WHITESPACE_BYTES_RE.search(buf)
+                if ws:
+                    pos += ws.start()
                     break
-    except FileNotFoundError:
-        return []
+                pos += len(buf)
+            bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _count_range(task: Tuple[str, int, int, int]) -> Counter:
+    """Count the tokens in one byte range of a file (process pool worker)."""
+
+    path, start, end, chunk_size = task
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def chunks(f) -> Iterator[str]:
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data)
+        yield decoder.decode(b"", final=True)
+
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            return Counter(iter_tokens(chunks(f)))
+    except UnicodeDecodeError as exc:
+        raise CorpusReadError(f"Failed to decode corpus file as UTF-8: {path}") from exc
+
+
+def count_files(
+    paths: Iterable[Union[str, os.PathLike]],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    range_bytes: int = DEFAULT_RANGE_BYTES,
+) -> Counter:
+    """Count the tokens of several corpus files using a process pool.
+
+    Every file is cut into whitespace-aligned byte ranges, at least one per
+    worker and at most about ``range_bytes`` bytes each, which are counted in
+    parallel by up to ``workers`` processes (default: one per CPU) and
+    merged.  With ``workers=1`` the
+    files are counted sequentially in this process.
+
+    Raises
+    ------
+    CorpusReadError
+        If a file cannot be opened or decoded as UTF-8.
+    """
+
+    paths = [os.fspath(p) for p in paths]
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for path in paths:
+        try:
+            parts = max(workers, -(-os.path.getsize(path) // range_bytes))
+            ranges = _range_bounds(path, parts)
+        except FileNotFoundError as exc:
+            raise CorpusReadError(f"Corpus file not found: {path}") from exc
+        tasks.extend((path, start, end, chunk_size) for start, end in ranges)
 
-    return words
+    counts: Counter = Counter()
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            counts.update(_count_range(task))
+        return counts
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        for partial in pool.map(_count_range, tasks):
+            counts.update(partial)
+    return counts
+
+
+def rank_vocabulary(
+    counts: Counter,
+    goals: Optional[GoalManager] = None,
+    coca_path: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[str]:
+    """Rank counted words by COCA-boosted, goal-weighted frequency.
+
+    *counts* is updated in place with the adjusted frequencies.  With a
+    ``limit`` only the page ``[offset, offset + limit)`` of the ranking is
+    returned, selected with a bounded heap in ``O(n log (offset + limit))``.
+    """
+
+    # Merge with COCA frequency data if available
+    coca_counts = get_frequency_index(coca_path).counts
+    # Only boost counts for words present in the corpus to avoid
+    # introducing unrelated vocabulary from the COCA list.
+    for word in list(counts.keys()):
+        if word in coca_counts:
+            counts[word] += coca_counts[word]
+
+    # Adjust counts according to goal weights
+    if goals:
+        for item in goals.list_goals():
+            if item.word in counts:
+                counts[item.word] *= item.weight
+
+    def key(w: str) -> tuple:
+        return (-counts[w], w)
+
+    if limit is None:
+        return sorted(counts.keys(), key=key)[offset:]
+    return heapq.nsmallest(offset + limit, counts.keys(), key=key)[offset:]
 
 
 def extract_vocabulary(
-    corpus_path: str,
+    corpus: Corpus,
     goals: Optional[GoalManager] = None,
     coca_path: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> List[str]:
     """Extract words from a corpus ranked by goal-adjusted frequency.
 
     Parameters
     ----------
-    corpus_path: str
-        Path to a text corpus file.
+    corpus: str | os.PathLike | TextIO | Iterable[str]
+        Path to a text corpus file, an open text file, or an iterable of
+        text pieces such as lines.  The corpus is streamed in chunks of
+        ``chunk_size`` characters rather than loaded whole.
     goals: Optional[GoalManager]
         Goals used to adjust word ranking. Words present in goals have
         their frequencies multiplied by the goal's weight.
@@ -80,6 +252,15 @@ def extract_vocabulary(
         Path to a CSV file containing COCA frequency data. If not provided,
         the function will attempt to load ``coca.csv`` located next to this
         module. Missing files are ignored gracefully.
+    chunk_size: int
+        Number of characters read from a file at a time.
+    workers: int
+        Number of processes used to count a corpus given as a path.  Values
+        above ``1`` split the file into byte ranges counted in parallel (see
+        :func:`count_files`); other corpus types are always read serially.
+    limit, offset: Optional[int], int
+        Return only ``limit`` words starting at rank ``offset`` instead of
+        the whole ranking.
 
     Returns
     -------
@@ -90,38 +271,25 @@ def extract_vocabulary(
     Raises
     ------
     CorpusReadError
-        If ``corpus_path`` cannot be opened or decoded as UTF-8.
+        If a corpus path cannot be opened or decoded as UTF-8.
     """
-    try:
-        with open(corpus_path, "r", encoding="utf-8") as f:
-            text = f.read().lower()
-    except FileNotFoundError as exc:
-        raise CorpusReadError(f"Corpus file not found: {corpus_path}") from exc
-    except UnicodeDecodeError as exc:
-        raise CorpusReadError(
-            f"Failed to decode corpus file as UTF-8: {corpus_path}"
-        ) from exc
-    words = re.findall(r"\b\w+\b", text)
-    counts = Counter(words)
+    if workers > 1 and isinstance(corpus, (str, os.PathLike)):
+        counts = count_files([corpus], workers, chunk_size)
+    else:
+        counts = count_tokens(corpus, chunk_size)
+    return rank_vocabulary(counts, goals, coca_path, limit, offset)
 
-    # Merge with COCA frequency data if available
-    coca_file = (
-        Path(coca_path)
-        if coca_path
-        else Path(__file__).with_name("coca.csv")
-    )
-    if coca_file.exists():
-        coca_counts = _load_coca_counts(str(coca_file))
-        # Only boost counts for words present in the corpus to avoid
-        # introducing unrelated vocabulary from the COCA list.
-        for word in list(counts.keys()):
-            if word in coca_counts:
-                counts[word] += coca_counts[word]
 
-    # Adjust counts according to goal weights
-    if goals:
-        for item in goals.list_goals():
-            if item.word in counts:
-                counts[item.word] *= item.weight
+def extract_vocabulary_files(
+    paths: Iterable[Union[str, os.PathLike]],
+    goals: Optional[GoalManager] = None,
+    coca_path: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """Rank the combined vocabulary of several corpus files.
+
+    Files are counted in parallel with :func:`count_files` and ranked like
+    :func:`extract_vocabulary`.
+    """
 
-    return sorted(counts.keys(), key=lambda w: (-counts[w], w))
+    return rank_vocabulary(count_files(paths, workers), goals, coca_path)
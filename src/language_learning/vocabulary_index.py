@@ -0,0 +1,186 @@
+"""Incrementally updatable word-count index over a growing set of documents.
+
+:func:`~language_learning.vocabulary.extract_vocabulary` re-reads a whole
+corpus on every call.  :class:`VocabularyIndex` instead keeps per-document
+token counts so transcripts can be added or removed as they arrive, and ranks
+the combined vocabulary on demand with the same COCA boost and goal weighting.
+The index can be saved to and loaded from a compact binary file.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from .frequency import get_frequency_index
+from .goals import GoalManager
+from .vocabulary import Corpus, count_tokens
+
+# File layout (little-endian): magic, word count, then each word as a
+# ``uint32`` byte length plus UTF-8 bytes, the ``uint64`` totals array,
+# document count, and per document a ``uint32`` id length, the UTF-8 id, a
+# ``uint32`` entry count and the ``uint32`` word-id and count arrays.
+_MAGIC = b"LLVI\x01"
+_U32 = struct.Struct("<I")
+_ID_SIZE = array("I").itemsize
+
+
+def _to_le(arr: array) -> bytes:
+    if sys.byteorder == "big":  # pragma: no cover - little-endian hosts
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":  # pragma: no cover - little-endian hosts
+        arr.byteswap()
+    return arr
+
+
+class VocabularyIndex:
+    """Word counts per document with an up-to-date combined total.
+
+    Words are interned to integer ids; each document stores parallel
+    ``array`` columns of word ids and counts, which keeps memory compact and
+    lets :meth:`remove_document` subtract a document's contribution exactly.
+    """
+
+    def __init__(self) -> None:
+        self._words: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._totals = array("Q")
+        self._docs: Dict[str, Tuple[array, array]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def _word_id(self, word: str) -> int:
+        wid = self._ids.get(word)
+        if wid is None:
+            wid = self._ids[word] = len(self._words)
+            self._words.append(word)
+            self._totals.append(0)
+        return wid
+
+    # ------------------------------------------------------------------
+    # Updates
+    def add_document(self, doc_id: str, corpus: Corpus) -> None:
+        """Count *corpus* and add it as *doc_id*, replacing any previous version."""
+
+        if doc_id in self._docs:
+            self.remove_document(doc_id)
+        ids = array("I")
+        counts = array("I")
+        for word, count in count_tokens(corpus).items():
+            wid = self._word_id(word)
+            ids.append(wid)
+            counts.append(count)
+            self._totals[wid] += count
+        self._docs[doc_id] = (ids, counts)
+
+    def remove_document(self, doc_id: str) -> None:
+        """Subtract the counts of *doc_id*; unknown ids raise :class:`KeyError`."""
+
+        ids, counts = self._docs.pop(doc_id)
+        for wid, count in zip(ids, counts):
+            self._totals[wid] -= count
+
+    # ------------------------------------------------------------------
+    # Queries
+    def count(self, word: str) -> int:
+        """Return how often *word* occurs across all indexed documents."""
+
+        wid = self._ids.get(word)
+        return 0 if wid is None else self._totals[wid]
+
+    def top_k(
+        self,
+        k: int,
+        goals: Optional[GoalManager] = None,
+        coca_path: Optional[str] = None,
+    ) -> List[str]:
+        """Return the *k* best ranked words.
+
+        Scores follow :func:`~language_learning.vocabulary.rank_vocabulary`:
+        corpus count plus COCA frequency, multiplied by the goal weight, with
+        alphabetical order breaking ties.  Selection is a bounded heap, so
+        the cost is ``O(n log k)`` rather than a full sort.
+        """
+
+        coca = get_frequency_index(coca_path).counts
+        weights = {g.word: g.weight for g in goals.list_goals()} if goals else {}
+        scored = (
+            ((total + coca.get(word, 0)) * weights.get(word, 1), word)
+            for word, total in zip(self._words, self._totals)
+            if total
+        )
+        best = heapq.nsmallest(k, scored, key=lambda e: (-e[0], e[1]))
+        return [word for _, word in best]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Write the index to *path* atomically."""
+
+        parts = [_MAGIC, _U32.pack(len(self._words))]
+        for word in self._words:
+            raw = word.encode("utf-8")
+            parts += [_U32.pack(len(raw)), raw]
+        parts.append(_to_le(self._totals))
+        parts.append(_U32.pack(len(self._docs)))
+        for doc_id, (ids, counts) in self._docs.items():
+            raw = doc_id.encode("utf-8")
+            parts += [_U32.pack(len(raw)), raw, _U32.pack(len(ids))]
+            parts += [_to_le(ids), _to_le(counts)]
+        tmp = f"{os.fspath(path)}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(b"".join(parts))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "VocabularyIndex":
+        """Read an index written by :meth:`save`.
+
+        Raises :class:`ValueError` if the file is not a valid index.
+        """
+
+        with open(path, "rb") as fh:
+            data = fh.read()
+        if not data.startswith(_MAGIC):
+            raise ValueError(f"Not a vocabulary index file: {path!s}")
+        index = cls()
+        pos = len(_MAGIC)
+
+        def take(size: int) -> bytes:
+            nonlocal pos
+            if pos + size > len(data):
+                raise ValueError(f"Truncated vocabulary index file: {path!s}")
+            chunk = data[pos : pos + size]
+            pos += size
+            return chunk
+
+        def take_u32() -> int:
+            return _U32.unpack(take(_U32.size))[0]
+
+        for _ in range(take_u32()):
+            word = take(take_u32()).decode("utf-8")
+            index._ids[word] = len(index._words)
+            index._words.append(word)
+        index._totals = _from_le("Q", take(index._totals.itemsize * len(index._words)))
+        for _ in range(take_u32()):
+            doc_id = take(take_u32()).decode("utf-8")
+            size = take_u32()
+            ids = _from_le("I", take(_ID_SIZE * size))
+            counts = _from_le("I", take(_ID_SIZE * size))
+            index._docs[doc_id] = (ids, counts)
+        return index
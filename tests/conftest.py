@@ -0,0 +1,104 @@
+"""Shared fixtures: a scripted chat completions server for LLM tests."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from language_learning import cache, llm_client
+
+
+class _StubServer:
+    """Chat completions stub replaying a scripted list of (status, content)."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        self.connections = set()
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append(json.loads(body))
+                stub.connections.add(self.client_address)
+                with lock:
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                time.sleep(stub.delay)
+                with lock:
+                    stub.active -= 1
+                status, content = stub.script.pop(0) if stub.script else (200, "ok")
+                if stub.requests[-1].get("stream") and status == 200:
+                    # Stream the content three characters per event.
+                    events = [
+                        {"choices": [{"delta": {"content": content[i : i + 3]}}]}
+                        for i in range(0, len(content), 3)
+                    ]
+                    payload = "".join(
+                        f"data: {json.dumps(e)}\n\n" for e in events
+                    ).encode() + b"data: [DONE]\n\n"
+                    content_type = "text/event-stream"
+                else:
+                    payload = json.dumps(
+                        {"choices": [{"message": {"content": content}}]}
+                    ).encode()
+                    content_type = "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(script=()):
+        server = _StubServer(script)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+    llm_client.reset_llm_clients()
+    cache.reset_caches()
+
+
+@pytest.fixture
+def llm_env(monkeypatch):
+    """Point the shared LLM clients at *server*, without retries."""
+
+    def configure(server, **env):
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", server.endpoint)
+        monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "d")
+        monkeypatch.setenv("AZURE_OPENAI_API_KEY", "k")
+        monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+
+    return configure
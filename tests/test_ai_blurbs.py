@@ -24,3 +24,118 @@ def test_generate_blurb_length_control():
 def test_generate_blurb_defaults_to_coca():
     blurb = generate_blurb([], [], 3)
     assert blurb.split() == get_top_coca_words(3)
+
+
+def test_blurb_prompt_prioritises_l_plus_one_and_frequent_words():
+    from language_learning.ai_blurbs import build_blurb_prompt
+
+    known = ["zzqx", "house", "the", "you"]
+    prompt = build_blurb_prompt(known, ["cheval"], 5, token_budget=10_000)
+    assert prompt.words == ["cheval", "you", "the", "house", "zzqx"]
+    assert prompt.omitted == 0
+    assert "cheval, you, the, house, zzqx" in prompt.text
+
+
+def test_blurb_prompt_stays_within_token_budget():
+    from language_learning.ai_blurbs import build_blurb_prompt
+    from language_learning.vocabulary import get_top_coca_words
+
+    known = [f"word{i}" for i in range(5000)] + get_top_coca_words(600)
+    prompt = build_blurb_prompt(known, ["cheval"], 20, token_budget=200)
+    assert prompt.estimated_tokens <= 200
+    assert prompt.words[:3] == ["cheval"] + get_top_coca_words(2)
+    assert prompt.omitted == len(known) + 1 - len(prompt.words)
+
+
+def test_llm_blurb_logs_prompt_size(monkeypatch, caplog):
+    import logging
+
+    from language_learning import ai_blurbs
+
+    class StubClient:
+        def chat(self, prompt):
+            return "hola"
+
+    monkeypatch.setattr(ai_blurbs, "get_llm_client", lambda: StubClient())
+    monkeypatch.setenv("LLM_BLURB_TOKEN_BUDGET", "60")
+    known = [f"word{i}" for i in range(200)]
+    with caplog.at_level(logging.DEBUG, logger="language_learning.ai_blurbs"):
+        assert ai_blurbs._generate_with_llm(known, ["hola"], 1) == "hola"
+
+    prompt = ai_blurbs.build_blurb_prompt(known, ["hola"], 1)
+    assert caplog.messages == [
+        f"Blurb prompt: ~{prompt.estimated_tokens} tokens, "
+        f"{len(prompt.words)} words listed, {prompt.omitted} omitted"
+    ]
+    assert prompt.omitted > 0
+
+
+class _ScriptedClient:
+    """LLM client stub answering with the given replies in order."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def chat(self, prompt):
+        self.prompts.append(prompt)
+        return self.replies.pop(0)
+
+
+class _ScriptedAsyncClient(_ScriptedClient):
+    async def chat(self, prompt):
+        return _ScriptedClient.chat(self, prompt)
+
+
+def test_generate_blurb_retries_out_of_vocabulary_output(monkeypatch):
+    from language_learning import ai_blurbs, cache
+
+    client = _ScriptedClient(["chien dog chat", "chat chat chien", "dog", "cat"])
+    monkeypatch.setattr(ai_blurbs, "get_llm_client", lambda: client)
+    cache.reset_caches()
+    try:
+        assert generate_blurb(["chat", "chien"], [], 3, use_llm=True) == "chat chat chien"
+        # Both attempts are rejected, so the deterministic blurb is used.
+        assert generate_blurb(["chat", "chien"], [], 2, use_llm=True) == "chat chien"
+    finally:
+        cache.reset_caches()
+    assert len(client.prompts) == 4
+
+
+def test_checked_async_blurb_retries_then_raises(monkeypatch):
+    import asyncio
+
+    from language_learning import ai_blurbs
+
+    client = _ScriptedAsyncClient(["chien dog", "chat chien", "dog", "cat"])
+    monkeypatch.setattr(ai_blurbs, "get_async_llm_client", lambda: client)
+    monkeypatch.setenv("LLM_BLURB_RETRIES", "1")
+    check = ai_blurbs._generate_checked_async
+    assert asyncio.run(check(["chat", "chien"], [], 2)) == "chat chien"
+    with pytest.raises(ValueError):
+        asyncio.run(check(["chat", "chien"], [], 2))
+    assert len(client.prompts) == 4
+
+
+def _collect(known, l_plus_one, length):
+    import asyncio
+
+    from language_learning.ai_blurbs import stream_blurb
+
+    async def run():
+        return [word async for word in stream_blurb(known, l_plus_one, length)]
+
+    return asyncio.run(run())
+
+
+def test_stream_blurb_filters_vocabulary_and_stops_at_length(stub, llm_env):
+    server = stub([(200, "Chien, dog chat chien chat chien chat")])
+    llm_env(server)
+    assert _collect(["chat", "chien"], [], 3) == ["Chien,", "chat", "chien"]
+    assert server.requests[0]["stream"] is True
+
+
+def test_stream_blurb_falls_back_when_stream_fails(stub, llm_env):
+    server = stub([(500, "")])
+    llm_env(server)
+    assert _collect(["chat", "chien"], [], 3) == ["chat", "chien", "chat"]
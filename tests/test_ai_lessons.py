@@ -1,7 +1,17 @@
+import pytest
+
+from language_learning import cache
 from language_learning.ai_lessons import generate_lesson, generate_mcq_lesson
 from language_learning.vocabulary import get_top_coca_words
 
 
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    cache.reset_caches()
+    yield
+    cache.reset_caches()
+
+
 def test_generate_lesson():
     lesson = generate_lesson("food", ["apple"])
     assert lesson["topic"] == "food"
@@ -42,6 +52,24 @@ def test_mcq_shuffles_and_tracks_answer():
     assert mcq["choices"] != [mcq["answer"], "hola_a", "hola_b", "hola_c"]
 
 
+def test_mcq_lesson_attaches_i_plus_one_examples(tmp_path):
+    from language_learning.sentence_index import SentenceIndex
+
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("Hola amigo. Hola. Gracias amigo mio.", encoding="utf-8")
+    index = SentenceIndex(tmp_path / "idx.db")
+    index.update([corpus])
+    lesson = generate_mcq_lesson(
+        "greetings",
+        new_words=["hola"],
+        review_words=["gracias"],
+        sentence_index=index,
+        known_words=["amigo"],
+    )
+    examples = {item["word"]: item.get("example") for item in lesson if item["type"] == "mcq"}
+    assert examples == {"hola": "Hola.", "gracias": None}
+
+
 def test_generate_mcq_lesson_defaults_to_coca_words():
     lesson = generate_mcq_lesson("basics")
     mcq_words = [item["word"] for item in lesson if item["type"] == "mcq"]
@@ -50,3 +78,67 @@ def test_generate_mcq_lesson_defaults_to_coca_words():
         expected.extend([w, w])
     assert mcq_words == expected
 
+
+
+def test_batch_distractors_fill_gaps_per_word(monkeypatch):
+    from language_learning import ai_lessons
+
+    monkeypatch.setenv("USE_LLM_DISTRACTORS", "1")
+    monkeypatch.setattr(
+        ai_lessons, "_generate_distractors_llm_batch", lambda words: {"hola": ["x", "y", "z"]}
+    )
+    monkeypatch.setattr(ai_lessons, "_generate_distractors_llm", lambda w: [w + "!"] * 3)
+
+    lesson = generate_mcq_lesson("greetings", new_words=["hola"], review_words=["adios"])
+    choices = {item["word"]: set(item["choices"]) for item in lesson if item["type"] == "mcq"}
+    assert choices["hola"] == {"meaning of hola", "x", "y", "z"}
+    assert choices["adios"] == {"meaning of adios", "adios!"}
+
+
+def test_per_word_distractors_are_fetched_concurrently(monkeypatch):
+    import threading
+
+    from language_learning import ai_lessons
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def slow_llm(word):
+        barrier.wait()  # only passes if all three requests are in flight
+        return [word.upper()] * 3
+
+    monkeypatch.setenv("USE_LLM_DISTRACTORS", "1")
+    monkeypatch.setattr(ai_lessons, "_generate_distractors_llm_batch", lambda words: {})
+    monkeypatch.setattr(ai_lessons, "_generate_distractors_llm", slow_llm)
+
+    result = ai_lessons._generate_distractors_batch(["xa", "xb", "xc", "xa"])
+    assert result == {"xa": ["XA"] * 3, "xb": ["XB"] * 3, "xc": ["XC"] * 3}
+
+
+def test_banked_words_skip_the_llm(monkeypatch):
+    from language_learning import ai_lessons
+
+    def fail(*args):
+        raise AssertionError("LLM should not be called for banked words")
+
+    monkeypatch.setenv("USE_LLM_DISTRACTORS", "1")
+    monkeypatch.setattr(ai_lessons, "_generate_distractors_llm_batch", fail)
+    monkeypatch.setattr(ai_lessons, "_generate_distractors_llm", fail)
+
+    result = ai_lessons._generate_distractors_batch(["house", "the"])
+    assert result == {"house": ["course", "those", "home"], "the": ["he", "they", "she"]}
+
+
+@pytest.mark.parametrize("reply", ['{"a": 1}', '"word"', "3", '["ok", 2]'])
+def test_malformed_llm_distractors_fall_back_without_caching(monkeypatch, reply):
+    from language_learning import ai_lessons
+
+    class StubClient:
+        def chat(self, prompt):
+            return reply
+
+    monkeypatch.setenv("USE_LLM_DISTRACTORS", "1")
+    monkeypatch.setattr(ai_lessons, "get_llm_client", lambda: StubClient())
+
+    lesson = generate_mcq_lesson("greetings", new_words=["xyzzy"], review_words=["xyzzy"])
+    assert set(lesson[0]["choices"]) == {"meaning of xyzzy", "xyzzy_a", "xyzzy_b", "xyzzy_c"}
+    assert cache.get_cache("distractors").get(ai_lessons._distractor_key("xyzzy")) is None
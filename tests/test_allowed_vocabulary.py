@@ -0,0 +1,30 @@
+from language_learning.allowed_vocabulary import (
+    AllowedVocabulary,
+    get_allowed_vocabulary,
+)
+
+
+def test_check_reports_coverage_and_oov_tokens():
+    vocab = AllowedVocabulary.from_words(["the", "cat", "sat"], ["Mat"])
+    report = vocab.check("The cat sat on the mat, the dog sat on it.")
+    assert report.total == 11
+    assert report.allowed == 7
+    assert report.oov == ["on", "dog", "it"]
+    assert report.l_plus_one_used == ["mat"]
+    assert report.coverage == 7 / 11
+    assert not report.ok
+    assert vocab.check("").coverage == 1.0
+
+
+def test_allows_uses_vocabulary_tokenization():
+    vocab = AllowedVocabulary.from_words(["por favor", "gracias"])
+    assert vocab.allows("Gracias!")
+    assert vocab.allows("favor")
+    assert not vocab.allows("...")
+    assert not vocab.allows("gracias-amigo")
+
+
+def test_compiled_vocabulary_is_reused():
+    first = get_allowed_vocabulary(["b", "a"], ["c"])
+    assert get_allowed_vocabulary(["a", "b", "a"], ["c"]) is first
+    assert get_allowed_vocabulary(["a", "b"], []) is not first
@@ -2,7 +2,7 @@ import json
 from fastapi.testclient import TestClient
 
 from language_learning.api import create_app
-from language_learning.storage import JSONStorage
+from language_learning.storage import JSONStorage, ShardedSQLiteStorage, SQLiteStorage
 from language_learning.vocabulary import get_top_coca_words
 
 
@@ -95,3 +95,78 @@ def test_cors_headers(tmp_path):
     assert resp.status_code == 200
     # Ensure the CORS middleware set the appropriate header
     assert resp.headers.get("access-control-allow-origin") == "*"
+
+
+def test_goals_persist_with_sqlite_storage(tmp_path):
+    storage = SQLiteStorage(tmp_path / "store.db")
+    client = TestClient(create_app(storage))
+
+    resp = client.post("/goals", json={"word": "hello", "weight": 2})
+    assert resp.status_code == 200
+    assert len(resp.json()["goals"]) == 6
+
+    stored = SQLiteStorage(storage.path).load_goals()
+    assert stored[-1].word == "hello" and stored[-1].weight == 2
+
+
+def test_goals_are_per_user_with_sharded_storage(tmp_path):
+    client = TestClient(create_app(ShardedSQLiteStorage(tmp_path / "shards")))
+
+    client.post("/goals", json={"word": "hola"}, headers={"X-User-Id": "ana"})
+    client.post("/goals", json={"word": "hallo"}, headers={"X-User-Id": "ben"})
+
+    ana = client.get("/goals", headers={"X-User-Id": "ana"}).json()["goals"]
+    ben = client.get("/goals", headers={"X-User-Id": "ben"}).json()["goals"]
+    assert [g["word"] for g in ana if not g["is_default"]] == ["hola"]
+    assert [g["word"] for g in ben if not g["is_default"]] == ["hallo"]
+    assert len(ana) == len(ben) == 6
+
+
+def test_vocabulary_endpoint_paginates(tmp_path):
+    client, _ = _make_client(tmp_path)
+
+    full = client.post("/vocabulary", json={"corpus": "zeta eta eta theta"}).json()
+    assert full["total"] == 3 and full["limit"] is None
+
+    page = client.post(
+        "/vocabulary",
+        json={"corpus": "zeta eta eta theta", "limit": 1, "offset": 1},
+    ).json()
+    assert page["vocabulary"] == full["vocabulary"][1:2]
+    assert page["total"] == 3
+
+
+def test_media_batch_endpoint(tmp_path):
+    client, _ = _make_client(tmp_path)
+    resp = client.post("/media/batch", json={"words": ["you", "i"], "level": 1})
+    assert resp.status_code == 200
+    assert resp.json()["by_word"] == {"you": ["you_lvl2"], "i": ["i_lvl2"]}
+    assert client.post(
+        "/media/batch", json={"words": ["you"], "level": 1, "per_word_limit": 0}
+    ).status_code == 422
+
+
+def test_blurb_llm_endpoint_uses_async_client(stub, llm_env, tmp_path):
+    server = stub([(200, "chien chat")])
+    llm_env(server)
+    client, _ = _make_client(tmp_path)
+    res = client.post("/blurb/llm", json={"known_words": ["chat", "chien"], "length": 2})
+    assert res.json() == {"blurb": "chien chat"}
+    assert len(server.requests) == 1
+
+
+def test_blurb_stream_endpoint_sends_events(stub, llm_env, tmp_path):
+    server = stub([(200, "chien chat chien")])
+    llm_env(server)
+    client, _ = _make_client(tmp_path)
+    with client.stream(
+        "POST", "/blurb/llm/stream", json={"known_words": ["chat", "chien"], "length": 2}
+    ) as res:
+        assert res.headers["content-type"].startswith("text/event-stream")
+        body = "".join(res.iter_text())
+    events = [block for block in body.split("\n\n") if block]
+    assert events == [
+        'data: {"word": "chien"}',
+        'data: {"word": "chat"}',
+        'event: done\ndata: {"blurb": "chien chat"}',
+    ]
@@ -0,0 +1,83 @@
+from language_learning import ai_lessons
+from language_learning.cache import TTLCache, reset_caches
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 2}
+
+
+def test_entries_expire_after_ttl():
+    now = [100.0]
+    cache = TTLCache(ttl=10, clock=lambda: now[0])
+    cache.set("k", ["x"])
+    now[0] = 109.0
+    assert cache.get("k") == ["x"]
+    now[0] = 110.0
+    assert cache.get("k") is None
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = TTLCache(path=path, namespace="distractors")
+    first.set("hola", ["a", "b", "c"])
+    first.close()
+
+    second = TTLCache(path=path, namespace="distractors")
+    assert second.get("hola") == ["a", "b", "c"]
+    assert TTLCache(path=path, namespace="blurbs").get("hola") is None
+    second.close()
+
+
+def test_disk_tier_evicts_soonest_expiring_rows_periodically(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "cache.db")
+    now = [0.0]
+    cache = TTLCache(
+        maxsize=1, ttl=10, path=path, disk_maxsize=2, disk_evict_every=3, clock=lambda: now[0]
+    )
+
+    def disk_keys():
+        with sqlite3.connect(path) as conn:
+            return sorted(k for (k,) in conn.execute("SELECT key FROM cache"))
+
+    for n, key in enumerate(["a", "b"]):
+        now[0] = float(n)
+        cache.set(key, n)
+    cache.set("b", 1)
+    assert disk_keys() == ["a", "b"]
+    for n, key in enumerate(["c", "d", "e"], start=2):
+        now[0] = float(n)
+        cache.set(key, n)
+    assert disk_keys() == ["d", "e"]
+    assert cache.get("a") is None
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT rows FROM cache_counts").fetchall() == [(2,)]
+    cache.clear()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT rows FROM cache_counts").fetchall() == [(0,)]
+    cache.close()
+
+
+def test_llm_distractors_are_cached(monkeypatch):
+    reset_caches()
+    calls = []
+
+    def fake_llm(word):
+        calls.append(word)
+        return ["x", "y", "z"]
+
+    monkeypatch.setenv("USE_LLM_DISTRACTORS", "1")
+    monkeypatch.setattr(ai_lessons, "_generate_distractors_llm", fake_llm)
+    assert ai_lessons._generate_distractors("Hola") == ["x", "y", "z"]
+    assert ai_lessons._generate_distractors(" hola") == ["x", "y", "z"]
+    assert calls == ["Hola"]
+    reset_caches()
@@ -0,0 +1,34 @@
+from language_learning.distractor_bank import (
+    build_distractor_bank,
+    edit_distance,
+    get_distractor_bank,
+    lookup_distractors,
+    read_distractor_bank,
+    write_distractor_bank,
+)
+from language_learning.frequency import FrequencyIndex, get_frequency_index
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("same", "same") == 0
+
+
+def test_build_prefers_similar_words_in_frequency_band(tmp_path):
+    index = FrequencyIndex(("cat", "dog", "car", "cap", "zebra", "cut"))
+    bank = build_distractor_bank(index, band=3)
+    # "cut" is as close in spelling as "car" but five ranks away, outside the band.
+    assert bank["cat"] == ("car", "cap", "dog")
+
+    path = tmp_path / "bank.tsv"
+    write_distractor_bank(bank, path)
+    assert read_distractor_bank(path) == bank
+
+
+def test_bundled_bank_covers_coca_list():
+    bank = get_distractor_bank()
+    assert set(bank) == set(get_frequency_index().words)
+    assert all(len(d) == 3 for d in bank.values())
+    assert lookup_distractors(" House") == list(bank["house"])
+    assert lookup_distractors("hola") is None
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import socket
+import threading
+import time
+
+from language_learning import entrypoints
+from language_learning.vocabulary import get_top_coca_words
+
+
+def _serve_lines(requests, workers=4):
+    stdin = io.StringIO("".join(json.dumps(r) + "\n" for r in requests))
+    stdout = io.StringIO()
+    entrypoints.serve(stdin, stdout, workers=workers)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_serve_matches_responses_by_id():
+    responses = _serve_lines(
+        [
+            {"id": 1, "command": "default_words", "args": []},
+            {"id": 2, "command": "media_suggest", "args": ["you", "1"]},
+            {"id": 3, "command": "blurb", "args": [[], [], 3]},
+        ]
+    )
+    by_id = {r["id"]: r for r in responses}
+    assert set(by_id) == {1, 2, 3}
+    assert by_id[1]["result"] == get_top_coca_words()
+    assert by_id[2]["result"][0]["level"] == 2
+    assert by_id[3]["result"]["blurb"].split() == get_top_coca_words(3)
+
+
+def test_serve_reports_errors_without_stopping():
+    responses = _serve_lines(
+        [
+            {"id": "bad", "command": "nope", "args": []},
+            {"id": "ok", "command": "default_words"},
+        ]
+    )
+    by_id = {r["id"]: r for r in responses}
+    assert "Unknown command" in by_id["bad"]["error"]
+    assert by_id["ok"]["result"] == get_top_coca_words()
+
+
+def test_serve_rejects_stdin_arguments():
+    responses = _serve_lines(
+        [
+            {"id": 1, "command": "media_suggest_batch", "args": ["-", "1"]},
+            {"id": 2, "command": "default_words"},
+        ],
+        workers=1,
+    )
+    by_id = {r["id"]: r for r in responses}
+    assert by_id[1]["type"] == "ValueError"
+    assert "one-shot" in by_id[1]["error"]
+    assert by_id[2]["result"] == get_top_coca_words()
+
+
+def test_one_shot_reads_stdin_argument(monkeypatch, capsys):
+    stdin = io.TextIOWrapper(io.BytesIO(b'["you"]'))
+    monkeypatch.setattr("sys.stdin", stdin)
+    entrypoints.main(["media_suggest_batch", "-", "1"])
+    assert json.loads(capsys.readouterr().out)["by_word"] == {"you": ["you_lvl2"]}
+
+
+def test_serve_socket_round_trip(tmp_path):
+    path = str(tmp_path / "worker.sock")
+    thread = threading.Thread(
+        target=entrypoints.serve_socket, args=(path, 2), daemon=True
+    )
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        time.sleep(0.01)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(b'{"id": 7, "command": "default_words"}\n')
+        reader = sock.makefile("r", encoding="utf-8")
+        response = json.loads(reader.readline())
+    assert response == {"id": 7, "result": get_top_coca_words()}
+
+
+def test_review_batch_returns_only_changed_words():
+    state = {
+        w: {"repetitions": 1, "interval": 1, "efactor": 2.5, "next_review": "2024-01-01T00:00:00"}
+        for w in ("alpha", "beta", "gamma")
+    }
+    result = entrypoints.review_batch(
+        json.dumps({"alpha": 1, "beta": 2, "gamma": 3}),
+        json.dumps(state),
+        json.dumps(
+            [
+                {"word": "alpha", "quality": 5, "reviewed_at": "2024-01-02T00:00:00"},
+                ["beta", 1, "2024-01-02T00:00:00"],
+            ]
+        ),
+    )
+    assert set(result["state"]) == {"alpha", "beta"}
+    assert result["next_review"] == {
+        "alpha": "2024-01-08T00:00:00",
+        "beta": "2024-01-03T00:00:00",
+    }
+
+
+def test_review_reads_binary_state_file_and_returns_delta(tmp_path):
+    state = {
+        w: {"repetitions": 1, "interval": 1, "efactor": 2.5, "next_review": "2024-01-01T00:00:00"}
+        for w in ("alpha", "beta", "gamma")
+    }
+    packed = tmp_path / "state.bin"
+    assert entrypoints.pack_state(json.dumps(state), str(packed))["words"] == 3
+
+    ranks = tmp_path / "ranks.json"
+    ranks.write_text(json.dumps({"alpha": 1, "beta": 2, "gamma": 3}))
+    result = entrypoints.review(f"@{ranks}", f"@{packed}", "beta", "5", "delta")
+    assert list(result["state"]) == ["beta"]
+    assert result["state"]["beta"]["repetitions"] == 2
+
+    full = entrypoints.review(f"@{ranks}", f"@{packed}", "beta", "5")
+    assert set(full["state"]) == {"alpha", "beta", "gamma"}
+
+
+def test_media_suggest_batch_command():
+    result = entrypoints.dispatch("media_suggest_batch", [["you", "the"], "1", "1"])
+    assert result["by_word"] == {"you": ["you_lvl2"], "the": ["the_lvl2"]}
+    assert [item["words"] for item in result["items"]] == [["you"], ["the"]]
@@ -0,0 +1,30 @@
+import os
+
+from language_learning.frequency import get_frequency_index
+
+
+def test_frequency_index_lookups(tmp_path):
+    path = tmp_path / "coca.csv"
+    path.write_text("The,10\nof,8\nbad,x\nthe,2\n\nsolo\n", encoding="utf-8")
+    index = get_frequency_index(path)
+    assert index.top(3) == ["the", "of", "bad"]
+    assert index.rank("of") == 2 and index.rank("solo") == 4
+    assert index.rank("missing") is None
+    assert index.count("the") == 12 and index.count("bad") == 0
+    assert get_frequency_index(path) is index
+
+
+def test_frequency_index_reloads_when_file_changes(tmp_path):
+    path = tmp_path / "coca.csv"
+    path.write_text("alpha,1\n", encoding="utf-8")
+    first = get_frequency_index(path)
+    path.write_text("beta,2\nalpha,1\n", encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert get_frequency_index(path).top(2) == ["beta", "alpha"]
+    assert first.top(2) == ["alpha"]
+
+
+def test_missing_frequency_file_gives_empty_index(tmp_path):
+    index = get_frequency_index(tmp_path / "missing.csv")
+    assert index.top(5) == [] and len(index) == 0
@@ -0,0 +1,119 @@
+import pytest
+
+from language_learning.interaction_log import InteractionLog
+
+
+def test_buffers_until_size_or_interval(tmp_path):
+    now = [0.0]
+    log = InteractionLog(
+        tmp_path / "log.jsonl", flush_size=3, flush_interval=10, clock=lambda: now[0]
+    )
+    log.append("alice", "m1", "you")
+    log.append("alice", "m2", "i")
+    assert log.pending == 2
+    assert not (tmp_path / "log.jsonl").exists()
+    log.append("bob", "m3", "you")
+    assert log.pending == 0
+
+    log.append("bob", "m4", "the")
+    now[0] = 10.0
+    log.append("bob", "m5", "a")
+    assert log.pending == 0
+    assert len((tmp_path / "log.jsonl").read_text().splitlines()) == 5
+
+
+def test_drain_groups_by_user_and_checkpoints(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = InteractionLog(path)
+    for user, media, word in [("alice", "m1", "you"), ("bob", "m2", "i"), ("alice", "m3", "the")]:
+        log.append(user, media, word)
+
+    assert log.drain(max_records=2) == {"alice": [("m1", "you")], "bob": [("m2", "i")]}
+    # A new reader resumes from the persisted offset.
+    assert InteractionLog(path).drain() == {"alice": [("m3", "the")]}
+    assert log.drain() == {}
+
+
+def test_recovery_truncates_partial_last_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = InteractionLog(path)
+    log.append("alice", "m1", "you")
+    log.flush()
+    with open(path, "ab") as fh:
+        fh.write(b'{"user": "bob", "med')
+
+    recovered = InteractionLog(path)
+    assert path.read_bytes().endswith(b"\n")
+    recovered.append("bob", "m2", "i")
+    assert recovered.drain() == {"alice": [("m1", "you")], "bob": [("m2", "i")]}
+
+
+def test_timer_flushes_quiet_log(tmp_path):
+    import time
+
+    path = tmp_path / "log.jsonl"
+    log = InteractionLog(path, flush_size=100, flush_interval=0.05)
+    log.append("alice", "m1", "you")
+    assert log.pending == 1
+    for _ in range(100):
+        if not log.pending:
+            break
+        time.sleep(0.01)
+    assert log.pending == 0
+    assert path.read_text().count("\n") == 1
+
+
+def test_failed_flush_keeps_buffered_records(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = InteractionLog(path, flush_size=100)
+    log.append("alice", "m1", "you")
+    path.mkdir()  # writing to a directory fails
+    with pytest.raises(OSError):
+        log.flush()
+    assert log.pending == 1
+
+    path.rmdir()
+    log.flush()
+    assert log.pending == 0
+    assert log.drain() == {"alice": [("m1", "you")]}
+
+
+def test_append_accepts_records_and_caps_buffer_when_disk_fails(tmp_path, caplog):
+    path = tmp_path / "log.jsonl"
+    log = InteractionLog(path, flush_size=2, max_buffered=3)
+    path.mkdir()  # writing to a directory fails
+    for n in range(5):
+        log.append("alice", f"m{n}", "you")  # flushes fail but do not raise
+    assert log.pending == 3
+    assert "dropped 1 oldest records" in caplog.text
+
+    path.rmdir()
+    log.flush()
+    assert log.drain() == {"alice": [("m2", "you"), ("m3", "you"), ("m4", "you")]}
+
+
+def _drain_in_process(path, out):
+    from language_learning.interaction_log import InteractionLog
+
+    drained = InteractionLog(path).drain(max_records=1)
+    out.put([m for entries in drained.values() for m, _ in entries])
+
+
+def test_concurrent_consumers_deliver_each_record_once(tmp_path):
+    import multiprocessing
+
+    path = tmp_path / "log.jsonl"
+    log = InteractionLog(path)
+    for n in range(20):
+        log.append("alice", f"m{n}", "you")
+    log.flush()
+
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_drain_in_process, args=(str(path), out)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    seen = [m for _ in procs for m in out.get(timeout=30)]
+    for proc in procs:
+        proc.join()
+    assert sorted(seen) == sorted(f"m{n}" for n in range(4))
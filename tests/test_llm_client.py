@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+import requests
+
+from language_learning.ai_blurbs import generate_blurb
+from language_learning.llm_client import (
+    AsyncLLMClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMClient,
+    LLMConfig,
+    LLMError,
+)
+
+
+def _config(endpoint, **kwargs):
+    kwargs.setdefault("backoff", 0.0)
+    return LLMConfig(endpoint=endpoint, deployment="d", api_key="k", **kwargs)
+
+
+def test_chat_reuses_pooled_connection(stub):
+    server = stub()
+    client = LLMClient(_config(server.endpoint))
+    assert client.chat("one") == "ok"
+    assert client.chat("two") == "ok"
+    assert len(server.connections) == 1
+    assert server.requests[1]["messages"] == [{"role": "user", "content": "two"}]
+
+
+def test_chat_retries_transient_errors(stub):
+    server = stub([(503, ""), (429, ""), (200, "done")])
+    client = LLMClient(_config(server.endpoint, max_retries=2))
+    assert client.chat("hi") == "done"
+    assert len(server.requests) == 3
+
+
+def test_chat_does_not_retry_client_errors(stub):
+    server = stub([(400, "")])
+    client = LLMClient(_config(server.endpoint, max_retries=2))
+    with pytest.raises(LLMError):
+        client.chat("hi")
+    assert len(server.requests) == 1
+
+
+def test_circuit_opens_after_repeated_failures(stub):
+    server = stub([(500, "")] * 4)
+    client = LLMClient(
+        _config(server.endpoint, max_retries=1, failure_threshold=2, reset_timeout=60)
+    )
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            client.chat("hi")
+    with pytest.raises(CircuitOpenError):
+        client.chat("hi")
+    assert len(server.requests) == 4
+
+
+def test_circuit_half_opens_after_cooldown():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call while half-open
+    breaker.record_success()
+    assert breaker.allow()
+
+
+class _RaisingSession:
+    def __init__(self, exc):
+        self.exc = exc
+
+    def post(self, *args, **kwargs):
+        raise self.exc
+
+
+@pytest.mark.parametrize(
+    "exc, reopened",
+    [(requests.exceptions.ChunkedEncodingError("cut"), True), (KeyboardInterrupt(), False)],
+)
+def test_interrupted_half_open_trial_is_settled(exc, reopened):
+    now = [0.0]
+    client = LLMClient(_config("http://llm.invalid"), session=_RaisingSession(exc))
+    client.breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+    client.breaker.record_failure()
+    now[0] = 10.0
+    with pytest.raises(type(exc)):
+        client.chat("hi")
+    # A failed trial restarts the cooldown; an interrupted one lets the
+    # next call try again straight away.
+    assert client.breaker.allow() is not reopened
+    if reopened:
+        now[0] = 20.0
+        assert client.breaker.allow()
+
+
+def test_generate_blurb_uses_shared_client_and_falls_back(stub, llm_env):
+    server = stub([(200, "chien chat chien chat")])
+    llm_env(server, LLM_BREAKER_THRESHOLD="1")
+
+    assert generate_blurb(["chat", "chien"], [], 3, use_llm=True) == "chien chat chien"
+    server.script = [(500, "")]
+    assert generate_blurb(["chat", "chien"], [], 4, use_llm=True) == "chat chien chat chien"
+    # The circuit is now open: the fallback is used without calling upstream.
+    generate_blurb(["chat", "chien"], [], 5, use_llm=True)
+    assert len(server.requests) == 2
+
+
+def test_async_client_bounds_concurrency(stub):
+    server = stub()
+    server.delay = 0.05
+
+    async def run():
+        client = AsyncLLMClient(_config(server.endpoint, max_concurrency=2))
+        try:
+            return await asyncio.gather(*(client.chat(str(i)) for i in range(6)))
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == ["ok"] * 6
+    assert server.max_active == 2
+
+
+def test_async_client_retries_then_opens_circuit(stub):
+    server = stub([(502, ""), (200, "done"), (500, ""), (500, "")])
+
+    async def run():
+        client = AsyncLLMClient(
+            _config(server.endpoint, max_retries=1, failure_threshold=1)
+        )
+        try:
+            first = await client.chat("hi")
+            with pytest.raises(LLMError):
+                await client.chat("hi")
+            with pytest.raises(CircuitOpenError):
+                await client.chat("hi")
+            return first
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == "done"
+    assert len(server.requests) == 4
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_cancelled_half_open_trial_releases_async_breaker(stub, streaming):
+    server = stub([(200, "late")])
+    server.delay = 0.5
+    now = [0.0]
+
+    async def call(client):
+        if streaming:
+            return [piece async for piece in client.stream_chat("hi")]
+        return await client.chat("hi")
+
+    async def run():
+        client = AsyncLLMClient(_config(server.endpoint))
+        client.breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+        client.breaker.record_failure()
+        now[0] = 10.0
+        try:
+            task = asyncio.create_task(call(client))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return client.breaker.allow()
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) is True
@@ -14,7 +14,8 @@ def test_suggest_media_lplus1_filtering():
     assert "transcript" in item
 
 
-def test_record_media_interaction_queueing():
+def test_record_media_interaction_queueing(monkeypatch):
+    monkeypatch.setenv("MEDIA_INTERACTION_LOG", "memory")
     interaction_queue.clear()
     record_media_interaction("alice", "media1", "you")
     record_media_interaction("alice", "media2", "i")
@@ -25,3 +26,134 @@ def test_record_media_interaction_queueing():
         ("media2", "i"),
     ]
     assert interaction_queue["bob"] == [("media3", "you")]
+
+
+def _records():
+    return [
+        {"id": "m1", "words": ["Cat", "dog"], "level": 2, "video": "m1.mp4"},
+        {"id": "m2", "word": "cat", "level": 2, "transcript": "a cat"},
+        {"id": "m3", "word": "cat", "level": 3},
+    ]
+
+
+def test_suggest_media_from_catalogue_files(tmp_path, monkeypatch):
+    import csv
+    import json
+
+    from language_learning.media_catalogue import create_sqlite_catalogue
+
+    jsonl = tmp_path / "media.jsonl"
+    jsonl.write_text("".join(json.dumps(r) + "\n" for r in _records()))
+    csv_path = tmp_path / "media.csv"
+    with open(csv_path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, ["id", "word", "level", "video", "transcript"])
+        writer.writeheader()
+        writer.writerow({"id": "m1", "word": "cat", "level": 2, "video": "m1.mp4"})
+        writer.writerow({"id": "m1", "word": "dog", "level": 2, "video": "m1.mp4"})
+        writer.writerow({"id": "m2", "word": "cat", "level": 2, "transcript": "a cat"})
+    db = tmp_path / "media.db"
+    create_sqlite_catalogue(db, _records())
+
+    for path in (jsonl, csv_path, db):
+        monkeypatch.setenv("MEDIA_CATALOGUE_PATH", str(path))
+        assert [m["id"] for m in suggest_media("cat", 1)] == ["m1", "m2"]
+        assert [m["id"] for m in suggest_media("DOG", 1)] == ["m1"]
+        assert suggest_media("cat", 1)[1]["transcript"] == "a cat"
+        assert suggest_media("bird", 1) == []
+
+
+def test_catalogue_reloads_when_file_changes(tmp_path, monkeypatch):
+    import json
+    import os
+
+    path = tmp_path / "media.jsonl"
+    path.write_text(json.dumps({"id": "old", "word": "cat", "level": 2}) + "\n")
+    monkeypatch.setenv("MEDIA_CATALOGUE_PATH", str(path))
+    assert [m["id"] for m in suggest_media("cat", 1)] == ["old"]
+
+    path.write_text(json.dumps({"id": "newer", "word": "cat", "level": 2}) + "\n")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert [m["id"] for m in suggest_media("cat", 1)] == ["newer"]
+
+
+def test_suggest_media_batch_deduplicates_shared_media(tmp_path, monkeypatch):
+    import json
+
+    from language_learning.media_integration import suggest_media_batch
+
+    path = tmp_path / "media.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in _records()))
+    monkeypatch.setenv("MEDIA_CATALOGUE_PATH", str(path))
+
+    result = suggest_media_batch(["dog", "cat", "bird", "cat"], 1, per_word_limit=1)
+    assert result["by_word"] == {"dog": ["m1"], "cat": ["m1"], "bird": []}
+    assert [(m["id"], m["words"]) for m in result["items"]] == [("m1", ["dog", "cat"])]
+
+    result = suggest_media_batch(["cat", "dog"], 1)
+    assert result["by_word"] == {"cat": ["m1", "m2"], "dog": ["m1"]}
+    assert [m["id"] for m in result["items"]] == ["m1", "m2"]
+
+
+def test_interactions_go_to_configured_log(tmp_path, monkeypatch):
+    from language_learning import entrypoints
+
+    monkeypatch.setenv("MEDIA_INTERACTION_LOG", str(tmp_path / "interactions.jsonl"))
+    interaction_queue.clear()
+    entrypoints.media_record("alice", "media1", "you")
+    entrypoints.media_record("bob", "media2", "i")
+    assert not interaction_queue
+    assert (tmp_path / "interactions.jsonl").read_text().count("\n") == 2
+
+    assert entrypoints.media_drain() == {
+        "alice": [["media1", "you"]],
+        "bob": [["media2", "i"]],
+    }
+    assert entrypoints.media_drain() == {}
+
+
+def test_interactions_are_logged_next_to_data_path_by_default(tmp_path, monkeypatch):
+    from language_learning import media_integration
+
+    monkeypatch.delenv("MEDIA_INTERACTION_LOG", raising=False)
+    monkeypatch.setenv("DATA_PATH", str(tmp_path / "storage.json"))
+    interaction_queue.clear()
+    record_media_interaction("alice", "media1", "you")
+    media_integration.flush_media_interactions()
+    assert not interaction_queue
+    assert "media1" in (tmp_path / "media_interactions.jsonl").read_text()
+    assert media_integration.drain_media_interactions() == {"alice": [("media1", "you")]}
+
+
+def test_in_memory_queue_is_bounded_and_drainable(monkeypatch):
+    from language_learning import media_integration
+
+    monkeypatch.setenv("MEDIA_INTERACTION_LOG", "memory")
+    monkeypatch.setattr(media_integration, "MAX_QUEUED_INTERACTIONS", 2)
+    interaction_queue.clear()
+    for media in ("m1", "m2", "m3"):
+        record_media_interaction("alice", media, "you")
+    assert interaction_queue["alice"] == [("m2", "you"), ("m3", "you")]
+
+    assert media_integration.drain_media_interactions(1) == {"alice": [("m2", "you")]}
+    assert media_integration.drain_media_interactions() == {"alice": [("m3", "you")]}
+    assert not interaction_queue
+
+
+def test_suggest_comprehensible_media_uses_catalogue_transcripts(tmp_path, monkeypatch):
+    import json
+
+    from language_learning.media_integration import suggest_comprehensible_media
+
+    path = tmp_path / "media.jsonl"
+    records = [
+        {"id": "easy", "word": "cat", "level": 1, "transcript": "a cat"},
+        {"id": "hard", "word": "cat", "level": 3, "transcript": "a cat sat there"},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    monkeypatch.setenv("MEDIA_CATALOGUE_PATH", str(path))
+
+    result = suggest_comprehensible_media(["a", "cat"], k=2)
+    assert [(m["id"], m["coverage"]) for m in result] == [("easy", 1.0), ("hard", 0.5)]
+    result = suggest_comprehensible_media(["a", "cat"], max_coverage=0.9)
+    assert [m["id"] for m in result] == ["hard"]
@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from language_learning.sentence_index import SentenceIndex, iter_sentences
+from language_learning.vocabulary import CorpusReadError
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_iter_sentences_joins_chunks():
+    chunks = ["The cat sa", "t. A dog\nran! Then\n\nnothing"]
+    assert list(iter_sentences(chunks)) == [
+        "The cat sat.",
+        "A dog ran!",
+        "Then",
+        "nothing",
+    ]
+
+
+def test_examples_have_the_target_as_only_unknown(tmp_path):
+    corpus = _write(
+        tmp_path / "a.txt",
+        "The big dog ran home. The dog ran. A cat saw the dog. The dog ran fast.",
+    )
+    index = SentenceIndex(tmp_path / "idx.db")
+    index.update([corpus])
+    known = ["the", "ran", "fast", "big", "home"]
+    assert index.examples("Dog", known) == [
+        "The dog ran.",
+        "The dog ran fast.",
+        "The big dog ran home.",
+    ]
+    assert index.examples("dog", known, limit=1) == ["The dog ran."]
+    assert index.examples("cat", known) == []
+    assert index.examples("zebra", known) == []
+
+
+def test_update_is_incremental_and_persistent(tmp_path):
+    a = _write(tmp_path / "a.txt", "The dog ran.")
+    b = _write(tmp_path / "b.txt", "The cat ran.")
+    db = tmp_path / "idx.db"
+    index = SentenceIndex(db)
+    assert index.update([a, b]) == {"indexed": 2, "unchanged": 0, "removed": 0}
+    assert index.update([a, b]) == {"indexed": 0, "unchanged": 2, "removed": 0}
+
+    _write(a, "The dog sat. The dog ran.")
+    os.remove(b)
+    assert index.update([a]) == {"indexed": 1, "unchanged": 0, "removed": 1}
+    assert len(index) == 2
+    assert index.examples("cat", ["the", "ran"]) == []
+    index.close()
+
+    reopened = SentenceIndex(db)
+    assert reopened.examples("dog", ["the", "sat"]) == ["The dog sat."]
+    assert reopened.update([a]) == {"indexed": 0, "unchanged": 1, "removed": 0}
+    reopened.close()
+
+
+def test_update_parses_in_worker_processes(tmp_path):
+    paths = [_write(tmp_path / f"{n}.txt", f"The dog saw {n}.") for n in range(4)]
+    index = SentenceIndex(tmp_path / "idx.db")
+    assert index.update(paths, workers=2)["indexed"] == 4
+    assert index.examples("dog", ["the", "saw", "2"]) == ["The dog saw 2."]
+
+
+def test_update_skips_long_sentences_and_reports_missing_files(tmp_path):
+    corpus = _write(tmp_path / "a.txt", "The dog ran. " + "dog " * 50 + ".")
+    index = SentenceIndex(tmp_path / "idx.db")
+    index.update([corpus], max_words=10)
+    assert len(index) == 1
+    with pytest.raises(CorpusReadError):
+        index.update([tmp_path / "missing.txt"])
+
+
+def test_guard_is_highest_other_word_id():
+    from language_learning.sentence_index import _guard
+
+    assert _guard([1, 4, 9], 4) == 9
+    assert _guard([1, 4, 9], 9) == 4
+    assert _guard([7], 7) == 7
+
+
+def test_outdated_index_files_are_rebuilt(tmp_path):
+    import sqlite3
+
+    db = tmp_path / "idx.db"
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE postings (word_id, n_words, sentence_id)")
+    corpus = _write(tmp_path / "a.txt", "The dog ran.")
+    index = SentenceIndex(db)
+    assert index.update([corpus])["indexed"] == 1
+    assert index.examples("dog", ["the", "ran"]) == ["The dog ran."]
+
+
+def test_ranges_split_on_sentence_ends(tmp_path):
+    from language_learning.sentence_index import _parse_range, _sentence_bounds, parse_sentences
+
+    text = "".join(f"Der Hund {n} läuft schnell. Wirklich?\n\nJa " for n in range(50))
+    corpus = _write(tmp_path / "a.txt", text)
+    ranges = _sentence_bounds(str(corpus), 7)
+    assert len(ranges) == 7
+    assert all(text.encode()[end - 1 : end].isspace() for _, end in ranges[:-1])
+    pieces = [s for start, end in ranges for s in _parse_range((str(corpus), start, end, 40, 16))]
+    assert pieces == parse_sentences(str(corpus))
+
+
+def test_large_file_is_parsed_in_ranges_by_several_workers(tmp_path):
+    corpus = _write(tmp_path / "a.txt", " ".join(f"The dog saw {n}." for n in range(200)))
+    sequential = SentenceIndex(tmp_path / "one.db")
+    sequential.update([corpus])
+    parallel = SentenceIndex(tmp_path / "many.db")
+    assert parallel.update([corpus], workers=2, range_bytes=64)["indexed"] == 1
+    assert len(parallel) == len(sequential) == 200
+    assert parallel.examples("dog", ["the", "saw", "150"]) == ["The dog saw 150."]
+    assert parallel.update([corpus], workers=2) == {"indexed": 0, "unchanged": 1, "removed": 0}
+
+
+def test_interrupted_build_reparses_the_file(tmp_path, monkeypatch):
+    from language_learning import sentence_index
+
+    corpus = _write(tmp_path / "a.txt", " ".join(f"The dog saw {n}." for n in range(20)))
+    index = SentenceIndex(tmp_path / "idx.db")
+    real_parse = sentence_index._parse_range
+    calls = []
+
+    def failing_parse(task):
+        calls.append(task)
+        if len(calls) == 2:
+            raise CorpusReadError("disk went away")
+        return real_parse(task)
+
+    monkeypatch.setattr(sentence_index, "_parse_range", failing_parse)
+    with pytest.raises(CorpusReadError):
+        index.update([corpus], range_bytes=64)
+    monkeypatch.setattr(sentence_index, "_parse_range", real_parse)
+    assert index.update([corpus])["indexed"] == 1
+    assert len(index) == 20
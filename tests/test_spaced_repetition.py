@@ -3,9 +3,12 @@ from datetime import datetime, timedelta
 import pytest
 
 from language_learning.spaced_repetition import (
+    ReviewState,
     SRSFilter,
     SpacedRepetitionScheduler,
+    decode_review_states,
     default_srs_filter,
+    encode_review_states,
 )
 from language_learning.vocabulary import get_top_coca_words
 
@@ -68,3 +71,111 @@ def test_load_state_invalid_json_raises(tmp_path):
     path.write_text("{not valid json", encoding="utf-8")
     with pytest.raises(ValueError):
         SRSFilter.load_state(path)
+
+
+def _linear_order(filt, now):
+    """Reference ordering: repeated linear scans as the original queue did."""
+
+    scores = {}
+    for word, sched in filt.schedulers.items():
+        overdue = (now - sched.state.next_review).total_seconds()
+        if overdue > 0:
+            fp = overdue / 86400 / (sched.state.interval or 1)
+            scores[word] = fp * (1.0 / float(filt.goal_frequency_ranks.get(word, 1)))
+    order = []
+    while scores:
+        best = max(scores, key=lambda w: scores[w])
+        order.append(best)
+        del scores[best]
+    return order
+
+
+def _random_filter(size=200, seed=1):
+    import random
+
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(size)]
+    filt = SRSFilter({w: rng.randint(1, 50) for w in words})
+    base = datetime(2024, 1, 1)
+    for w in words:
+        st = filt.schedulers[w].state
+        st.interval = rng.randint(0, 30)
+        st.next_review = base + timedelta(hours=rng.randint(-500, 200))
+    return filt, base
+
+
+def test_drain_due_matches_linear_scan():
+    filt, now = _random_filter()
+    expected = _linear_order(filt, now)
+    assert filt.peek_next_k(10, now) == expected[:10]
+    assert filt.drain_due(now) == expected
+    assert filt.pop_next_due(now) is None
+
+
+def test_due_queue_tracks_reviews_and_removals():
+    filt, now = _random_filter(50)
+    first, second, third = filt.peek_next_k(3, now)
+
+    del filt.schedulers[first]
+    assert filt.pop_next_due(now) == second
+
+    # A reviewed word moves into the future and drops out of the due queue.
+    filt.review(third, 5)
+    assert third not in filt.drain_due(now)
+
+    # Re-scoring for a later instant brings the reviewed word back once due.
+    later = filt.schedulers[third].state.next_review + timedelta(days=1)
+    assert third in filt.drain_due(later)
+
+
+def test_vectorised_scores_match_scalar_path():
+    filt, now = _random_filter()
+    scores = filt.score_all(now)
+    for word, score in zip(filt.schedulers, scores):
+        fp = filt._forgetting_probability(word, now)
+        expected = fp * (1.0 / float(filt.goal_frequency_ranks[word])) if fp > 0 else 0.0
+        assert score == expected
+    assert filt.top_due(7, now) == _linear_order(filt, now)[:7]
+    assert filt.top_due(None, now) == filt.drain_due(now)
+
+
+def test_top_due_reviewed_only_skips_unseen_words():
+    filt, now = _random_filter(30)
+    for word in list(filt.schedulers)[::2]:
+        filt.schedulers[word].state.repetitions = 1
+    expected = [
+        w for w in _linear_order(filt, now) if filt.schedulers[w].state.repetitions > 0
+    ]
+    assert filt.top_due(None, now, reviewed_only=True) == expected
+
+
+def test_review_many_returns_delta_with_explicit_timestamps():
+    filt = SRSFilter({"apple": 1, "banana": 2, "carrot": 3})
+    t0 = datetime(2024, 5, 1, 9, 0)
+    delta = filt.review_many(
+        [
+            ("apple", 5, t0),
+            ("banana", 2, t0),
+            ("apple", 4, t0 + timedelta(days=1)),
+        ]
+    )
+    assert set(delta) == {"apple", "banana"}
+    assert delta["apple"]["repetitions"] == 2
+    assert delta["apple"]["next_review"] == (t0 + timedelta(days=7)).isoformat()
+    assert delta["banana"]["next_review"] == (t0 + timedelta(days=1)).isoformat()
+
+    replay = SRSFilter({"apple": 1, "banana": 2, "carrot": 3})
+    assert replay.review_many(
+        [("apple", 5, t0), ("banana", 2, t0), ("apple", 4, t0 + timedelta(days=1))]
+    ) == delta
+
+
+def test_binary_review_state_round_trip():
+    states = {
+        "apple": ReviewState(3, 16, 2.36, datetime(2024, 2, 29, 13, 5, 7, 123456)),
+        "café": ReviewState(0, 0, 2.5, datetime(1969, 12, 31, 23, 59, 59)),
+    }
+    data = encode_review_states(states)
+    assert decode_review_states(data) == states
+    with pytest.raises(ValueError):
+        decode_review_states(data[:-3])
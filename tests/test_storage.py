@@ -1,5 +1,13 @@
 import os
-from language_learning.storage import JSONStorage
+
+from language_learning.goals import GoalItem
+from language_learning.storage import (
+    JSONStorage,
+    SQLiteStorage,
+    ShardedSQLiteStorage,
+    migrate_json_to_sqlite,
+    open_storage,
+)
 
 
 def test_read_corrupt_json_returns_empty(tmp_path):
@@ -23,3 +31,59 @@ def test_read_uses_backup_on_decode_error(tmp_path):
         fh.write("{invalid}")
     user = store.load_user()
     assert user == {"name": "Alice"}
+
+
+def test_sqlite_storage_round_trip_and_upserts(tmp_path):
+    store = SQLiteStorage(tmp_path / "store.db")
+    assert store.load_user() is None
+    assert store.load_goals() == []
+    assert store.load_review_state() == {}
+
+    store.save_user({"name": "Alice"})
+    store.save_goals([GoalItem("alpha"), GoalItem("beta", 2.0, True)])
+    store.upsert_goal(GoalItem("alpha", 3.0))
+    store.upsert_goal(GoalItem("gamma"))
+    store.save_review_state({"alpha": {"repetitions": 1}})
+    store.upsert_review_state({"beta": {"repetitions": 2}})
+
+    reopened = SQLiteStorage(store.path)
+    assert reopened.load_user() == {"name": "Alice"}
+    assert reopened.load_goals() == [
+        GoalItem("alpha", 3.0),
+        GoalItem("beta", 2.0, True),
+        GoalItem("gamma"),
+    ]
+    assert reopened.load_review_state() == {
+        "alpha": {"repetitions": 1},
+        "beta": {"repetitions": 2},
+    }
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    source = JSONStorage(tmp_path / "store.json")
+    source.save_user({"name": "Bob"})
+    source.save_goals([GoalItem("hello", 2.0)])
+    source.save_review_state({"hello": {"interval": 6}})
+
+    target = migrate_json_to_sqlite(source.path, tmp_path / "store.db")
+    assert target.load_user() == {"name": "Bob"}
+    assert target.load_goals() == [GoalItem("hello", 2.0)]
+    assert target.load_review_state() == {"hello": {"interval": 6}}
+    assert isinstance(open_storage(str(tmp_path / "store.db")), SQLiteStorage)
+
+
+def test_sharded_storage_isolates_users_and_bounds_connections(tmp_path):
+    store = ShardedSQLiteStorage(tmp_path / "shards", shards=4, pool_size=2)
+    for i in range(20):
+        store.save_goals(f"user{i}", [GoalItem(f"word{i}")])
+        store.upsert_review_state(f"user{i}", {f"word{i}": {"interval": i}})
+        assert len(store._pool) <= 2
+
+    assert store.load_goals("user3") == [GoalItem("word3")]
+    assert store.load_review_state("user7") == {"word7": {"interval": 7}}
+    assert store.load_goals("nobody") == []
+
+    view = store.for_user("user5")
+    view.upsert_goal(GoalItem("extra"))
+    assert [g.word for g in store.load_goals("user5")] == ["word5", "extra"]
+    assert len(os.listdir(tmp_path / "shards")) >= 2
@@ -0,0 +1,26 @@
+from language_learning.transcript_index import TranscriptIndex
+
+
+def _index():
+    return TranscriptIndex.from_items(
+        [
+            {"id": "a", "transcript": "The cat sat on the mat."},
+            {"id": "b", "transcript": "A dog! The dog ran."},
+            {"id": "c"},
+            {"id": "d", "transcript": "the cat"},
+        ]
+    )
+
+
+def test_top_k_ranks_by_known_token_coverage():
+    index = _index()
+    assert len(index) == 3
+    ranked = index.top_k(["the", "Cat", "sat"], k=2)
+    assert [(item["id"], cov) for item, cov in ranked] == [("d", 1.0), ("a", 4 / 6)]
+
+
+def test_top_k_respects_max_coverage_and_unknown_words():
+    index = _index()
+    ranked = index.top_k(["the", "cat", "dog"], k=5, max_coverage=0.9)
+    assert [(item["id"], cov) for item, cov in ranked] == [("b", 3 / 5), ("a", 3 / 6)]
+    assert index.top_k(["zebra"]) == []
@@ -22,6 +22,21 @@ def test_select_word_batch_prioritises_goal_and_due():
     assert new_words == ["alpha", "beta"]
 
 
+def test_select_word_batch_reviews_only_previously_reviewed_words():
+    goal_words = ["alpha", "beta", "gamma", "delta"]
+    filt = _build_filter(goal_words)
+    for word, days in (("gamma", 1), ("delta", 3)):
+        st = filt.schedulers[word].state
+        st.repetitions = 1
+        st.next_review = datetime.now() - timedelta(days=days)
+    # Never-reviewed words are due as well, but go to the new words.
+    assert {"alpha", "beta"} <= set(filt.top_due(None))
+
+    new_words, review_words = select_word_batch(goal_words, filt, 3, 3)
+    assert review_words == ["delta", "gamma"]
+    assert new_words == ["alpha", "beta"]
+
+
 def test_generate_tutor_lesson_interleaves_and_inserts_grammar():
     goal_words = ["alpha", "beta"]
     filt = _build_filter(goal_words)
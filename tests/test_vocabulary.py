@@ -1,7 +1,14 @@
 import pytest
 
 from language_learning import get_top_coca_words
-from language_learning.vocabulary import CorpusReadError, extract_vocabulary
+from language_learning.vocabulary import (
+    CorpusReadError,
+    count_files,
+    count_tokens,
+    extract_vocabulary,
+    extract_vocabulary_files,
+    rank_vocabulary,
+)
 from language_learning.goals import GoalManager, GoalItem
 
 
@@ -56,3 +63,48 @@ def test_extract_vocabulary_goal_weight_with_coca(tmp_path):
 
 def test_get_top_coca_words():
     assert get_top_coca_words(3) == ["you", "i", "the"]
+
+
+def test_extract_vocabulary_streams_chunks_across_word_boundaries(tmp_path):
+    text = "Straße straße grüße, the_end 42x " * 50 + "final"
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text(text, encoding="utf-8")
+    whole = extract_vocabulary(str(corpus), chunk_size=1 << 20)
+    for size in (1, 3, 7, 64):
+        assert extract_vocabulary(str(corpus), chunk_size=size) == whole
+    assert count_tokens(corpus, chunk_size=5)["straße"] == 100
+
+
+def test_extract_vocabulary_accepts_lines_and_file_objects():
+    import io
+
+    lines = ["hello wor", "ld world\n", "hello"]
+    assert count_tokens(lines) == {"hello": 2, "world": 2}
+    assert extract_vocabulary(io.StringIO("hello world world")) == ["hello", "world"]
+
+
+def test_parallel_counting_matches_serial(tmp_path):
+    first = tmp_path / "a.txt"
+    first.write_text("ünïcode words\nand more words " * 40, encoding="utf-8")
+    second = tmp_path / "b.txt"
+    second.write_text("hello world world", encoding="utf-8")
+
+    serial = count_tokens(first) + count_tokens(second)
+    assert count_files([first, second], workers=2, range_bytes=16) == serial
+    assert count_files([first, second], workers=1, range_bytes=16) == serial
+    assert extract_vocabulary(str(first), workers=2) == extract_vocabulary(str(first))
+    assert extract_vocabulary_files([first, second], workers=2) == rank_vocabulary(serial)
+
+
+def test_parallel_counting_reports_missing_file(tmp_path):
+    with pytest.raises(CorpusReadError):
+        count_files([tmp_path / "missing.txt"], workers=2)
+
+
+def test_extract_vocabulary_pagination_matches_full_ranking():
+    corpus = ["b a c a d e e e f f g " * 3]
+    full = extract_vocabulary(corpus)
+    assert extract_vocabulary(corpus, limit=3) == full[:3]
+    assert extract_vocabulary(corpus, limit=3, offset=2) == full[2:5]
+    assert extract_vocabulary(corpus, limit=10, offset=5) == full[5:]
+    assert extract_vocabulary(corpus, offset=4) == full[4:]
@@ -0,0 +1,53 @@
+import pytest
+
+from language_learning.goals import GoalItem, GoalManager
+from language_learning.vocabulary import extract_vocabulary
+from language_learning.vocabulary_index import VocabularyIndex
+
+
+def test_incremental_index_matches_full_extraction(tmp_path):
+    coca = tmp_path / "coca.csv"
+    coca.write_text("alpha,5\nbeta,1\n")
+    index = VocabularyIndex()
+    index.add_document("a", ["alpha beta beta gamma"])
+    index.add_document("b", ["gamma gamma delta"])
+
+    corpus = ["alpha beta beta gamma\n", "gamma gamma delta"]
+    assert index.top_k(10, coca_path=str(coca)) == extract_vocabulary(
+        corpus, coca_path=str(coca)
+    )
+
+    goals = GoalManager()
+    goals.create_goal(GoalItem("delta", 10))
+    assert index.top_k(1, goals, coca_path=str(coca)) == ["delta"]
+
+    index.remove_document("b")
+    assert index.count("gamma") == 1
+    assert index.top_k(10, coca_path=str(coca)) == ["alpha", "beta", "gamma"]
+
+
+def test_adding_same_document_replaces_it():
+    index = VocabularyIndex()
+    index.add_document("a", ["one two"])
+    index.add_document("a", ["two three"])
+    assert len(index) == 1
+    assert index.count("one") == 0 and index.count("two") == 1
+    with pytest.raises(KeyError):
+        index.remove_document("missing")
+
+
+def test_index_round_trips_through_disk(tmp_path):
+    index = VocabularyIndex()
+    index.add_document("ep1", ["Ünïcode words words"])
+    index.add_document("ep2", ["more words"])
+    path = tmp_path / "vocab.idx"
+    index.save(path)
+
+    loaded = VocabularyIndex.load(path)
+    assert loaded.top_k(5) == index.top_k(5)
+    loaded.remove_document("ep1")
+    assert loaded.count("words") == 1 and "ep2" in loaded
+
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        VocabularyIndex.load(path)